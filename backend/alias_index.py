@@ -0,0 +1,190 @@
+import re
+import unicodedata
+
+# candidates scoring lower than this are not suggested
+MIN_SCORE = 0.3
+# an unknown nickname is linked automatically only to a candidate scoring at
+# least this, and ahead of the next player by AUTO_LINK_MARGIN
+AUTO_LINK_SCORE = 0.8
+AUTO_LINK_MARGIN = 0.15
+
+
+def normalize(name: str) -> str:
+    """
+    Returns the key a nickname is matched by: lowercase letters and digits
+    without accents, with trailing digits dropped, so "Chun", "chun" and
+    "Chun1" share a key.
+
+    Args:
+        name (str): The nickname.
+
+    Returns:
+        str: The normalized key, empty for a name without letters or digits.
+    """
+    name = unicodedata.normalize("NFKD", name)
+    key = re.sub(r"[^0-9a-z]", "", name.encode("ascii", "ignore")
+                 .decode("ascii").lower())
+    return key.rstrip("0123456789") or key
+
+
+def trigrams(key: str) -> set[str]:
+    """
+    Returns the trigrams of a normalized key, padded so short keys and
+    their first and last letters count.
+
+    Args:
+        key (str): The normalized key.
+
+    Returns:
+        set: The trigrams of the key.
+    """
+    padded = f"#{key}#"
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+
+class AliasIndex:
+    """
+    Suggests the players an unknown nickname may belong to.
+
+    Every nickname and name of every player is indexed by its normalized
+    key and its trigrams. A lookup gathers the entries sharing a trigram
+    with the name from the trigram postings and scores them by Dice
+    similarity, so it only touches entries with something in common with
+    the name, and never loops over every alias. A ledger's PokerNow player
+    id matching a player's recorded player_id, or an id their nicknames sat
+    under in earlier ledgers, is taken as certain.
+
+    The single words of a player's name are indexed to suggest them, but
+    many players share a first name, so a match on one alone never links a
+    nickname automatically.
+    """
+
+    def __init__(self, json_data: list[dict],
+                 ledger_ids: dict[str, int] | None = None) -> None:
+        """
+        Builds the index from the player records.
+
+        Args:
+            json_data (list): The player records.
+            ledger_ids (dict, optional): The PokerNow player ids the
+                players' nicknames sat under in ledgers, mapped to the
+                positions of the players. A record's own player_id takes
+                precedence.
+        """
+        import numpy as np
+
+        self._aliases: list[str] = []
+        positions: list[int] = []
+        sizes: list[int] = []
+        postings: dict[str, list[int]] = {}
+        self._by_player_id: dict[str, int] = dict(ledger_ids or {})
+        # the positions and aliases of the entries that are only one word
+        # of a player's name
+        self._name_words: set[tuple[int, str]] = set()
+
+        for position, player in enumerate(json_data):
+            if player.get("player_id"):
+                self._by_player_id[player["player_id"]] = position
+            seen: set[str] = set()
+            aliases = [(alias, False) for alias
+                       in [*player["player_nicknames"], player["name"]]]
+            aliases += [(word, True) for word in player["name"].split()]
+            for alias, name_word in aliases:
+                key = normalize(alias)
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                if name_word:
+                    self._name_words.add((position, alias))
+                grams = trigrams(key)
+                for gram in grams:
+                    postings.setdefault(gram, []).append(len(self._aliases))
+                self._aliases.append(alias)
+                positions.append(position)
+                sizes.append(len(grams))
+
+        self._positions = np.array(positions, dtype=np.int64)
+        self._sizes = np.array(sizes, dtype=np.int64)
+        self._postings = {gram: np.array(entries, dtype=np.int64)
+                          for gram, entries in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def candidates(self, name: str, player_id: str | None = None,
+                   limit: int = 5) -> list[dict]:
+        """
+        Returns the players a nickname most likely belongs to.
+
+        Args:
+            name (str): The unknown nickname.
+            player_id (str, optional): The PokerNow player id the nickname
+                sat under in its ledger.
+            limit (int, optional): The most candidates to return. Defaults
+                to 5.
+
+        Returns:
+            list: One dictionary per player, best first, with the player's
+            position, the similarity score from 0 to 1 and the alias that
+            matched, which is "player_id" for a player id match.
+        """
+        import numpy as np
+
+        candidates: list[dict] = []
+        seen: set[int] = set()
+        if player_id and player_id in self._by_player_id:
+            position = self._by_player_id[player_id]
+            candidates.append({"position": position, "score": 1.0,
+                               "alias": "player_id"})
+            seen.add(position)
+
+        grams = trigrams(normalize(name))
+        matched = [self._postings[gram] for gram in grams
+                   if gram in self._postings]
+        if matched:
+            entries, shared = np.unique(np.concatenate(matched),
+                                        return_counts=True)
+            scores = 2 * shared / (len(grams) + self._sizes[entries])
+            order = np.argsort(-scores, kind="stable")
+            for entry, score in zip(entries[order].tolist(),
+                                    scores[order].tolist()):
+                if len(candidates) >= limit or score < MIN_SCORE:
+                    break
+                position = int(self._positions[entry])
+                if position in seen:
+                    continue
+                seen.add(position)
+                candidates.append({"position": position,
+                                   "score": round(score, 3),
+                                   "alias": self._aliases[entry]})
+        return candidates[:limit]
+
+    def auto_link(self, name: str, player_id: str | None = None
+                  ) -> int | None:
+        """
+        Returns the player an unknown nickname can be linked to without
+        asking, if there is a clear one: a player id match, or a nickname or
+        full name that is close enough and clearly ahead of the rest.
+
+        Args:
+            name (str): The unknown nickname.
+            player_id (str, optional): The PokerNow player id the nickname
+                sat under in its ledger.
+
+        Returns:
+            int | None: The position of the player, or None if there is no
+            clear one.
+        """
+        candidates = self.candidates(name, player_id, limit=2)
+        if not candidates:
+            return None
+        best = candidates[0]
+        if best["alias"] == "player_id":
+            return best["position"]
+        if (best["position"], best["alias"]) in self._name_words:
+            return None
+        runner_up = candidates[1]["score"] if len(candidates) > 1 else 0.0
+        if (best["score"] >= AUTO_LINK_SCORE
+                and best["score"] - runner_up >= AUTO_LINK_MARGIN):
+            return best["position"]
+        return None
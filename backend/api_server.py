@@ -0,0 +1,251 @@
+import hashlib
+import json
+import re
+import threading
+from collections.abc import Callable
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from poker import Poker
+
+# responses kept per store version before the cache starts over, so a
+# crawl over many distinct query strings cannot grow it without bound
+MAX_CACHED_RESPONSES = 4096
+
+
+def _int_param(query: dict[str, str], name: str,
+               default: int | None = None) -> int | None:
+    """
+    Reads an integer query parameter.
+
+    Raises:
+        ValueError: If the parameter is not an integer.
+    """
+    if name not in query:
+        return default
+    try:
+        return int(query[name])
+    except ValueError:
+        raise ValueError(f"Query parameter {name} must be an integer")
+
+
+def leaderboard(poker: Poker, query: dict[str, str]) -> dict:
+    """Serves one page of a ranking, chosen with by, page and size."""
+    return poker.leaderboard_page(query.get("by", "net"),
+                                  _int_param(query, "page", 1),
+                                  _int_param(query, "size", 20))
+
+
+def player(poker: Poker, query: dict[str, str], player_id: str) -> dict | None:
+    """Serves the full record of one player."""
+    return poker.player(int(player_id))
+
+
+def player_history(poker: Poker, query: dict[str, str],
+                   player_id: str) -> dict | None:
+    """Serves a player's history, limited with start, end and max_points."""
+    return poker.player_history(int(player_id), query.get("start"),
+                                query.get("end"),
+                                _int_param(query, "max_points"))
+
+
+def player_sessions(poker: Poker, query: dict[str, str],
+                    player_id: str) -> dict | None:
+    """Serves a player's hours, hourly rate and buy-ins."""
+    return poker.session_stats(int(player_id))
+
+
+def game(poker: Poker, query: dict[str, str], game_id: str) -> dict | None:
+    """Serves the results of one game."""
+    return poker.game(unquote(game_id))
+
+
+# every endpoint as a path pattern and the function rendering it, which
+# returns None when the requested player or game does not exist
+ROUTES: list[tuple[re.Pattern, Callable[..., dict | None]]] = [
+    (re.compile(r"/leaderboard"), leaderboard),
+    (re.compile(r"/players/(\d+)"), player),
+    (re.compile(r"/players/(\d+)/history"), player_history),
+    (re.compile(r"/players/(\d+)/sessions"), player_sessions),
+    (re.compile(r"/games/([^/]+)"), game),
+]
+
+
+def render(poker: Poker, target: str) -> tuple[int, bytes]:
+    """
+    Renders the response to a request target.
+
+    Args:
+        poker (Poker): The Poker object to read from.
+        target (str): The path and query string of the request.
+
+    Returns:
+        tuple: The HTTP status and the JSON body.
+    """
+    url = urlsplit(target)
+    query = {name: values[-1]
+             for name, values in parse_qs(url.query).items()}
+    for pattern, endpoint in ROUTES:
+        match = pattern.fullmatch(url.path.rstrip("/") or "/")
+        if match is None:
+            continue
+        try:
+            result = endpoint(poker, query, *match.groups())
+        except ValueError as error:
+            return HTTPStatus.BAD_REQUEST, _json_body({"error": str(error)})
+        if result is None:
+            break
+        return HTTPStatus.OK, _json_body(result)
+    return HTTPStatus.NOT_FOUND, _json_body({"error": "Not found"})
+
+
+def _json_body(result: dict) -> bytes:
+    return json.dumps(result).encode("utf-8")
+
+
+class ResponseCache:
+    """
+    Keeps the rendered response of every request target for the current
+    version of the player store.
+
+    The store's signature is checked on every lookup, so ingesting a game,
+    from this process or from the CLI, drops every cached response. Access
+    to the Poker object is serialised, since its cached indexes are not
+    thread safe.
+    """
+
+    def __init__(self, poker: Poker) -> None:
+        """
+        Creates an empty cache.
+
+        Args:
+            poker (Poker): The Poker object responses are rendered from.
+        """
+        self.poker = poker
+        self._lock = threading.Lock()
+        self._signature: tuple[int, int] | None = None
+        self._responses: dict[str, tuple[int, bytes, str]] = {}
+
+    def get(self, target: str) -> tuple[int, bytes, str, int]:
+        """
+        Returns the response to a request target, rendering it only if the
+        store changed since it was last rendered.
+
+        Args:
+            target (str): The path and query string of the request.
+
+        Returns:
+            tuple: The HTTP status, the JSON body, its ETag and the
+            modification time of the store in nanoseconds.
+        """
+        with self._lock:
+            signature = self.poker.store.signature()
+            if signature != self._signature:
+                self._responses.clear()
+                self._signature = signature
+
+            response = self._responses.get(target)
+            if response is None:
+                status, body = render(self.poker, target)
+                etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+                response = (status, body, etag)
+                if status == HTTPStatus.OK:
+                    if len(self._responses) >= MAX_CACHED_RESPONSES:
+                        self._responses.clear()
+                    self._responses[target] = response
+            return (*response, signature[0])
+
+
+def is_not_modified(headers, etag: str, mtime_ns: int) -> bool:
+    """
+    Checks a request's conditional headers against a response.
+
+    If-None-Match takes precedence over If-Modified-Since, as in RFC 9110.
+
+    Args:
+        headers: The request headers.
+        etag (str): The ETag of the current response.
+        mtime_ns (int): The modification time of the store in nanoseconds.
+
+    Returns:
+        bool: Whether the client's copy is current.
+    """
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/")
+                for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = headers.get("If-Modified-Since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return mtime_ns // 1_000_000_000 <= since
+    return False
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET requests from the server's ResponseCache, with 304 Not
+    Modified for clients whose copy is current.
+    """
+
+    # keep connections open between requests, and send the body without
+    # waiting for the headers to be acknowledged
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "ApiServer"
+
+    def do_GET(self) -> None:
+        status, body, etag, mtime_ns = self.server.cache.get(self.path)
+        not_modified = (status == HTTPStatus.OK
+                        and is_not_modified(self.headers, etag, mtime_ns))
+        self.send_response(HTTPStatus.NOT_MODIFIED if not_modified
+                           else status)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified",
+                         formatdate(mtime_ns / 1e9, usegmt=True))
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class ApiServer(ThreadingHTTPServer):
+    """
+    Serves the leaderboard, players, games and player histories of a Poker
+    object as JSON.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, poker: Poker, host: str = "127.0.0.1",
+                 port: int = 8000, quiet: bool = False) -> None:
+        """
+        Binds the server.
+
+        Args:
+            poker (Poker): The Poker object to serve.
+            host (str, optional): The address to listen on.
+                Defaults to "127.0.0.1".
+            port (int, optional): The port to listen on, or 0 for any free
+                port. Defaults to 8000.
+            quiet (bool, optional): Whether to skip logging every request.
+                Defaults to False.
+        """
+        super().__init__((host, port), ApiRequestHandler)
+        self.cache = ResponseCache(poker)
+        self.quiet = quiet
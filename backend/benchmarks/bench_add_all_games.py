@@ -0,0 +1,78 @@
+"""
+Compares per-game ingestion with batch ingestion on a synthetic season.
+
+Each mode ingests into its own copy of the store, and the results are
+checked to match.
+
+Usage (from the repository root):
+    python backend/benchmarks/bench_add_all_games.py --ledgers 5000
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from poker import Poker  # noqa: E402
+from synthetic import (make_players, write_ledger_corpus,  # noqa: E402
+                       write_player_store)
+
+
+def per_game_loop(poker: Poker) -> None:
+    """Ingests every ledger with one add_poker_game call per file."""
+    for filepath in poker._ledger_paths():
+        poker.add_poker_game(filepath)
+
+
+def batch(poker: Poker) -> None:
+    """Ingests every ledger with a single add_all_games call."""
+    poker.add_all_games()
+
+
+def run(n_ledgers: int, n_players: int) -> None:
+    with TemporaryDirectory() as tempdir:
+        players = make_players(n_players)
+        ledger_folder_path = os.path.join(tempdir, "ledgers")
+        write_ledger_corpus(ledger_folder_path, players, n_ledgers,
+                            games_per_day=math.ceil(n_ledgers / 365))
+
+        first = None
+        for label, ingest in (("per-game loop", per_game_loop),
+                              ("batch", batch)):
+            # every run gets its own store, manifest, catalog and parse
+            # cache, so the second run does not find the games already added
+            store_dir = os.path.join(tempdir, label.replace(" ", "-"))
+            os.mkdir(store_dir)
+            json_path = os.path.join(store_dir, "data.json")
+            write_player_store(json_path, players)
+            poker = Poker(ledger_folder_path, json_path)
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                ingest(poker)
+            elapsed = time.perf_counter() - start
+
+            with open(json_path, encoding="utf-8") as json_file:
+                result = json.load(json_file)
+            if first is None:
+                first = result
+            elif result != first:
+                raise AssertionError(f"{label} differs from the first run")
+
+            print(f"{label:>14}: {elapsed:8.2f}s "
+                  f"({n_ledgers / elapsed:8.1f} ledgers/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ledgers", type=int, default=5000)
+    parser.add_argument("--players", type=int, default=40)
+    args = parser.parse_args()
+    run(args.ledgers, args.players)
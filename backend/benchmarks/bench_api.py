@@ -0,0 +1,158 @@
+"""
+Load-tests the local HTTP API and reports requests per second and latency
+percentiles.
+
+Without --url, a synthetic league is built and served from a separate
+process, so the clients do not compete with the server for the GIL. Each
+scenario runs --clients threads over keep-alive connections: plain GETs of
+cached responses, and conditional GETs that are answered 304.
+
+Usage (from the repository root):
+    python backend/benchmarks/bench_api.py --requests 20000 --clients 8
+    python backend/benchmarks/bench_api.py --url http://127.0.0.1:8000
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import math
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from tempfile import TemporaryDirectory
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from api_server import ApiServer  # noqa: E402
+from poker import Poker  # noqa: E402
+from synthetic import (make_players, write_ledger_corpus,  # noqa: E402
+                       write_player_store)
+
+
+def serve_synthetic(tempdir: str, n_ledgers: int, n_players: int,
+                    port: multiprocessing.Value) -> None:
+    """Builds a synthetic league and serves it until terminated."""
+    players = make_players(n_players)
+    ledger_folder_path = os.path.join(tempdir, "ledgers")
+    write_ledger_corpus(ledger_folder_path, players, n_ledgers,
+                        games_per_day=math.ceil(n_ledgers / 365))
+    json_path = os.path.join(tempdir, "data.json")
+    write_player_store(json_path, players)
+    poker = Poker(ledger_folder_path, json_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        poker.add_all_games()
+
+    server = ApiServer(poker, port=0, quiet=True)
+    port.value = server.server_port
+    server.serve_forever()
+
+
+def targets(n_players: int, n_games: int) -> list[str]:
+    """Returns a mix of request targets over every endpoint."""
+    rng = random.Random(0)
+    paths = []
+    for _ in range(200):
+        player_id = rng.randint(1, n_players)
+        paths += [f"/leaderboard?page={rng.randint(1, 3)}",
+                  f"/players/{player_id}",
+                  f"/players/{player_id}/history?max_points=100"]
+    paths += [f"/games/2023-01-{day:02d}"
+              for day in range(1, min(n_games, 31) + 1)]
+    return paths
+
+
+def client(host: str, port: int, paths: list[str], n_requests: int,
+           conditional: bool, latencies: list[float]) -> None:
+    """Sends n_requests GETs over one connection, recording latencies."""
+    connection = http.client.HTTPConnection(host, port)
+    etags = {}
+    for i in range(n_requests):
+        path = paths[i % len(paths)]
+        headers = {}
+        if conditional and path in etags:
+            headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        etags[path] = response.getheader("ETag")
+    connection.close()
+
+
+def load_test(host: str, port: int, paths: list[str], n_requests: int,
+              n_clients: int, conditional: bool) -> None:
+    # one warm-up pass fills the server's cache
+    client(host, port, paths, len(paths), False, [])
+
+    latencies = [[] for _ in range(n_clients)]
+    threads = [threading.Thread(
+        target=client,
+        args=(host, port, paths[i::n_clients] or paths,
+              n_requests // n_clients, conditional, latencies[i]))
+        for i in range(n_clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    merged = sorted(latency for client_latencies in latencies
+                    for latency in client_latencies)
+    p50 = merged[len(merged) // 2] * 1000
+    p99 = merged[min(len(merged) - 1, int(len(merged) * 0.99))] * 1000
+    label = "conditional (304)" if conditional else "cached GET"
+    print(f"{label:>18}: {len(merged) / elapsed:9.1f} req/s, "
+          f"p50 {p50:6.2f} ms, p99 {p99:6.2f} ms")
+
+
+def run(url: str | None, n_requests: int, n_clients: int, n_ledgers: int,
+        n_players: int) -> None:
+    with TemporaryDirectory() as tempdir:
+        server = None
+        if url is None:
+            port = multiprocessing.Value("i", 0)
+            server = multiprocessing.Process(
+                target=serve_synthetic,
+                args=(tempdir, n_ledgers, n_players, port), daemon=True)
+            server.start()
+            while not port.value:
+                if not server.is_alive():
+                    raise RuntimeError("The API server failed to start")
+                time.sleep(0.05)
+            host = "127.0.0.1"
+            port = port.value
+        else:
+            split = urlsplit(url)
+            host, port = split.hostname, split.port or 80
+
+        try:
+            paths = targets(n_players, n_ledgers)
+            print(f"{n_requests} requests, {n_clients} clients, "
+                  f"{len(paths)} distinct targets")
+            for conditional in (False, True):
+                load_test(host, port, paths, n_requests, n_clients,
+                          conditional)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url",
+                        help="Test a running instance instead of a "
+                             "synthetic league.")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--ledgers", type=int, default=365)
+    parser.add_argument("--players", type=int, default=200)
+    args = parser.parse_args()
+    run(args.url, args.requests, args.clients, args.ledgers, args.players)
@@ -0,0 +1,87 @@
+"""
+Records the cold-start latency of every CLI command.
+
+Each command runs in a fresh interpreter against a temporary copy of the
+ledgers folder and player store, so ag and sync never touch the real data.
+
+Usage (from the repository root):
+    python backend/benchmarks/bench_cli_startup.py --runs 10 --output out.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))), "main.py")
+
+
+def time_command(args: list[str], cwd: str, runs: int) -> list[float]:
+    """
+    Runs a CLI command in a new interpreter several times.
+
+    Returns:
+        list: The wall time of every run in seconds.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, MAIN_PATH, *args], cwd=cwd,
+                       stdout=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run(ledger_folder_path: str, json_path: str, runs: int) -> dict:
+    last_day = sorted(
+        file for file in os.listdir(ledger_folder_path)
+        if file.endswith(".csv"))[-1][len("ledger"):-len(".csv")]
+    commands = {
+        "python": None,
+        "--help": ["--help"],
+        "pgs": ["pgs"],
+        "pg": ["pg", last_day],
+        "ag": ["ag", last_day],
+        "sync": ["sync"],
+    }
+
+    results = {}
+    with TemporaryDirectory() as tempdir:
+        shutil.copytree(ledger_folder_path, os.path.join(tempdir, "ledgers"))
+        shutil.copy(json_path, os.path.join(tempdir, "data.json"))
+
+        for name, args in commands.items():
+            if args is None:
+                # interpreter startup alone, as a floor for every command
+                timings = []
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    subprocess.run([sys.executable, "-c", "pass"],
+                                   check=True)
+                    timings.append(time.perf_counter() - start)
+            else:
+                timings = time_command(args, tempdir, runs)
+            results[name] = {"min_s": min(timings),
+                             "median_s": statistics.median(timings)}
+            print(f"{name:>8}: min {min(timings) * 1000:7.1f} ms  "
+                  f"median {statistics.median(timings) * 1000:7.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ledgers", default="ledgers")
+    parser.add_argument("--json", default="data.json")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="write results as JSON to a file")
+    args = parser.parse_args()
+
+    results = run(args.ledgers, args.json, args.runs)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=4)
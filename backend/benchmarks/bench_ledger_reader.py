@@ -0,0 +1,83 @@
+"""
+Compares the streaming CSV ledger reader with the pandas reader.
+
+Measures throughput and peak traced memory over the real ledgers folder and
+over one large synthetic ledger.
+
+Usage (from the repository root):
+    python backend/benchmarks/bench_ledger_reader.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from ledger_reader import LEDGER_READERS  # noqa: E402
+from synthetic import make_players, write_large_ledger  # noqa: E402
+
+
+def measure(read, paths: list[str]) -> tuple[float, int]:
+    """
+    Reads every ledger once untraced for timing and once under tracemalloc
+    for peak memory, since tracing slows pure Python code far more than
+    pandas.
+
+    Returns:
+        tuple: The elapsed seconds and the peak traced memory in bytes.
+    """
+    start = time.perf_counter()
+    for path in paths:
+        read(path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for path in paths:
+        read(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def count_rows(paths: list[str]) -> int:
+    rows = 0
+    for path in paths:
+        with open(path, "rb") as ledger_file:
+            rows += sum(1 for _ in ledger_file) - 1
+    return rows
+
+
+def report(label: str, paths: list[str]) -> None:
+    rows = count_rows(paths)
+    print(f"{label}: {len(paths)} ledgers, {rows} rows")
+    for backend, read in LEDGER_READERS.items():
+        # warm up imports so they are not charged to the first ledger
+        read(paths[0])
+        elapsed, peak = measure(read, paths)
+        print(f"  {backend:>6}: {elapsed:8.3f}s "
+              f"{rows / elapsed:12.0f} rows/s "
+              f"{peak / 2 ** 20:8.1f} MiB peak")
+
+
+def run(ledger_folder_path: str, n_rows: int) -> None:
+    report(ledger_folder_path, [
+        f"{ledger_folder_path}/{file}"
+        for file in sorted(os.listdir(ledger_folder_path))
+        if file.endswith(".csv")])
+
+    with TemporaryDirectory() as tempdir:
+        ledger_csv_path = os.path.join(tempdir, "ledger01_01.csv")
+        write_large_ledger(ledger_csv_path, make_players(200), n_rows)
+        report("synthetic", [ledger_csv_path])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ledgers", default="ledgers")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.ledgers, args.rows)
@@ -0,0 +1,82 @@
+"""
+Measures how full rebuilds scale with the number of ledger parsing workers.
+
+Every worker count rebuilds a fresh copy of the same store, and the result
+is checked against the serial rebuild. Each phase starts from an empty parse
+cache, so every ledger is parsed by the workers rather than read from the
+cache.
+
+Usage (from the repository root):
+    python backend/benchmarks/bench_parallel_rebuild.py --ledgers 10000
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from poker import Poker  # noqa: E402
+from synthetic import (make_players, write_ledger_corpus,  # noqa: E402
+                       write_player_store)
+
+
+def run(n_ledgers: int, n_players: int, worker_counts: list[int]) -> None:
+    with TemporaryDirectory() as tempdir:
+        players = make_players(n_players)
+        ledger_folder_path = os.path.join(tempdir, "ledgers")
+        write_ledger_corpus(ledger_folder_path, players, n_ledgers,
+                            games_per_day=math.ceil(n_ledgers / 365))
+
+        serial = None
+        for workers in worker_counts:
+            store_dir = os.path.join(tempdir, f"workers{workers}")
+            os.mkdir(store_dir)
+            json_path = os.path.join(store_dir, "data.json")
+            write_player_store(json_path, players)
+
+            def cold_poker(phase: str) -> Poker:
+                return Poker(ledger_folder_path, json_path,
+                             parse_cache_path=os.path.join(
+                                 store_dir, f"{phase}_cache.sqlite"))
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                poker = cold_poker("parse")
+                start = time.perf_counter()
+                poker.print_unique_nicknames(workers)
+                parse_elapsed = time.perf_counter() - start
+
+                poker = cold_poker("rebuild")
+                start = time.perf_counter()
+                poker.add_all_games(workers=workers)
+                rebuild_elapsed = time.perf_counter() - start
+
+            with open(json_path, encoding="utf-8") as json_file:
+                result = json.load(json_file)
+            if serial is None:
+                serial = result
+            elif result != serial:
+                raise AssertionError(
+                    f"{workers} workers differ from the first rebuild")
+
+            print(f"{workers:>2} workers: "
+                  f"parse {parse_elapsed:7.2f}s "
+                  f"({n_ledgers / parse_elapsed:8.0f} ledgers/s)  "
+                  f"rebuild {rebuild_elapsed:7.2f}s "
+                  f"({n_ledgers / rebuild_elapsed:8.0f} ledgers/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ledgers", type=int, default=10_000)
+    parser.add_argument("--players", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    run(args.ledgers, args.players, args.workers)
@@ -0,0 +1,66 @@
+"""
+Compares full rebuilds that parse every ledger with rebuilds that find every
+ledger in the parse cache.
+
+Both rebuilds start from a fresh copy of the same store, and only the parse
+cache is shared between them, so the second one pays for hashing the
+ledgers and folding them.
+
+Usage (from the repository root):
+    python backend/benchmarks/bench_parse_cache.py --ledgers 5000
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from poker import Poker  # noqa: E402
+from synthetic import (make_players, write_ledger_corpus,  # noqa: E402
+                       write_player_store)
+
+
+def run(n_ledgers: int, n_players: int) -> None:
+    with TemporaryDirectory() as tempdir:
+        players = make_players(n_players)
+        ledger_folder_path = os.path.join(tempdir, "ledgers")
+        write_ledger_corpus(ledger_folder_path, players, n_ledgers,
+                            games_per_day=math.ceil(n_ledgers / 365))
+        parse_cache_path = os.path.join(tempdir, "parse_cache.sqlite")
+
+        results = []
+        for label in ["cold", "warm"]:
+            store_dir = os.path.join(tempdir, label)
+            os.mkdir(store_dir)
+            json_path = os.path.join(store_dir, "data.json")
+            write_player_store(json_path, players)
+            poker = Poker(ledger_folder_path, json_path,
+                          parse_cache_path=parse_cache_path)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                poker.add_all_games()
+                elapsed = time.perf_counter() - start
+
+            with open(json_path, encoding="utf-8") as json_file:
+                results.append(json.load(json_file))
+            print(f"{label} cache: rebuild {elapsed:7.2f}s "
+                  f"({n_ledgers / elapsed:8.0f} ledgers/s)")
+
+        if results[0] != results[1]:
+            raise AssertionError("the cached rebuild differs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ledgers", type=int, default=5_000)
+    parser.add_argument("--players", type=int, default=40)
+    args = parser.parse_args()
+    run(args.ledgers, args.players)
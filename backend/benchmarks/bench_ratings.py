@@ -0,0 +1,80 @@
+"""
+Measures full PUTR recomputes and per-game rating updates on a synthetic
+history.
+
+The full recompute is checked against folding the games one by one.
+
+Usage (from the repository root):
+    python backend/benchmarks/bench_ratings.py --games 50000 --players 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from rating_engine import (BASE_RATING, compute_ratings,  # noqa: E402
+                           game_scores, update_ratings)
+
+
+def make_history(n_games: int, n_players: int, players_per_game: int,
+                 seed: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Builds a random results log in array form.
+
+    Returns:
+        tuple: The game index, player id and net in cents of every result.
+    """
+    rng = np.random.default_rng(seed)
+    game = np.repeat(np.arange(n_games), players_per_game)
+    player = np.concatenate([
+        rng.choice(n_players, players_per_game, replace=False)
+        for _ in range(n_games)]).astype(str)
+    net_cents = rng.integers(-20_000, 20_000, len(game))
+    return game, player, net_cents
+
+
+def run(n_games: int, n_players: int, players_per_game: int) -> None:
+    game, player, net_cents = make_history(n_games, n_players,
+                                           players_per_game)
+
+    start = time.perf_counter()
+    computed = compute_ratings(game, player, net_cents)
+    full_elapsed = time.perf_counter() - start
+
+    ratings = {}
+    games = {}
+    start = time.perf_counter()
+    for rows in np.split(np.arange(len(game)), n_games):
+        ids = player[rows].tolist()
+        scores = game_scores(np.zeros(len(ids), dtype=np.int64),
+                             net_cents[rows])
+        updated = update_ratings(
+            np.array([ratings.get(i, BASE_RATING) for i in ids]),
+            np.array([games.get(i, 0) for i in ids]), scores)
+        for i, rating in zip(ids, updated.tolist()):
+            ratings[i] = rating
+            games[i] = games.get(i, 0) + 1
+    incremental_elapsed = time.perf_counter() - start
+
+    drift = max(abs(computed[i] - ratings[i]) for i in computed)
+    if drift > 1e-9:
+        raise AssertionError(f"full and incremental ratings differ by {drift}")
+
+    print(f"{n_games} games, {len(computed)} players")
+    print(f"full recompute:     {full_elapsed * 1000:9.1f} ms")
+    print(f"incremental update: {incremental_elapsed / n_games * 1e6:9.1f} "
+          f"us per game")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--games", type=int, default=50_000)
+    parser.add_argument("--players", type=int, default=5_000)
+    parser.add_argument("--players-per-game", type=int, default=8)
+    args = parser.parse_args()
+    run(args.games, args.players, args.players_per_game)
@@ -0,0 +1,341 @@
+"""
+Times the main Poker operations and CLI commands over synthetic corpora of
+growing size, and compares the results with a stored baseline.
+
+For every size, a corpus of ledgers and a player store are generated with
+the configured players, aliases, rows per player and games per day. Every
+operation then runs in a fresh process on its own copy of the store, so its
+peak RSS is its own. The report gives the wall time, runs per second, peak
+RSS and, for operations that read ledgers, throughput over the ledgers they
+read, of every operation at every size, along with the scaling exponent
+between consecutive sizes (1.0 is linear).
+
+Results are written as JSON. When a baseline is given, every operation that
+got slower than the baseline by more than the tolerance is reported, and
+the script exits with status 1.
+
+Usage (from the repository root):
+    python backend/benchmarks/bench_suite.py --sizes 100 1000 5000
+    python backend/benchmarks/bench_suite.py --update-baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from poker import Poker  # noqa: E402
+from synthetic import (make_players, write_ledger_corpus,  # noqa: E402
+                       write_player_store)
+
+MAIN_PATH = os.path.join(os.path.dirname(BENCHMARKS_DIR), "main.py")
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baselines", "suite.json")
+
+
+def add_poker_game(poker: Poker, paths: list[str]) -> None:
+    """Adds the last game to a store holding all the others."""
+    poker.add_poker_game(paths[-1])
+
+
+def add_all_games(poker: Poker, paths: list[str]) -> None:
+    """Rebuilds the store from every ledger."""
+    poker.add_all_games()
+
+
+def print_unique_nicknames(poker: Poker, paths: list[str]) -> None:
+    """Parses every ledger for its nicknames."""
+    poker.print_unique_nicknames()
+
+
+def reset_net_fields(poker: Poker, paths: list[str]) -> None:
+    """Resets the stats of a store holding every game."""
+    poker.reset_net_fields()
+
+
+# name: (operation, whether the store holds every game but the last before
+# it runs, whether it holds all of them)
+OPERATIONS = {
+    "add_poker_game": (add_poker_game, True, False),
+    "add_all_games": (add_all_games, False, False),
+    "print_unique_nicknames": (print_unique_nicknames, False, False),
+    "reset_net_fields": (reset_net_fields, False, True),
+}
+
+# name: the arguments of a CLI command, run against a store holding every
+# game, with {day} standing for the date of the last ledger
+COMMANDS = {
+    "cli pgs": ["pgs"],
+    "cli pg": ["pg", "{day}"],
+    "cli sync": ["sync"],
+    "cli rank": ["rank", "--page", "1"],
+    "cli export": ["export"],
+}
+
+# the ledgers an operation or command reads, for those that do not read
+# every ledger of the corpus. Those reading none report no ledger throughput.
+LEDGERS_READ = {
+    "add_poker_game": 1,
+    "reset_net_fields": 0,
+    "cli pg": 1,
+    "cli rank": 0,
+    "cli export": 0,
+}
+
+
+def peak_rss_mb(usage: resource.struct_rusage) -> float:
+    """Returns the peak RSS of a resource usage in megabytes."""
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    scale = 1 if sys.platform == "darwin" else 1024
+    return usage.ru_maxrss * scale / 1024 / 1024
+
+
+def make_store(workdir: str, corpus_dir: str, added: list[str]) -> Poker:
+    """
+    Copies the generated player store into a working directory, with the
+    given ledgers already added.
+    """
+    os.makedirs(workdir)
+    json_path = os.path.join(workdir, "data.json")
+    shutil.copy(os.path.join(corpus_dir, "data.json"), json_path)
+    poker = Poker(os.path.join(corpus_dir, "ledgers"), json_path)
+    if added:
+        with contextlib.redirect_stdout(io.StringIO()):
+            poker.add_games(added)
+    return poker
+
+
+def run_operation(name: str, workdir: str, corpus_dir: str,
+                  paths: list[str], results) -> None:
+    """
+    Runs one operation in a child process and sends back its wall time and
+    the peak RSS of the process.
+    """
+    operation, all_but_last, all_games = OPERATIONS[name]
+    added = paths[:-1] if all_but_last else paths if all_games else []
+    poker = make_store(workdir, corpus_dir, added)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        operation(poker, paths)
+        elapsed = time.perf_counter() - start
+    results.put((elapsed, peak_rss_mb(
+        resource.getrusage(resource.RUSAGE_SELF))))
+
+
+def time_operation(name: str, workdir: str, corpus_dir: str,
+                   paths: list[str]) -> tuple[float, float]:
+    """
+    Times an operation in a fresh process.
+
+    Returns:
+        tuple: The wall time in seconds and the peak RSS in megabytes.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=run_operation,
+                              args=(name, workdir, corpus_dir, paths,
+                                    results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def time_command(args: list[str], workdir: str) -> tuple[float, float]:
+    """
+    Times a CLI command in a fresh interpreter.
+
+    Returns:
+        tuple: The wall time in seconds and the peak RSS in megabytes.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, MAIN_PATH, *args],
+                               cwd=workdir, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args)
+    return elapsed, peak_rss_mb(usage)
+
+
+def run_size(n_ledgers: int, config: dict, tempdir: str) -> dict:
+    """
+    Generates a corpus and times every operation and command on it.
+
+    Returns:
+        dict: The wall time, runs per second, ledgers read, throughput
+        over them and peak RSS of every operation.
+    """
+    corpus_dir = os.path.join(tempdir, f"corpus{n_ledgers}")
+    players = make_players(config["players"], config["aliases"])
+    paths = write_ledger_corpus(
+        os.path.join(corpus_dir, "ledgers"), players, n_ledgers,
+        players_per_game=config["players_per_game"],
+        games_per_day=max(config["games_per_day"],
+                          math.ceil(n_ledgers / 365)),
+        sessions_per_player=config["rows_per_player"])
+    write_player_store(os.path.join(corpus_dir, "data.json"), players)
+
+    runs = {}
+    for name in OPERATIONS:
+        runs[name] = [
+            time_operation(name, os.path.join(
+                tempdir, f"{name}{n_ledgers}_{run}"), corpus_dir, paths)
+            for run in range(config["repeat"])]
+
+    # the CLI works on ledgers/ and data.json in its working directory
+    workdir = os.path.join(tempdir, f"cli{n_ledgers}")
+    make_store(workdir, corpus_dir, paths)
+    shutil.copytree(os.path.join(corpus_dir, "ledgers"),
+                    os.path.join(workdir, "ledgers"))
+    day = os.path.basename(paths[-1])[len("ledger"):-len(".csv")]
+    for name, args in COMMANDS.items():
+        runs[name] = [time_command([arg.format(day=day) for arg in args],
+                                   workdir)
+                      for _ in range(config["repeat"])]
+
+    # the fastest run is the least disturbed by the rest of the machine
+    results = {}
+    for name, timings in runs.items():
+        elapsed = min(seconds for seconds, _ in timings)
+        ledgers = LEDGERS_READ.get(name, n_ledgers)
+        results[name] = {"seconds": elapsed,
+                         "ops_per_s": 1 / elapsed,
+                         "ledgers": ledgers,
+                         "ledgers_per_s": (ledgers / elapsed if ledgers
+                                           else None),
+                         "peak_rss_mb": max(rss for _, rss in timings)}
+    return results
+
+
+def scaling(results: dict, sizes: list[int], name: str) -> list[float]:
+    """
+    Returns the log-log slope of the wall time of an operation between
+    consecutive sizes.
+    """
+    slopes = []
+    for small, large in zip(sizes, sizes[1:]):
+        ratio = (results[str(large)][name]["seconds"]
+                 / results[str(small)][name]["seconds"])
+        slopes.append(round(math.log(ratio) / math.log(large / small), 2))
+    return slopes
+
+
+def compare(results: dict, baseline: dict, tolerance: float,
+            min_seconds: float) -> list[str]:
+    """
+    Returns the operations slower than in the baseline by more than the
+    tolerance, and by more than min_seconds, at the sizes both runs
+    measured.
+    """
+    regressions = []
+    for size, operations in results["sizes"].items():
+        for name, result in operations.items():
+            before = baseline["sizes"].get(size, {}).get(name)
+            if before is None:
+                continue
+            change = result["seconds"] / before["seconds"] - 1
+            if (change > tolerance and result["seconds"] - before["seconds"]
+                    > min_seconds):
+                regressions.append(
+                    f"{name} at {size} ledgers: {before['seconds']:.3f}s -> "
+                    f"{result['seconds']:.3f}s (+{change:.0%})")
+    return regressions
+
+
+def run(sizes: list[int], config: dict) -> dict:
+    results = {}
+    with TemporaryDirectory() as tempdir:
+        for n_ledgers in sizes:
+            results[str(n_ledgers)] = run_size(n_ledgers, config, tempdir)
+
+    names = list(results[str(sizes[0])])
+    print(f"{'operation':>24} {'ledgers':>8} {'seconds':>9} "
+          f"{'ops/s':>9} {'ledgers/s':>10} {'peak MB':>8}")
+    for name in names:
+        for size in sizes:
+            result = results[str(size)][name]
+            throughput = result["ledgers_per_s"]
+            print(f"{name:>24} {size:>8} {result['seconds']:9.3f} "
+                  f"{result['ops_per_s']:9.2f} "
+                  f"{'-' if throughput is None else f'{throughput:.0f}':>10} "
+                  f"{result['peak_rss_mb']:8.1f}")
+    if len(sizes) > 1:
+        print("\nscaling exponents between sizes (1.0 is linear)")
+        for name in names:
+            print(f"{name:>24} {scaling(results, sizes, name)}")
+
+    return {"config": config, "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scaling": {name: scaling(results, sizes, name)
+                        for name in names},
+            "sizes": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[100, 500, 2000],
+                        help="numbers of ledgers to generate")
+    parser.add_argument("--players", type=int, default=40)
+    parser.add_argument("--aliases", type=int, default=2,
+                        help="nicknames per player")
+    parser.add_argument("--players-per-game", type=int, default=6)
+    parser.add_argument("--rows-per-player", type=int, default=1,
+                        help="ledger rows, that is buy-ins, per player")
+    parser.add_argument("--games-per-day", type=int, default=1,
+                        help="games per day, named ledgerMM_DD(n).csv")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs of every operation, keeping the fastest")
+    parser.add_argument("--output", help="write results as JSON to a file")
+    parser.add_argument("--baseline", default=BASELINE_PATH,
+                        help="results to compare against")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write the results to the baseline instead")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="slowdown over the baseline reported as a "
+                             "regression")
+    parser.add_argument("--min-seconds", type=float, default=0.02,
+                        help="slowdowns smaller than this are noise")
+    args = parser.parse_args()
+
+    config = {"players": args.players, "aliases": args.aliases,
+              "players_per_game": args.players_per_game,
+              "rows_per_player": args.rows_per_player,
+              "games_per_day": args.games_per_day, "repeat": args.repeat}
+    results = run(sorted(args.sizes), config)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=4)
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(results, baseline_file, indent=4)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline["config"] != config:
+            print(f"\n{args.baseline} was recorded with {baseline['config']}"
+                  ", not comparing")
+        else:
+            regressions = compare(results, baseline, args.tolerance,
+                                  args.min_seconds)
+            for regression in regressions:
+                print(f"regression: {regression}")
+            if regressions:
+                sys.exit(1)
+            print(f"\nno regressions over {args.baseline}")
@@ -0,0 +1,168 @@
+import csv
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+LEDGER_HEADER = ["player_nickname", "player_id", "session_start_at",
+                 "session_end_at", "buy_in", "buy_out", "stack", "net"]
+
+
+def make_players(n_players: int, aliases_per_player: int = 2) -> list[dict]:
+    """
+    Builds player records in the data.json schema with empty stats.
+
+    Args:
+        n_players (int): The number of players to create.
+        aliases_per_player (int): The number of nicknames per player.
+
+    Returns:
+        list: The player records.
+    """
+    players = []
+    for i in range(1, n_players + 1):
+        players.append({
+            "id": i,
+            "flag": "flags/us.png",
+            "name": f"Player {i}",
+            "putr": 0,
+            "net": 0,
+            "player_id": f"P{i}",
+            "player_nicknames": [f"p{i}_{j}"
+                                 for j in range(aliases_per_player)],
+            "games_played": [],
+            "biggest_win": 0,
+            "biggest_loss": 0,
+            "highest_net": 0,
+            "lowest_net": 0,
+            "net_history": [],
+            "games_up_most": 0,
+            "games_down_most": 0,
+            "games_up": 0,
+            "games_down": 0,
+            "average_net": 0
+        })
+    return players
+
+
+def write_player_store(json_path: str, players: list[dict]) -> None:
+    """
+    Writes player records to a JSON store.
+
+    Args:
+        json_path (str): The path of the JSON file to write.
+        players (list): The player records.
+
+    Returns:
+        None
+    """
+    with open(json_path, "w", encoding="utf-8") as json_file:
+        json.dump(players, json_file, indent=4)
+
+
+def write_ledger_corpus(ledger_folder_path: str, players: list[dict],
+                        n_ledgers: int, players_per_game: int = 6,
+                        games_per_day: int = 1, sessions_per_player: int = 1,
+                        seed: int = 0) -> list[str]:
+    """
+    Writes synthetic ledgers in the real CSV schema.
+
+    Ledgers are spread over consecutive days, with games_per_day games on
+    each day named like the real ones (ledger10_31.csv, ledger10_31(1).csv,
+    ...). The nets of every ledger sum to zero. A player with several
+    sessions busts out of all but the last one, which is still open.
+
+    Args:
+        ledger_folder_path (str): The folder to write the ledgers to.
+        players (list): The player records whose nicknames appear in the
+            ledgers.
+        n_ledgers (int): The number of ledgers to write.
+        players_per_game (int): The number of players seated in each game.
+        games_per_day (int): The number of games played on each day.
+        sessions_per_player (int): The number of rows, that is buy-ins,
+            of every seated player.
+        seed (int): The random seed.
+
+    Returns:
+        list: The paths of the written ledgers.
+
+    Raises:
+        ValueError: If the ledgers do not fit in one year of game days, since
+            ledger file names carry no year.
+    """
+    if n_ledgers > 365 * games_per_day:
+        raise ValueError(
+            f"{n_ledgers} ledgers do not fit in one year at "
+            f"{games_per_day} games per day"
+        )
+
+    rng = random.Random(seed)
+    os.makedirs(ledger_folder_path, exist_ok=True)
+    start = datetime(2023, 1, 1, 18)
+    paths = []
+
+    for i in range(n_ledgers):
+        day, game = divmod(i, games_per_day)
+        session_start = start + timedelta(days=day, minutes=game)
+        suffix = f"({game})" if game else ""
+        path = (f"{ledger_folder_path}/ledger"
+                f"{session_start.strftime('%m_%d')}{suffix}.csv")
+
+        seated = rng.sample(players, min(players_per_game, len(players)))
+        nets = [rng.randint(-40, 40) * 25 for _ in seated[:-1]]
+        nets.append(-sum(nets))
+
+        with open(path, "w", newline="", encoding="utf-8") as ledger_file:
+            writer = csv.writer(ledger_file)
+            writer.writerow(LEDGER_HEADER)
+            for player, net in zip(seated, nets):
+                buy_in = 1000
+                nickname = rng.choice(player["player_nicknames"])
+                for session in range(sessions_per_player):
+                    sat_down = session_start + timedelta(minutes=30 * session)
+                    row = [nickname, player["player_id"],
+                           sat_down.isoformat(timespec="milliseconds") + "Z"]
+                    if session + 1 < sessions_per_player:
+                        left = sat_down + timedelta(minutes=30)
+                        writer.writerow([
+                            *row,
+                            left.isoformat(timespec="milliseconds") + "Z",
+                            buy_in, 0, "", -buy_in])
+                        net += buy_in
+                    else:
+                        writer.writerow([*row, "", buy_in, "", buy_in + net,
+                                         net])
+        paths.append(path)
+
+    return paths
+
+
+def write_large_ledger(ledger_csv_path: str, players: list[dict],
+                       n_rows: int, seed: int = 0) -> None:
+    """
+    Writes a single ledger with n_rows sessions in the real CSV schema.
+
+    Args:
+        ledger_csv_path (str): The path of the ledger to write.
+        players (list): The player records whose nicknames appear in the
+            ledger.
+        n_rows (int): The number of rows to write.
+        seed (int): The random seed.
+
+    Returns:
+        None
+    """
+    rng = random.Random(seed)
+    session_start = datetime(2023, 1, 1, 18).isoformat(
+        timespec="milliseconds") + "Z"
+
+    with open(ledger_csv_path, "w", newline="",
+              encoding="utf-8") as ledger_file:
+        writer = csv.writer(ledger_file)
+        writer.writerow(LEDGER_HEADER)
+        for _ in range(n_rows):
+            player = rng.choice(players)
+            net = rng.randint(-40, 40) * 25
+            writer.writerow([rng.choice(player["player_nicknames"]),
+                             player["player_id"], session_start, "", 1000,
+                             "", 1000 + net, net])
@@ -0,0 +1,186 @@
+import numpy as np
+
+from poker_utils import to_dollars
+
+# the stats kept for every ordered pair of players, about the first player
+# in the games both played
+PAIR_FIELDS = ["games", "net", "games_up"]
+
+
+def table_pairs(game: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pairs every result with the other results of its game.
+
+    This is the product of the sparse player by game matrix with its
+    transpose, done on its entries: each game of k players contributes its
+    k * (k - 1) ordered pairs, found by offsets into the results sorted by
+    game rather than by a loop over games.
+
+    Args:
+        game (np.ndarray): The game index of every result, sorted.
+
+    Returns:
+        tuple: The positions of the first and second result of every pair.
+    """
+    if not len(game):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    counts = np.bincount(game)
+    starts = np.cumsum(counts) - counts
+    repeats = counts[game]
+    first = np.repeat(np.arange(len(game)), repeats)
+    offsets = np.arange(len(first)) - np.repeat(np.cumsum(repeats) - repeats,
+                                                repeats)
+    second = starts[game][first] + offsets
+    distinct = first != second
+    return first[distinct], second[distinct]
+
+
+def compute_pair_stats(game: np.ndarray, player: np.ndarray,
+                       net_cents: np.ndarray) -> dict[str, dict[str, list]]:
+    """
+    Computes the stats of every pair of players who shared a table.
+
+    Args:
+        game (np.ndarray): The game index of every result.
+        player (np.ndarray): The player id of every result.
+        net_cents (np.ndarray): The net of every result, in cents.
+
+    Returns:
+        dict: A dictionary mapping each player id to a dictionary mapping
+        every player they played with to the number of games they shared,
+        the first player's net in those games, in cents, and how many of
+        them the first player finished up.
+    """
+    order = np.argsort(game, kind="stable")
+    game = np.unique(game[order], return_inverse=True)[1]
+    ids, codes = np.unique(player[order], return_inverse=True)
+    net_cents = net_cents[order]
+
+    first, second = table_pairs(game)
+    pairs, pair = np.unique(codes[first] * len(ids) + codes[second],
+                            return_inverse=True)
+    games = np.bincount(pair, minlength=len(pairs))
+    nets = np.bincount(pair, weights=net_cents[first], minlength=len(pairs))
+    ups = np.bincount(pair, weights=net_cents[first] > 0,
+                      minlength=len(pairs))
+
+    stats: dict[str, dict[str, list]] = {}
+    ids = ids.tolist()
+    for code, n, net, up in zip(pairs.tolist(), games.tolist(),
+                                nets.tolist(), ups.tolist()):
+        a, b = divmod(code, len(ids))
+        stats.setdefault(ids[a], {})[ids[b]] = [n, int(net), int(up)]
+    return stats
+
+
+def shared_stats_row(stats: dict) -> dict:
+    """
+    Returns a player's stats in the games shared with another player, as
+    shown to users.
+
+    Args:
+        stats (dict): The stats of the pair, in cents.
+
+    Returns:
+        dict: The games shared and the player's net, average net and games
+        up in them, in dollars.
+    """
+    return {"games": stats["games"], "net": to_dollars(stats["net"]),
+            "average_net": to_dollars(stats["net"] / stats["games"]),
+            "games_up": stats["games_up"]}
+
+
+def manifest_results(manifest: dict) -> tuple[np.ndarray, np.ndarray,
+                                              np.ndarray]:
+    """
+    Flattens the game results of a ledger manifest into the entries of the
+    sparse player by game matrix.
+
+    Args:
+        manifest (dict): The ledger manifest.
+
+    Returns:
+        tuple: The game index, player id and net in cents of every result.
+    """
+    game, player, net_cents = [], [], []
+    for index, entry in enumerate(manifest["ledgers"].values()):
+        for player_id, net in entry["results"].items():
+            game.append(index)
+            player.append(player_id)
+            net_cents.append(net)
+    return (np.array(game, dtype=np.int64), np.array(player, dtype=str),
+            np.array(net_cents, dtype=np.int64))
+
+
+class CoplayIndex:
+    """
+    Holds how every player fared in the games they shared with each other
+    player.
+
+    The index is built from the recorded game results in one vectorized
+    pass, and a new game only updates the pairs of its own table.
+    """
+
+    def __init__(self, manifest: dict) -> None:
+        """
+        Builds the index of every game in a ledger manifest.
+
+        Args:
+            manifest (dict): The ledger manifest.
+        """
+        self._pairs = compute_pair_stats(*manifest_results(manifest))
+
+    def add_game(self, game: dict) -> None:
+        """
+        Folds one game into the pairs of its players.
+
+        Args:
+            game (dict): The game record, with the net of every player by
+                id, in cents, as its results.
+
+        Returns:
+            None
+        """
+        results = game["results"]
+        for player_id, net in results.items():
+            partners = self._pairs.setdefault(player_id, {})
+            for other_id in results:
+                if other_id == player_id:
+                    continue
+                stats = partners.setdefault(other_id, [0, 0, 0])
+                stats[0] += 1
+                stats[1] += net
+                stats[2] += net > 0
+
+    def pair(self, player_id: str, other_id: str) -> dict | None:
+        """
+        Returns how one player fared in the games shared with another.
+
+        Args:
+            player_id (str): The id of the player.
+            other_id (str): The id of the other player.
+
+        Returns:
+            dict | None: The number of games shared, the player's net in
+            them, in cents, and how many they finished up, or None if the
+            two never played together.
+        """
+        stats = self._pairs.get(player_id, {}).get(other_id)
+        if stats is None:
+            return None
+        return dict(zip(PAIR_FIELDS, stats))
+
+    def partners(self, player_id: str) -> dict[str, dict]:
+        """
+        Returns how a player fared with every player they played with.
+
+        Args:
+            player_id (str): The id of the player.
+
+        Returns:
+            dict: A dictionary mapping the ids of the other players to the
+            player's stats in their shared games, in cents.
+        """
+        return {other_id: dict(zip(PAIR_FIELDS, stats))
+                for other_id, stats in self._pairs.get(player_id, {}).items()}
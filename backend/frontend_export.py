@@ -0,0 +1,102 @@
+import gzip
+import json
+import os
+
+from poker_utils import encode_player
+from ranking_index import Leaderboard, leaderboard_row
+from site_render import write_site
+from storage import atomic_write_bytes, remove_stale_files
+
+
+def leaderboard_rows(json_data: list[dict]) -> list[dict]:
+    """
+    Returns the fields the leaderboard renders for every player.
+
+    Args:
+        json_data (list): The player records, in cents.
+
+    Returns:
+        list: One dictionary per player with the leaderboard fields, in
+        dollars.
+    """
+    return [leaderboard_row(player) for player in json_data]
+
+
+def _write_compact_json(path: str, data, compress: bool) -> None:
+    """
+    Writes data as JSON without whitespace, plus a gzipped copy at path.gz
+    when compress is set. Otherwise a gzipped copy left by an earlier run is
+    removed, so it cannot go stale.
+
+    Args:
+        path (str): The path of the JSON file to write.
+        data: The data to be saved as JSON.
+        compress (bool): Whether to also write a gzipped copy.
+
+    Returns:
+        None
+    """
+    payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    atomic_write_bytes(path, payload)
+    if compress:
+        atomic_write_bytes(f"{path}.gz", gzip.compress(payload, mtime=0))
+    elif os.path.exists(f"{path}.gz"):
+        os.unlink(f"{path}.gz")
+
+
+def write_frontend_files(json_data: list[dict], output_dir: str,
+                         compress: bool = False,
+                         leaderboard: Leaderboard | None = None,
+                         changed_ids: set[str] | None = None) -> None:
+    """
+    Writes the files the static frontend fetches.
+
+    leaderboard.json holds only the leaderboard fields, so its size depends
+    on the number of players and not on the number of games played.
+    rankings/<key>.json holds the same rows sorted by one ranking key, with
+    each player's rank, so the frontend renders them as they are.
+    players/<id>.json holds the full record, including the game history,
+    for profile.html. The same pages are also pre-rendered to HTML in
+    site/, see write_site.
+
+    The rankings are written every time, but only the files of changed
+    players are written again. The files of players no longer in json_data
+    are removed.
+
+    Args:
+        json_data (list): The player records, in cents.
+        output_dir (str): The directory to write the files to.
+        compress (bool): Whether to also write gzipped copies.
+        leaderboard (Leaderboard, optional): The up to date rankings of
+            json_data. Built from json_data when not given.
+        changed_ids (set, optional): The ids of the players changed since
+            the files were last written. Every player is written when not
+            given.
+
+    Returns:
+        None
+    """
+    players_dir = os.path.join(output_dir, "players")
+    rankings_dir = os.path.join(output_dir, "rankings")
+    os.makedirs(players_dir, exist_ok=True)
+    os.makedirs(rankings_dir, exist_ok=True)
+    if leaderboard is None:
+        leaderboard = Leaderboard(json_data)
+
+    _write_compact_json(os.path.join(output_dir, "leaderboard.json"),
+                        leaderboard_rows(json_data), compress)
+    for key, rows in leaderboard.rankings().items():
+        _write_compact_json(os.path.join(rankings_dir, f"{key}.json"),
+                            rows, compress)
+    for player in json_data:
+        path = os.path.join(players_dir, f"{player['id']}.json")
+        if (changed_ids is not None and str(player["id"]) not in changed_ids
+                and os.path.exists(path)
+                and (not compress or os.path.exists(f"{path}.gz"))):
+            continue
+        _write_compact_json(path, encode_player(player), compress)
+    suffixes = (".json", ".json.gz") if compress else (".json",)
+    remove_stale_files(players_dir, {
+        f"{player['id']}{suffix}"
+        for player in json_data for suffix in suffixes})
+    write_site(json_data, output_dir, leaderboard, changed_ids)
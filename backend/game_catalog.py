@@ -0,0 +1,298 @@
+import json
+import os
+import re
+from datetime import datetime
+
+from ledger_manifest import file_fingerprint
+from ledger_reader import read_session_start
+from storage import atomic_write_json
+
+LEDGER_NAME = re.compile(r"ledger(.*?)\.csv")
+DAY_LABEL = re.compile(r"(\d\d)_(\d\d)(.*)")
+# ledgers already reported as having no session start times
+_warned_paths: set[str] = set()
+
+
+def ledger_day(file: str) -> str:
+    """
+    Returns the day label of a ledger, taken from its file name.
+
+    Args:
+        file (str): The ledger file name, such as "ledger10_31(2).csv".
+
+    Returns:
+        str: The day label, such as "10_31(2)".
+
+    Raises:
+        ValueError: If the file name is not a ledger name.
+    """
+    match = LEDGER_NAME.search(file)
+    if match is None:
+        raise ValueError(
+            f"Unable to extract date from ledger file name: {file}")
+    return match.group(1)
+
+
+def game_id(day: str, start: str) -> str:
+    """
+    Builds the year-aware id of a game from its day label and start time.
+
+    The year comes from the start time. A game labelled in December that
+    started in January, or the other way round, crossed New Year in UTC and
+    belongs to the label's year.
+
+    Args:
+        day (str): The day label, such as "10_31(2)".
+        start (str): The ISO 8601 start time of the game.
+
+    Returns:
+        str: The game id, such as "2023-10-31(2)".
+    """
+    year = int(start[:4])
+    match = DAY_LABEL.fullmatch(day)
+    if match is None:
+        return f"{year:04d}-{day}"
+
+    month, date, suffix = match.groups()
+    start_month = int(start[5:7])
+    if month == "12" and start_month == 1:
+        year -= 1
+    elif month == "01" and start_month == 12:
+        year += 1
+    return f"{year:04d}-{month}-{date}{suffix}"
+
+
+def describe_ledger(ledger_csv_path: str) -> dict:
+    """
+    Reads the catalog entry of one ledger.
+
+    Args:
+        ledger_csv_path (str): The path to the ledger CSV.
+
+    Returns:
+        dict: The ledger's size, mtime_ns, day label, start time and game
+        id. The start time and game id are None for a ledger without
+        sessions, or without a session_start_at column, whose year only the
+        games around it can tell, see date_ledger.
+    """
+    fingerprint = file_fingerprint(ledger_csv_path)
+    day = ledger_day(os.path.basename(ledger_csv_path))
+    try:
+        start = read_session_start(ledger_csv_path)
+    except ValueError:
+        start = None
+    return {**fingerprint, "day": day, "start": start,
+            "id": None if start is None else game_id(day, start)}
+
+
+def date_ledger(entry: dict, starts: list[str], path: str) -> dict:
+    """
+    Dates a ledger without session start times by the games around it. Its
+    day label is placed in the year that brings it closest to one of the
+    other games, and it starts at midnight UTC of that day.
+
+    Args:
+        entry (dict): The ledger's entry, as returned by describe_ledger.
+        starts (list): The start times of the other catalogued games.
+        path (str): The path to the ledger, for the warning.
+
+    Returns:
+        dict: The entry with its start time and game id. Without a dated
+        game to go by, or with a day label that is not a date, the start
+        time is empty, so it sorts first, and the game id is the day label.
+    """
+    match = DAY_LABEL.fullmatch(entry["day"])
+    closest = None
+    if match is not None:
+        month, date, _ = match.groups()
+        for start in starts:
+            played = datetime.fromisoformat(start.rstrip("Z"))
+            for year in (played.year - 1, played.year, played.year + 1):
+                try:
+                    day = datetime(year, int(month), int(date))
+                except ValueError:
+                    continue
+                distance = abs(day - played)
+                if closest is None or distance < closest[0]:
+                    closest = (distance, day)
+
+    if closest is None:
+        start, message = "", "and no dated games, so its game id has no year"
+    else:
+        start = closest[1].strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        message = "taking its year from the games around it"
+    path = os.path.abspath(path)
+    if path not in _warned_paths:
+        _warned_paths.add(path)
+        print(f"Ledger has no session start times, {message}: {path}")
+    return {**entry, "start": start,
+            "id": game_id(entry["day"], start) if start else entry["day"]}
+
+
+class GameCatalog:
+    """
+    Lists the ledgers of a folder in chronological order, with the
+    year-aware id of every game.
+
+    Entries are kept in a JSON file along with each ledger's size and
+    modification time and the folder's modification time. Listing a folder
+    whose modification time is unchanged reads nothing, otherwise only new
+    or modified ledgers are read again. A ledger rewritten in place leaves
+    the folder untouched, so it is only read again when its entry is asked
+    for.
+    """
+
+    def __init__(self, ledger_folder_path: str,
+                 catalog_path: str | None = None) -> None:
+        """
+        Loads the catalog of a ledger folder.
+
+        Args:
+            ledger_folder_path (str): The path to the ledger folder.
+            catalog_path (str, optional): The JSON file the catalog is kept
+                in. When not given, the catalog lives in memory only.
+        """
+        self.ledger_folder_path = ledger_folder_path
+        self.catalog_path = catalog_path
+        self._games: dict[str, dict] = {}
+        self._folder_mtime_ns: int | None = None
+        self._order: list[str] | None = None
+
+        if catalog_path is not None and os.path.exists(catalog_path):
+            with open(catalog_path, "r", encoding="utf-8") as catalog_file:
+                catalog = json.load(catalog_file)
+            if catalog["folder"] == os.path.abspath(ledger_folder_path):
+                self._games = catalog["games"]
+                self._folder_mtime_ns = catalog.get("folder_mtime_ns")
+
+    def refresh(self) -> None:
+        """
+        Brings the catalog up to date with the ledger folder, reading the
+        ledgers that are new or whose size or modification time changed
+        since they were catalogued. Nothing is read while the folder's
+        modification time is unchanged.
+
+        Returns:
+            None
+        """
+        folder_mtime_ns = os.stat(self.ledger_folder_path).st_mtime_ns
+        if folder_mtime_ns == self._folder_mtime_ns:
+            return
+
+        games = {}
+        for file in os.listdir(self.ledger_folder_path):
+            if file.endswith(".csv"):
+                games[file] = self._current_entry(file)
+        starts = [entry["start"] for entry in games.values()
+                  if entry["start"]]
+        for file, entry in games.items():
+            if entry["start"] is None:
+                games[file] = date_ledger(
+                    entry, starts,
+                    os.path.join(self.ledger_folder_path, file))
+        self._folder_mtime_ns = folder_mtime_ns
+        if (games.keys() != self._games.keys()
+                or any(entry is not self._games[file]
+                       for file, entry in games.items())):
+            self._games = games
+            self._order = None
+        self._save()
+
+    def _current_entry(self, file: str) -> dict:
+        """
+        Returns the entry of a ledger, reading the ledger again only if it
+        changed since it was catalogued.
+        """
+        path = os.path.join(self.ledger_folder_path, file)
+        entry = self._games.get(file)
+        if entry is not None:
+            fingerprint = file_fingerprint(path)
+            if (entry["size"] == fingerprint["size"]
+                    and entry["mtime_ns"] == fingerprint["mtime_ns"]):
+                return entry
+        return describe_ledger(path)
+
+    def _save(self) -> None:
+        if self.catalog_path is not None:
+            atomic_write_json(self.catalog_path, {
+                "folder": os.path.abspath(self.ledger_folder_path),
+                "folder_mtime_ns": self._folder_mtime_ns,
+                "games": self._games,
+            })
+
+    def files(self) -> list[str]:
+        """
+        Returns the ledger file names in chronological order.
+
+        Returns:
+            list: The file names, ordered by start time and then by name.
+        """
+        self.refresh()
+        if self._order is None:
+            self._order = sorted(
+                self._games,
+                key=lambda file: (self._games[file]["start"], file))
+        return self._order
+
+    def paths(self) -> list[str]:
+        """
+        Returns the ledger paths in chronological order.
+
+        Returns:
+            list: The ledger paths.
+        """
+        return [os.path.join(self.ledger_folder_path, file)
+                for file in self.files()]
+
+    def games(self) -> list[dict]:
+        """
+        Returns the catalog entries in chronological order.
+
+        Returns:
+            list: The entries, each with the ledger's file name, size,
+            mtime_ns, day label, start time and game id.
+        """
+        return [{"file": file, **self._games[file]} for file in self.files()]
+
+    def game_ids(self) -> list[str]:
+        """
+        Returns the game ids in chronological order.
+
+        Returns:
+            list: The game ids.
+        """
+        return [self._games[file]["id"] for file in self.files()]
+
+    def entry(self, ledger_csv_path: str) -> dict:
+        """
+        Returns the catalog entry of a ledger, which may live outside the
+        catalogued folder.
+
+        The ledger is checked against its entry, so a ledger modified in
+        place is read again. A ledger without session start times takes
+        its year from the catalogued games, see date_ledger.
+
+        Args:
+            ledger_csv_path (str): The path to the ledger CSV.
+
+        Returns:
+            dict: The ledger's size, mtime_ns, day label, start time and
+            game id.
+        """
+        folder = os.path.dirname(os.path.abspath(ledger_csv_path))
+        outside = folder != os.path.abspath(self.ledger_folder_path)
+        file = os.path.basename(ledger_csv_path)
+        entry = (describe_ledger(ledger_csv_path) if outside
+                 else self._current_entry(file))
+        if entry["start"] is None:
+            starts = [game["start"] for other, game in self._games.items()
+                      if game["start"] and (outside or other != file)]
+            entry = date_ledger(entry, starts, ledger_csv_path)
+        if outside:
+            return entry
+
+        if entry is not self._games.get(file):
+            self._games[file] = entry
+            self._order = None
+            self._save()
+        return entry
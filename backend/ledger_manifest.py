@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+
+from storage import atomic_write_json
+
+# the session stats recorded with every player of a game, in this order
+SESSION_FIELDS = ["seconds", "buy_in", "sessions", "biggest_buy_in",
+                  "open_sessions"]
+
+
+def new_manifest(complete: bool) -> dict:
+    """
+    Returns an empty ledger manifest.
+
+    A manifest is complete when every game folded into the player store is
+    recorded in it, which is what allows sync to update the store in place
+    instead of rebuilding it.
+
+    Args:
+        complete (bool): Whether the player store holds no unrecorded games.
+
+    Returns:
+        dict: The empty manifest.
+    """
+    return {"complete": complete, "ledgers": {}}
+
+
+def game_order(ledgers: dict[str, dict]) -> list[str]:
+    """
+    Returns the recorded ledgers in the order their games were played.
+
+    Args:
+        ledgers (dict): The ledger entries of a manifest, by file name.
+
+    Returns:
+        list: The file names, ordered by start time and then by name.
+        Entries recorded before start times were kept sort first.
+    """
+    return sorted(ledgers,
+                  key=lambda file: (ledgers[file].get("start", ""), file))
+
+
+def load_manifest(manifest_path: str) -> dict | None:
+    """
+    Loads the ledger manifest.
+
+    Args:
+        manifest_path (str): The path to the manifest file.
+
+    Returns:
+        dict | None: The manifest, or None if it does not exist yet.
+    """
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+        return json.load(manifest_file)
+
+
+def save_manifest(manifest_path: str, manifest: dict) -> None:
+    """
+    Saves the ledger manifest.
+
+    Args:
+        manifest_path (str): The path to the manifest file.
+        manifest (dict): The manifest to save.
+
+    Returns:
+        None
+    """
+    atomic_write_json(manifest_path, manifest)
+
+
+def file_fingerprint(ledger_csv_path: str) -> dict:
+    """
+    Returns the size and modification time of a ledger.
+
+    Args:
+        ledger_csv_path (str): The path to the ledger.
+
+    Returns:
+        dict: The size in bytes and the modification time in nanoseconds.
+    """
+    stat = os.stat(ledger_csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def content_hash(ledger_csv_path: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a ledger's contents.
+
+    Args:
+        ledger_csv_path (str): The path to the ledger.
+
+    Returns:
+        str: The hex digest.
+    """
+    with open(ledger_csv_path, "rb") as ledger_file:
+        return hashlib.sha256(ledger_file.read()).hexdigest()
@@ -0,0 +1,170 @@
+import csv
+from collections.abc import Iterator
+
+from metrics import count
+
+
+def complete_rows(reader, header: list[str],
+                  ledger_csv_path: str) -> Iterator[list[str]]:
+    """
+    Yields the rows of a ledger after its header, skipping blank lines.
+
+    Args:
+        reader: The csv.reader over the ledger, past its header.
+        header (list): The columns of the ledger.
+        ledger_csv_path (str): The path to the ledger CSV, for errors.
+
+    Yields:
+        list: The fields of every row.
+
+    Raises:
+        ValueError: If a row has fewer fields than the header, such as the
+            last row of a ledger that is still being written.
+    """
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < len(header):
+            raise ValueError(f"Ledger row {reader.line_num} is truncated: "
+                             f"{ledger_csv_path}")
+        yield row
+
+
+def read_net_cents(ledger_csv_path: str) -> dict[str, int]:
+    """
+    Sums the net of every player in a ledger in a single pass over its rows.
+
+    Nets stay in integer cents, as they are stored in the ledger. Players
+    are returned in sorted order, like a pandas groupby. The rows read are
+    added to the ledger_rows counter.
+
+    Args:
+        ledger_csv_path (str): The path to the ledger CSV.
+
+    Returns:
+        dict: A dictionary mapping player nicknames to net cents.
+
+    Raises:
+        ValueError: If the ledger has no player_nickname or net column, or
+            a row is truncated or has a net that is not a whole number of
+            cents.
+    """
+    net_cents_by_player: dict[str, int] = {}
+    rows = 0
+
+    with open(ledger_csv_path, "r", newline="",
+              encoding="utf-8") as ledger_file:
+        reader = csv.reader(ledger_file)
+        header = next(reader, [])
+        try:
+            name_column = header.index("player_nickname")
+            net_column = header.index("net")
+        except ValueError:
+            raise ValueError(
+                f"Ledger is missing player_nickname or net column: "
+                f"{ledger_csv_path}"
+            ) from None
+
+        for row in complete_rows(reader, header, ledger_csv_path):
+            try:
+                net = int(row[net_column])
+            except ValueError:
+                raise ValueError(
+                    f"Ledger row {reader.line_num} has a net of "
+                    f"{row[net_column]!r}, not cents: {ledger_csv_path}"
+                ) from None
+            name = row[name_column]
+            net_cents_by_player[name] = net_cents_by_player.get(name, 0) + net
+            rows += 1
+
+    count("ledger_rows", rows)
+    return dict(sorted(net_cents_by_player.items()))
+
+
+def read_net_cents_pandas(ledger_csv_path: str) -> dict[str, int]:
+    """
+    Sums the net of every player in a ledger with pandas.
+
+    Args:
+        ledger_csv_path (str): The path to the ledger CSV.
+
+    Returns:
+        dict: A dictionary mapping player nicknames to net cents.
+    """
+    import pandas as pd
+
+    game_data = pd.read_csv(ledger_csv_path)
+    count("ledger_rows", len(game_data))
+    return {name: int(net) for name, net in
+            game_data.groupby("player_nickname")["net"].sum().items()}
+
+
+LEDGER_READERS = {
+    "csv": read_net_cents,
+    "pandas": read_net_cents_pandas,
+}
+
+
+def read_session_start(ledger_csv_path: str) -> str | None:
+    """
+    Returns the earliest session start in a ledger.
+
+    Args:
+        ledger_csv_path (str): The path to the ledger CSV.
+
+    Returns:
+        str | None: The earliest session_start_at timestamp, as the ISO 8601
+        UTC string stored in the ledger, or None if no row has one.
+
+    Raises:
+        ValueError: If the ledger has no session_start_at column.
+    """
+    with open(ledger_csv_path, "r", newline="",
+              encoding="utf-8") as ledger_file:
+        reader = csv.reader(ledger_file)
+        header = next(reader, [])
+        try:
+            start_column = header.index("session_start_at")
+        except ValueError:
+            raise ValueError(
+                f"Ledger is missing session_start_at column: "
+                f"{ledger_csv_path}"
+            ) from None
+
+        # the timestamps share one format, so they sort as strings
+        # a truncated last row cannot move the start, so it is ignored
+        return min((row[start_column] for row in reader
+                    if len(row) > start_column and row[start_column]),
+                   default=None)
+
+
+def read_player_ids(ledger_csv_path: str) -> dict[str, str]:
+    """
+    Returns the PokerNow player id every nickname in a ledger sat under.
+
+    Args:
+        ledger_csv_path (str): The path to the ledger CSV.
+
+    Returns:
+        dict: A dictionary mapping player nicknames to the player id of
+        their first row, or an empty dictionary if the ledger has no
+        player_id column.
+
+    Raises:
+        ValueError: If a row is truncated.
+    """
+    player_ids: dict[str, str] = {}
+
+    with open(ledger_csv_path, "r", newline="",
+              encoding="utf-8") as ledger_file:
+        reader = csv.reader(ledger_file)
+        header = next(reader, [])
+        if "player_id" not in header or "player_nickname" not in header:
+            return player_ids
+        name_column = header.index("player_nickname")
+        id_column = header.index("player_id")
+        for row in complete_rows(reader, header, ledger_csv_path):
+            if row[id_column]:
+                player_ids.setdefault(row[name_column], row[id_column])
+
+    return player_ids
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import time
+from collections.abc import Callable
+
+from poker import Poker
+
+
+class LedgerWatcher:
+    """
+    Watches the ledger folder and adds new ledgers as they arrive.
+
+    The folder is polled, and a ledger is only queued once its size and
+    modification time have stayed the same for a settle period, so files
+    still being downloaded are left alone. Ledgers arriving within a batch
+    window of each other are validated and added with a single save of the
+    player store. One Poker object serves the whole process, so the player
+    records, manifest and nickname index stay in memory between batches.
+    """
+
+    def __init__(self, poker: Poker, exclude_list: list[str] = [],
+                 interval: float = 1.0, settle: float = 2.0,
+                 batch_window: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Creates a watcher for the ledger folder of a Poker object.
+
+        Args:
+            poker (Poker): The Poker object ledgers are added to.
+            exclude_list (list, optional): A list of player nicknames to
+                exclude from the games. Defaults to an empty list.
+            interval (float, optional): The seconds between polls of the
+                folder. Defaults to 1.
+            settle (float, optional): The seconds a ledger must stay
+                unchanged before it is queued. Defaults to 2.
+            batch_window (float, optional): The seconds to wait for more
+                ledgers before adding a batch. Defaults to 1.
+            clock (callable, optional): The clock settle times are measured
+                with. Defaults to time.monotonic.
+        """
+        self.poker = poker
+        self.exclude_list = exclude_list
+        self.interval = interval
+        self.settle = settle
+        self.batch_window = batch_window
+        self._clock = clock
+        # size and modification time of every ledger already queued, or
+        # present when the watcher started
+        self._seen: dict[str, tuple[int, int]] = {}
+        # ledgers still changing, with when they last changed
+        self._changing: dict[str, tuple[tuple[int, int], float]] = {}
+        # settled ledgers that replace a version already seen, which are
+        # synced rather than added
+        self._rewritten: set[str] = set()
+
+    def _fingerprints(self) -> dict[str, tuple[int, int]]:
+        """
+        Returns the size and modification time of every ledger in the
+        folder.
+        """
+        fingerprints = {}
+        with os.scandir(self.poker.ledger_folder_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(".csv") and entry.is_file():
+                    stat = entry.stat()
+                    fingerprints[entry.name] = (stat.st_size,
+                                                stat.st_mtime_ns)
+        return fingerprints
+
+    def scan(self) -> list[str]:
+        """
+        Polls the folder once.
+
+        Returns:
+            list: The file names of new or rewritten ledgers that have
+            settled since the last poll.
+        """
+        now = self._clock()
+        fingerprints = self._fingerprints()
+        ready = []
+        for file, fingerprint in fingerprints.items():
+            if self._seen.get(file) == fingerprint:
+                continue
+            changing = self._changing.get(file)
+            if changing is None or changing[0] != fingerprint:
+                self._changing[file] = (fingerprint, now)
+            elif fingerprint[0] > 0 and now - changing[1] >= self.settle:
+                del self._changing[file]
+                if file in self._seen:
+                    self._rewritten.add(file)
+                self._seen[file] = fingerprint
+                ready.append(file)
+
+        for file in list(self._changing):
+            if file not in fingerprints:
+                del self._changing[file]
+        return sorted(ready)
+
+    def ingest(self, files: list[str]) -> list[str]:
+        """
+        Validates a batch of ledgers and adds the valid ones in the order
+        their games were played.
+
+        A batch holding a ledger that was rewritten after it was first seen
+        is synced instead, so the games of changed ledgers are replaced
+        rather than reported as changed.
+
+        Args:
+            files (list): The file names of the ledgers.
+
+        Returns:
+            list: The days of the games that were added or replaced.
+        """
+        rewritten = self._rewritten.intersection(files)
+        self._rewritten.difference_update(files)
+        paths = []
+        for file in files:
+            path = os.path.join(self.poker.ledger_folder_path, file)
+            try:
+                self.poker.validate_ledger(path)
+            except (FileNotFoundError, ValueError) as error:
+                print(f"Skipping {file}: {error}")
+                continue
+            paths.append(path)
+        if not paths:
+            return []
+        if rewritten:
+            return self.poker.sync(self.exclude_list)
+
+        paths.sort(key=lambda path: (
+            self.poker.catalog.entry(path)["start"], path))
+        return self.poker.add_games(paths, self.exclude_list)
+
+    async def _watch(self, queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                files = self.scan()
+            except OSError as error:
+                print(f"Failed to scan {self.poker.ledger_folder_path}: "
+                      f"{error!r}")
+                files = []
+            for file in files:
+                await queue.put(file)
+            await asyncio.sleep(self.interval)
+
+    async def _ingest_batches(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            while True:
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(),
+                                                        self.batch_window))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await asyncio.to_thread(self.ingest, batch)
+            except Exception as error:
+                # one bad batch must not stop the daemon, and its ledgers
+                # are retried once they are written again
+                print(f"Failed to add {', '.join(batch)}: {error!r}")
+
+    async def run(self, stop: asyncio.Event | None = None) -> None:
+        """
+        Syncs the player store with the folder, then adds ledgers as they
+        arrive until stopped.
+
+        Args:
+            stop (asyncio.Event, optional): Stops the watcher when set.
+                Defaults to running until cancelled.
+
+        Returns:
+            None
+        """
+        await asyncio.to_thread(self.poker.sync, self.exclude_list)
+        self._seen = self._fingerprints()
+        print(f"Watching {self.poker.ledger_folder_path} for new ledgers")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.create_task(self._watch(queue)),
+                 asyncio.create_task(self._ingest_batches(queue))]
+        if stop is not None:
+            tasks.append(asyncio.create_task(stop.wait()))
+        try:
+            done, _ = await asyncio.wait(
+                tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                # raises the error of a task that crashed
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,6 +1,20 @@
-from poker import Poker
 import click
 
+from ranking_index import RANKING_KEYS
+
+# Commands import their heavy modules themselves, so every invocation only
+# pays for what it uses. test_main.py holds the import-time budget.
+LEDGER_FOLDER_PATH = "ledgers"
+JSON_PATH = "data.json"
+# chronological list of the ledgers, refreshed when the ledger folder changes
+CATALOG_PATH = "game_catalog.json"
+# parsed ledgers by content hash, so rebuilds skip parsing unchanged ledgers
+PARSE_CACHE_PATH = "parse_cache.sqlite"
+# where leaderboard.json, rankings/, players/ and site/ are written for the
+# static frontend, which fetches them from here. They are committed with
+# data.json and rewritten by every save.
+EXPORT_DIR = "public"
+
 
 def main():
     # add_poker_game("ledgers/ledger11_09.csv", "data.json", [])
@@ -39,17 +53,74 @@ def main():
     pass
 
 
+def make_poker():
+    """
+    Imports poker and builds the Poker object the commands work on.
+
+    Returns:
+        Poker: The Poker object for the ledger folder and JSON store.
+    """
+    from poker import Poker
+
+    return Poker(LEDGER_FOLDER_PATH, JSON_PATH, export_dir=EXPORT_DIR,
+                 catalog_path=CATALOG_PATH,
+                 parse_cache_path=PARSE_CACHE_PATH)
+
+
 @click.group()
-def cli():
+@click.option('--profile', type=click.Choice(['stages', 'cprofile']),
+              help='Print the time spent in each stage, or a cProfile '
+                   'breakdown, after the command.')
+@click.option('--profile-output',
+              help='Dump cProfile stats to this file instead of printing '
+                   'them.')
+@click.option('--metrics-log', envvar='POKER_METRICS_LOG',
+              help='Append the stage timings and counters of the command to '
+                   'this JSON lines file.')
+@click.pass_context
+def cli(ctx, profile, profile_output, metrics_log):
     """Poker Game Management System."""
-    pass
+    if profile_output:
+        profile = 'cprofile'
+    if profile is None and metrics_log is None:
+        return
+    import time
+
+    from metrics import METRICS
+
+    profiler = None
+    if profile == 'cprofile':
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+
+    def report():
+        elapsed = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            if profile_output:
+                profiler.dump_stats(profile_output)
+            else:
+                import pstats
+
+                pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+        elif profile == 'stages':
+            print(METRICS.report(elapsed))
+        if metrics_log:
+            METRICS.write_json_line(metrics_log,
+                                    command=ctx.invoked_subcommand,
+                                    seconds=elapsed)
+
+    ctx.call_on_close(report)
 
 
 @cli.command()
 @click.argument('ledger_date')
 def pg(ledger_date):
     """Print the results of a poker game."""
-    poker = Poker("ledgers", "data.json")
+    poker = make_poker()
     csv_path = f"{poker.ledger_folder_path}/ledger{ledger_date}.csv"
     poker.print_game_results(csv_path)
 
@@ -57,17 +128,232 @@ def pg(ledger_date):
 @cli.command()
 def pgs():
     """Print all games."""
-    poker = Poker("ledgers", "data.json")
-    poker.print_all_games()
+    from game_catalog import GameCatalog
+
+    for game_id in GameCatalog(LEDGER_FOLDER_PATH, CATALOG_PATH).game_ids():
+        print(game_id)
 
 
 @cli.command()
 @click.argument('ledger_date')
-def ag(ledger_date):
+@click.option('--exclude', multiple=True,
+              help='Nickname to leave out of the games, such as a guest. '
+                   'Can be repeated.')
+@click.option('--auto-link', is_flag=True,
+              help='Add unknown nicknames to the players they clearly '
+                   'belong to.')
+def ag(ledger_date, exclude, auto_link):
     """Add a poker game."""
-    poker = Poker("ledgers", "data.json")
+    poker = make_poker()
+    poker.auto_link = auto_link
     csv_path = f"{poker.ledger_folder_path}/ledger{ledger_date}.csv"
-    poker.add_poker_game(csv_path)
+    poker.add_poker_game(csv_path, list(exclude))
+
+
+@cli.command()
+@click.option('--workers', default=1, show_default=True,
+              help='Number of processes parsing ledgers.')
+@click.option('--exclude', multiple=True,
+              help='Nickname to leave out of the games, such as a guest. '
+                   'Can be repeated.')
+@click.option('--auto-link', is_flag=True,
+              help='Add unknown nicknames to the players they clearly '
+                   'belong to.')
+@click.option('--force', is_flag=True,
+              help='Save even if games with unknown players are dropped '
+                   'from a rebuild or a changed ledger.')
+def sync(workers, exclude, auto_link, force):
+    """Add new and changed poker games."""
+    poker = make_poker()
+    poker.auto_link = auto_link
+    poker.sync(list(exclude), workers=workers, force=force)
+
+
+@cli.command()
+@click.option('--interval', default=1.0, show_default=True,
+              help='Seconds between polls of the ledger folder.')
+@click.option('--settle', default=2.0, show_default=True,
+              help='Seconds a ledger must stay unchanged before it is added.')
+@click.option('--batch-window', default=1.0, show_default=True,
+              help='Seconds to wait for more ledgers before adding a batch.')
+@click.option('--exclude', multiple=True,
+              help='Nickname to leave out of the games, such as a guest. '
+                   'Can be repeated.')
+@click.option('--auto-link', is_flag=True,
+              help='Add unknown nicknames to the players they clearly '
+                   'belong to.')
+def watch(interval, settle, batch_window, exclude, auto_link):
+    """Add new poker games as ledgers appear in the ledger folder."""
+    import asyncio
+
+    from ledger_watcher import LedgerWatcher
+
+    poker = make_poker()
+    poker.auto_link = auto_link
+    watcher = LedgerWatcher(poker, list(exclude), interval=interval,
+                            settle=settle, batch_window=batch_window)
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command()
+@click.option('--gzip', 'compress', is_flag=True,
+              help='Also write gzipped copies.')
+def export(compress):
+    """Write the leaderboard and player files for the frontend."""
+    poker = make_poker()
+    poker.export_frontend(EXPORT_DIR, compress)
+
+
+@cli.command()
+@click.option('--by', 'key', default='net', show_default=True,
+              type=click.Choice(list(RANKING_KEYS)),
+              help='Ranking to read.')
+@click.option('--page', default=1, show_default=True,
+              help='Page of the ranking.')
+@click.option('--size', default=20, show_default=True,
+              help='Players per page.')
+@click.option('--player', 'player_id', type=int,
+              help='Print the rank of this player id instead of a page.')
+def rank(key, page, size, player_id):
+    """Print a page of a ranking, or one player's rank, as JSON."""
+    import json
+
+    poker = make_poker()
+    if player_id is None:
+        result = poker.leaderboard_page(key, page, size)
+    else:
+        result = poker.player_rank(player_id, key)
+    print(json.dumps(result))
+
+
+@cli.command()
+@click.argument('player_id', type=int)
+@click.option('--start', help='First date to include, such as 2023-10-01.')
+@click.option('--end', help='Last date to include, such as 2023-10-31.')
+@click.option('--max-points', type=int,
+              help='Downsample the history to this many points.')
+def history(player_id, start, end, max_points):
+    """Print a player's cumulative net after every game as JSON."""
+    import json
+
+    poker = make_poker()
+    print(json.dumps(poker.player_history(player_id, start, end,
+                                          max_points)))
+
+
+@cli.command()
+@click.option('--host', default='127.0.0.1', show_default=True,
+              help='Address to listen on.')
+@click.option('--port', default=8000, show_default=True,
+              help='Port to listen on.')
+def serve(host, port):
+    """Serve the leaderboard, players, games and histories over HTTP."""
+    from api_server import ApiServer
+
+    server = ApiServer(make_poker(), host, port)
+    print(f"Serving on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@cli.command()
+@click.argument('player_id', type=int)
+@click.option('--with', 'other_id', type=int,
+              help='Print the head-to-head with this player id instead.')
+def partners(player_id, other_id):
+    """Print how a player fares with each player they played with as JSON."""
+    import json
+
+    poker = make_poker()
+    if other_id is None:
+        result = poker.partners(player_id)
+    else:
+        result = poker.head_to_head(player_id, other_id)
+    print(json.dumps(result))
+
+
+@cli.command()
+@click.argument('player_id', type=int)
+def sessions(player_id):
+    """Print a player's hours, hourly rate and buy-ins as JSON."""
+    import json
+
+    poker = make_poker()
+    print(json.dumps(poker.session_stats(player_id)))
+
+
+@cli.command()
+@click.argument('nickname')
+@click.option('--player-id', help='The PokerNow player id of the nickname.')
+@click.option('--limit', default=5, show_default=True,
+              help='Most candidates to print.')
+def resolve(nickname, player_id, limit):
+    """Print the players a nickname most likely belongs to as JSON."""
+    import json
+
+    poker = make_poker()
+    print(json.dumps(poker.nickname_candidates(nickname, player_id, limit)))
+
+
+@cli.command(name='convert-ids')
+def convert_ids():
+    """Replace the day labels of older games with year-aware game ids."""
+    poker = make_poker()
+    poker.convert_game_ids()
+
+
+@cli.command()
+def recompute():
+    """Recompute all player stats from the recorded game results."""
+    poker = make_poker()
+    poker.recompute_stats()
+
+
+@cli.command(name='sqlite-import')
+@click.argument('db_path')
+def sqlite_import(db_path):
+    """Copy the JSON player store into a SQLite database."""
+    from player_store import migrate_json_to_sqlite
+
+    migrate_json_to_sqlite(JSON_PATH, db_path)
+
+
+@cli.command(name='sqlite-export')
+@click.argument('db_path')
+def sqlite_export(db_path):
+    """Write a SQLite database back to the JSON player store."""
+    from player_store import export_sqlite_to_json
+
+    export_sqlite_to_json(db_path, JSON_PATH)
+
+
+@cli.command()
+def migrate():
+    """Upgrade every player record to the current schema version."""
+    poker = make_poker()
+    poker.migrate_store()
+
+
+@cli.command(name='convert-layout')
+@click.argument('json_path')
+@click.argument('output_path')
+@click.option('--layout', type=click.Choice(['list', 'by_name']),
+              default='list', show_default=True,
+              help='list writes the data.json layout, by_name the '
+                   'restructured_data.json layout.')
+def convert_layout(json_path, output_path, layout):
+    """Convert a JSON player store between the two layouts."""
+    from migrations import migrate_json_file
+
+    migrated, total = migrate_json_file(json_path, output_path, layout)
+    print(f"Wrote {total} players to {output_path}, {migrated} upgraded")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+class Metrics:
+    """
+    Collects the time spent in each stage of ingestion and counters such as
+    rows parsed and bytes written.
+
+    A span costs two clock reads, so stages are always timed. Work done in
+    worker processes is not collected.
+    """
+
+    def __init__(self) -> None:
+        # stage name: [calls, seconds]
+        self.spans: dict[str, list] = {}
+        self.counters: dict[str, int] = {}
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        Times the enclosed block as one call of a stage.
+
+        Args:
+            name (str): The name of the stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = self.spans.get(name)
+            if stats is None:
+                self.spans[name] = [1, elapsed]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        Adds to a counter.
+
+        Args:
+            name (str): The name of the counter.
+            value (int, optional): The amount to add. Defaults to 1.
+
+        Returns:
+            None
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        """
+        Clears every span and counter.
+        """
+        self.spans = {}
+        self.counters = {}
+
+    def snapshot(self) -> dict:
+        """
+        Returns the spans and counters collected so far.
+
+        Returns:
+            dict: The calls and seconds of every stage as "spans" and the
+            counters as "counters".
+        """
+        return {"spans": {name: {"calls": calls, "seconds": seconds}
+                          for name, (calls, seconds) in self.spans.items()},
+                "counters": dict(self.counters)}
+
+    def report(self, total_seconds: float | None = None) -> str:
+        """
+        Formats the stage breakdown and counters as a table.
+
+        Args:
+            total_seconds (float, optional): The wall time of the whole
+                command, to show each stage's share of it.
+
+        Returns:
+            str: The table, slowest stage first.
+        """
+        lines = [f"{'stage':<20} {'calls':>7} {'seconds':>9} {'share':>6}"]
+        for name, (calls, seconds) in sorted(
+                self.spans.items(), key=lambda item: -item[1][1]):
+            share = (f"{seconds / total_seconds:6.1%}" if total_seconds
+                     else "")
+            lines.append(f"{name:<20} {calls:>7} {seconds:9.4f} {share:>6}")
+        if total_seconds is not None:
+            lines.append(f"{'total':<20} {'':>7} {total_seconds:9.4f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<20} {value:>17}")
+        return "\n".join(lines)
+
+    def write_json_line(self, path: str, **fields) -> None:
+        """
+        Appends the spans and counters to a JSON lines file, as one record
+        with a UTC timestamp and the given fields.
+
+        Args:
+            path (str): The path of the JSON lines file.
+            **fields: Fields to add to the record, such as the command.
+
+        Returns:
+            None
+        """
+        record = {"time": datetime.now(timezone.utc).isoformat(
+                      timespec="seconds"),
+                  **fields, **self.snapshot()}
+        with open(path, "a", encoding="utf-8") as metrics_file:
+            metrics_file.write(json.dumps(record) + "\n")
+
+
+# the metrics of this process, collected by every Poker object
+METRICS = Metrics()
+span = METRICS.span
+count = METRICS.count
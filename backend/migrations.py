@@ -0,0 +1,386 @@
+import copy
+import json
+import re
+from itertools import chain
+from typing import Callable, Iterable, Iterator
+
+from metrics import count
+from storage import atomic_open
+
+# the stats of a player without games, which resetting a player restores
+STAT_DEFAULTS = {
+    "net": 0,
+    "games_played": [],
+    "biggest_win": 0,
+    "biggest_loss": 0,
+    "highest_net": 0,
+    "lowest_net": 0,
+    "net_history": [],
+    "games_up_most": 0,
+    "games_down_most": 0,
+    "games_up": 0,
+    "games_down": 0,
+    "average_net": 0,
+}
+# characters read from a JSON file at a time when streaming it
+CHUNK_SIZE = 1 << 16
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def add_fields(defaults: dict) -> Callable[[dict], None]:
+    """
+    Returns a migration step that gives every record the fields it is
+    missing, set to their defaults. Fields a record already has are kept.
+
+    Args:
+        defaults (dict): The fields to add and their default values.
+
+    Returns:
+        Callable: The migration step.
+    """
+    def step(player: dict) -> None:
+        for field, default in defaults.items():
+            if field not in player:
+                player[field] = copy.deepcopy(default)
+    return step
+
+
+def _net_history_from_net_dictionary(player: dict) -> None:
+    """
+    Replaces the net_dictionary of older records, which kept one cumulative
+    net per date, with a net_history. Games on the same date share its last
+    value until the stats are recomputed.
+    """
+    if "net_dictionary" not in player:
+        return
+    net_by_date = player.pop("net_dictionary")
+    net = 0
+    player["net_history"] = []
+    for day in player.get("games_played", []):
+        net = net_by_date.get(day[:5], net)
+        player["net_history"].append(net)
+
+
+# step that upgrades a record from the previous schema version to the
+# version it is keyed by. Records without a schema_version are version 0.
+# To add a field, register add_fields({"field": default}) under the next
+# version.
+MIGRATIONS: dict[int, Callable[[dict], None]] = {
+    1: _net_history_from_net_dictionary,
+    2: add_fields({"player_id": "", "player_nicknames": [],
+                   **STAT_DEFAULTS}),
+}
+SCHEMA_VERSION = max(MIGRATIONS)
+
+
+def upgrade_player(player: dict, version: int = SCHEMA_VERSION) -> bool:
+    """
+    Applies the migration steps a player record is missing, in place, and
+    records the version it was upgraded to in its schema_version field.
+
+    Args:
+        player (dict): The player record, in dollars.
+        version (int, optional): The schema version to upgrade to. Defaults
+            to SCHEMA_VERSION.
+
+    Returns:
+        bool: True if the record was upgraded, False if it already was at
+        version.
+
+    Raises:
+        ValueError: If the record was written by a newer schema than this
+            code knows.
+    """
+    current = player.get("schema_version", 0)
+    if current > SCHEMA_VERSION:
+        raise ValueError(f"{player.get('name', player.get('id'))} has schema "
+                         f"version {current}, newer than {SCHEMA_VERSION}")
+    if current >= version:
+        return False
+    for step in range(current + 1, version + 1):
+        MIGRATIONS[step](player)
+    player["schema_version"] = version
+    return True
+
+
+def to_name_keyed(player: dict) -> tuple[str, dict]:
+    """
+    Splits a record of the data.json layout into the name and record of the
+    restructured_data.json layout.
+
+    Args:
+        player (dict): The player record.
+
+    Returns:
+        tuple: The player's name and the rest of their record.
+    """
+    return player["name"], {field: value for field, value in player.items()
+                            if field != "name"}
+
+
+def from_name_keyed(name: str, record: dict) -> dict:
+    """
+    Joins a name and record of the restructured_data.json layout into a
+    record of the data.json layout.
+
+    Args:
+        name (str): The player's name.
+        record (dict): The rest of their record.
+
+    Returns:
+        dict: The player record, with id, flag and name first.
+    """
+    player = {"id": record["id"], "flag": record["flag"], "name": name}
+    player.update(record)
+    return player
+
+
+class _JsonStream:
+    """
+    Reads a JSON document one value at a time, holding only the value being
+    decoded and one chunk of the file in memory.
+    """
+
+    def __init__(self, json_file, chunk_size: int = CHUNK_SIZE) -> None:
+        self._file = json_file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """
+        Appends the next chunk to the unread part of the buffer.
+
+        Returns:
+            bool: False at the end of the file.
+        """
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character, or "" at the end
+        of the file.
+        """
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, characters: str) -> str:
+        """
+        Consumes the next character, which must be one of characters.
+
+        Raises:
+            ValueError: If the next character is not one of characters.
+        """
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(f"expected one of {characters!r} but found "
+                             f"{character or 'the end of the file'!r}")
+        self._pos += 1
+        return character
+
+    def value(self):
+        """
+        Decodes the next value.
+
+        Raises:
+            json.JSONDecodeError: If the value is not valid JSON.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number at the end of the buffer may go on in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def members(self) -> Iterator[tuple[str, object]]:
+        """
+        Yields the keys and values of the object starting at the next
+        character, one member at a time.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key, self.value()
+            if self.expect(",}") == "}":
+                return
+
+
+def _open_layout(stream: _JsonStream) -> tuple[str, Iterator[dict]]:
+    """
+    Tells the layout of a JSON player store from its first member and
+    returns the layout and an iterator over its records.
+    """
+    stream.expect("[")
+    if stream.peek() == "]":
+        return "list", iter(())
+    members = stream.members()
+    first = next(members, None)
+    if first is None:
+        # [{}] is a name-keyed store without players
+        return "by_name", _by_name_records(stream, iter(()))
+    if isinstance(first[1], dict):
+        return "by_name", _by_name_records(stream, chain([first], members))
+    return "list", _list_records(stream, chain([first], members))
+
+
+def _by_name_records(stream: _JsonStream, members: Iterator) -> Iterator[dict]:
+    for name, record in members:
+        yield from_name_keyed(name, record)
+    if stream.expect(",]") == ",":
+        raise ValueError("a name-keyed store holds a single object")
+
+
+def _list_records(stream: _JsonStream, members: Iterator) -> Iterator[dict]:
+    yield dict(members)
+    while stream.expect(",]") == ",":
+        yield stream.value()
+
+
+def json_layout(json_path: str) -> str:
+    """
+    Returns the layout of a JSON player store: "list" for a list of player
+    records like data.json, or "by_name" for a list holding one object that
+    maps each player's name to the rest of their record, like
+    restructured_data.json.
+
+    Args:
+        json_path (str): The path to the JSON file.
+
+    Returns:
+        str: The layout, a key of JSON_LAYOUTS.
+    """
+    with open(json_path, "r", encoding="utf-8") as json_file:
+        return _open_layout(_JsonStream(json_file))[0]
+
+
+def iter_json_layout(json_path: str,
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Reads player records from either JSON layout one record at a time, so
+    memory stays bounded by the largest record rather than the store.
+
+    Args:
+        json_path (str): The path to the JSON file.
+        chunk_size (int, optional): The characters read at a time.
+            Defaults to CHUNK_SIZE.
+
+    Yields:
+        dict: The player records in the data.json layout, in dollars.
+    """
+    with open(json_path, "r", encoding="utf-8") as json_file:
+        yield from _open_layout(_JsonStream(json_file, chunk_size))[1]
+
+
+def _indented(text: str, spaces: int) -> str:
+    """
+    Indents every line of JSON text, whose strings never hold a raw line
+    break.
+    """
+    return " " * spaces + text.replace("\n", "\n" + " " * spaces)
+
+
+def _list_chunks(players: Iterable[dict]) -> Iterator[str]:
+    separator = "[\n"
+    for player in players:
+        yield separator + _indented(json.dumps(player, indent=4), 4)
+        separator = ",\n"
+    yield "[]" if separator == "[\n" else "\n]"
+
+
+def _by_name_chunks(players: Iterable[dict]) -> Iterator[str]:
+    separator = "[\n    {\n"
+    for player in players:
+        name, record = to_name_keyed(player)
+        yield (separator + " " * 8 + json.dumps(name) + ": "
+               + _indented(json.dumps(record, indent=4), 8).lstrip())
+        separator = ",\n"
+    yield "[\n    {}\n]" if separator == "[\n    {\n" else "\n    }\n]"
+
+
+# writers of each JSON layout, formatted as json.dumps(..., indent=4) would
+JSON_LAYOUTS = {
+    "list": _list_chunks,
+    "by_name": _by_name_chunks,
+}
+
+
+def write_json_layout(json_path: str, players: Iterable[dict],
+                      layout: str = "list") -> None:
+    """
+    Atomically writes player records in a JSON layout one record at a time,
+    so the records can be streamed from another store.
+
+    Args:
+        json_path (str): The path of the JSON file to write.
+        players (Iterable): The player records in the data.json layout.
+        layout (str, optional): The layout to write, a key of
+            JSON_LAYOUTS. Defaults to "list".
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the layout is unknown.
+    """
+    if layout not in JSON_LAYOUTS:
+        raise ValueError(f"unknown layout {layout}, expected one of "
+                         f"{', '.join(JSON_LAYOUTS)}")
+    with atomic_open(json_path) as json_file:
+        for chunk in JSON_LAYOUTS[layout](players):
+            json_file.write(chunk.encode("utf-8"))
+
+
+def migrate_json_file(json_path: str, output_path: str | None = None,
+                      layout: str | None = None) -> tuple[int, int]:
+    """
+    Upgrades every record of a JSON player store to SCHEMA_VERSION,
+    streaming the records through one at a time.
+
+    Args:
+        json_path (str): The path to the JSON file, in either layout.
+        output_path (str, optional): The path to write the upgraded store
+            to. Defaults to json_path, which is replaced atomically.
+        layout (str, optional): The layout to write, a key of
+            JSON_LAYOUTS. Defaults to the layout of json_path, so passing
+            a layout converts between them.
+
+    Returns:
+        tuple: The number of records upgraded and the number of records.
+    """
+    layout = layout or json_layout(json_path)
+    totals = [0, 0]
+
+    def upgraded() -> Iterator[dict]:
+        for player in iter_json_layout(json_path):
+            totals[0] += upgrade_player(player)
+            totals[1] += 1
+            yield player
+
+    write_json_layout(output_path or json_path, upgraded(), layout)
+    count("records_migrated", totals[0])
+    return totals[0], totals[1]
@@ -0,0 +1,116 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable
+from itertools import accumulate
+
+
+def day_key(day: str) -> str:
+    """
+    Returns the date part of a game id, dropping the suffix that tells
+    games on the same date apart.
+
+    Args:
+        day (str): The game id, such as "2023-10-31(2)".
+
+    Returns:
+        str: The date, such as "2023-10-31".
+    """
+    return day.split("(")[0]
+
+
+def game_nets(history: list[int]) -> list[int]:
+    """
+    Returns the net of every game from a cumulative net history.
+
+    Args:
+        history (list): The cumulative net after every game, in cents.
+
+    Returns:
+        list: The net of every game, in cents.
+    """
+    return [net - previous
+            for previous, net in zip([0] + history[:-1], history)]
+
+
+def sort_history(days: list[str], history: list[int],
+                 key: Callable[[str], object] | None = None
+                 ) -> tuple[list[str], list[int]]:
+    """
+    Sorts a player's games and rebuilds the cumulative history in the new
+    order.
+
+    Args:
+        days (list): The game ids, in the order they were folded.
+        history (list): The cumulative net after every game, in cents.
+        key (callable, optional): The sort key of a game id. Defaults to
+            the id itself.
+
+    Returns:
+        tuple: The sorted game ids and their cumulative history.
+    """
+    if key is None:
+        key = str
+    games = sorted(zip(days, game_nets(history)),
+                   key=lambda game: key(game[0]))
+    return ([day for day, _ in games],
+            list(accumulate(net for _, net in games)))
+
+
+def history_range(days: list[str], history: list[int],
+                  start: str | None = None, end: str | None = None
+                  ) -> tuple[list[str], list[int]]:
+    """
+    Returns the part of a history between two dates, both included.
+
+    The days must be sorted, as they are when games are added in ledger
+    order or after sort_history.
+
+    Args:
+        days (list): The sorted game days.
+        history (list): The cumulative net after every game, in cents.
+        start (str, optional): The first date, such as "2023-10-01".
+            Defaults to the first game.
+        end (str, optional): The last date, such as "2023-10-31". Defaults
+            to the last game.
+
+    Returns:
+        tuple: The game days and cumulative nets in the range.
+    """
+    first = 0 if start is None else bisect_left(days, start, key=day_key)
+    last = (len(days) if end is None
+            else bisect_right(days, end, key=day_key))
+    return days[first:last], history[first:last]
+
+
+def downsample(history: list[int], max_points: int) -> list[int]:
+    """
+    Picks the points of a history to chart when it has too many.
+
+    The history is split into buckets, and the lowest and highest point of
+    every bucket are kept, so peaks and troughs survive. The first and last
+    points are always kept.
+
+    Args:
+        history (list): The cumulative net after every game.
+        max_points (int): The largest number of points to keep, at least 2.
+
+    Returns:
+        list: The sorted positions of the points to keep.
+
+    Raises:
+        ValueError: If max_points is below 2.
+    """
+    if max_points < 2:
+        raise ValueError("At least 2 points must be kept")
+    if len(history) <= max_points:
+        return list(range(len(history)))
+
+    buckets = (max_points - 2) // 2
+    inner = len(history) - 2
+    keep = {0, len(history) - 1}
+    for bucket in range(buckets):
+        start = 1 + bucket * inner // buckets
+        stop = 1 + (bucket + 1) * inner // buckets
+        positions = range(start, stop)
+        keep.add(min(positions, key=history.__getitem__))
+        keep.add(max(positions, key=history.__getitem__))
+    return sorted(keep)
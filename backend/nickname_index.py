@@ -0,0 +1,96 @@
+class NicknameIndex:
+    """
+    Maps every player nickname to the position of its player record.
+
+    The index stores positions rather than the records themselves, so it
+    stays valid across reloads of an unchanged JSON file and resolving a
+    game's roster costs O(roster size) regardless of how many players the
+    store holds.
+    """
+
+    def __init__(self, json_data: list[dict]) -> None:
+        """
+        Builds the index from the player records.
+
+        Args:
+            json_data (list): The player records.
+
+        Raises:
+            ValueError: If a nickname belongs to more than one player or is
+                listed more than once for the same player.
+        """
+        self._positions: dict[str, int] = {}
+        problems: list[str] = []
+
+        for position, player in enumerate(json_data):
+            seen: set[str] = set()
+            for name in player["player_nicknames"]:
+                owner = self._positions.setdefault(name, position)
+                if owner != position:
+                    problems.append(
+                        f"'{name}' is ambiguous between "
+                        f"{json_data[owner]['name']} and {player['name']}"
+                    )
+                elif name in seen:
+                    problems.append(
+                        f"'{name}' is listed twice for {player['name']}"
+                    )
+                seen.add(name)
+
+        if problems:
+            raise ValueError("Invalid player nicknames: "
+                             + "; ".join(problems))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def resolve(self, name: str) -> int | None:
+        """
+        Returns the position of the player with the given nickname.
+
+        Args:
+            name (str): The nickname to look up.
+
+        Returns:
+            int | None: The position of the player record, or None if the
+            nickname is unknown.
+        """
+        return self._positions.get(name)
+
+    def unknown(self, names) -> list[str]:
+        """
+        Returns the names that do not belong to any player.
+
+        Args:
+            names (Iterable[str]): The nicknames to check.
+
+        Returns:
+            list: The unknown nicknames, in the given order.
+        """
+        return [name for name in names if name not in self._positions]
+
+    def group_nets(self, net_winnings_by_player: dict[str, float]
+                   ) -> dict[int, float]:
+        """
+        Sums the net winnings of every known player across their nicknames.
+
+        A player who sat under two aliases in the same game is counted once
+        with the combined net.
+
+        Args:
+            net_winnings_by_player (dict): A dictionary mapping nicknames to
+                net winnings.
+
+        Returns:
+            dict: A dictionary mapping player positions to net winnings.
+        """
+        net_winnings_by_position: dict[int, float] = {}
+        for name, net in net_winnings_by_player.items():
+            position = self._positions.get(name)
+            if position is not None:
+                net_winnings_by_position[position] = (
+                    net_winnings_by_position.get(position, 0) + net)
+        return net_winnings_by_position
@@ -0,0 +1,219 @@
+import json
+import sqlite3
+import time
+from array import array
+from collections.abc import Callable
+
+from ledger_manifest import SESSION_FIELDS, content_hash
+from ledger_reader import read_net_cents, read_player_ids
+from metrics import count
+from sessions import read_sessions
+
+# bump whenever a parser changes what it returns, so older entries are
+# never read back
+PARSER_VERSION = 3
+# the cache drops its least recently used ledgers beyond this many bytes
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+
+PARSE_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledgers (
+    key TEXT PRIMARY KEY,
+    roster TEXT NOT NULL,
+    nets BLOB NOT NULL,
+    session_names TEXT NOT NULL,
+    sessions BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ledgers_last_used ON ledgers (last_used);
+"""
+
+
+def parse_ledger(ledger_csv_path: str,
+                 read_net_cents: Callable[[str], dict[str, int]]
+                 = read_net_cents) -> dict:
+    """
+    Parses everything the player store needs from a ledger.
+
+    Args:
+        ledger_csv_path (str): The path to the ledger CSV.
+        read_net_cents (callable, optional): The reader summing the net of
+            every nickname. Defaults to the streaming CSV reader.
+
+    Returns:
+        dict: The net cents by nickname as "nets", the session stats by
+        nickname as "sessions" and the PokerNow player id of every nickname
+        as "player_ids".
+
+    Raises:
+        ValueError: If the ledger is missing a column.
+    """
+    return {"nets": read_net_cents(ledger_csv_path),
+            "sessions": read_sessions(ledger_csv_path),
+            "player_ids": read_player_ids(ledger_csv_path)}
+
+
+class ParseCache:
+    """
+    Keeps parsed ledgers on disk, keyed by the hash of their content and
+    the parser version, so parsing a ledger again only costs hashing it.
+
+    Every ledger is one SQLite row holding its roster, with the player id
+    of every nickname, and its nets and session stats as packed int64
+    columns. When the cache outgrows its size
+    cap, the least recently used ledgers are dropped.
+    """
+
+    def __init__(self, cache_path: str,
+                 max_bytes: int = MAX_CACHE_BYTES) -> None:
+        """
+        Opens a cache, creating it on first use.
+
+        Args:
+            cache_path (str): The path to the SQLite cache file.
+            max_bytes (int, optional): The size cap of the cached ledgers,
+                in bytes. Defaults to MAX_CACHE_BYTES.
+        """
+        self.path = cache_path
+        self.max_bytes = max_bytes
+        self._connection: sqlite3.Connection | None = None
+        # the size of all cached ledgers, kept up to date by put
+        self._total_bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            # callers serialise access, but may do so from several threads
+            self._connection = sqlite3.connect(self.path,
+                                               check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+            self._connection.executescript(PARSE_CACHE_SCHEMA)
+            self._total_bytes = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM ledgers").fetchone()[0]
+        return self._connection
+
+    def close(self) -> None:
+        """
+        Closes the cache file.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def key(self, ledger_csv_path: str) -> str:
+        """
+        Returns the cache key of a ledger.
+
+        Args:
+            ledger_csv_path (str): The path to the ledger CSV.
+
+        Returns:
+            str: The content hash of the ledger and the parser version.
+        """
+        return f"{content_hash(ledger_csv_path)}:{PARSER_VERSION}"
+
+    def get(self, key: str) -> dict | None:
+        """
+        Returns a cached ledger, marking it as recently used.
+
+        Args:
+            key (str): The cache key of the ledger.
+
+        Returns:
+            dict | None: The parsed ledger, or None if it is not cached.
+        """
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT roster, nets, session_names, sessions FROM ledgers "
+            "WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with connection:
+            connection.execute(
+                "UPDATE ledgers SET last_used = ? WHERE key = ?",
+                (time.time_ns(), key))
+
+        roster, nets, session_names, sessions = row
+        nets = array("q", nets).tolist()
+        sessions = array("q", sessions).tolist()
+        width = len(SESSION_FIELDS)
+        roster = json.loads(roster)
+        return {"nets": dict(zip(roster["nicknames"], nets)),
+                "sessions": dict(zip(json.loads(session_names),
+                                     (sessions[start:start + width]
+                                      for start in range(0, len(sessions),
+                                                         width)))),
+                "player_ids": roster["player_ids"]}
+
+    def put(self, key: str, parsed: dict) -> None:
+        """
+        Caches a parsed ledger, then evicts the least recently used ledgers
+        while the cache is over its size cap.
+
+        Args:
+            key (str): The cache key of the ledger.
+            parsed (dict): The parsed ledger, as returned by parse_ledger.
+
+        Returns:
+            None
+        """
+        roster = json.dumps({"nicknames": list(parsed["nets"]),
+                             "player_ids": parsed["player_ids"]})
+        nets = array("q", parsed["nets"].values()).tobytes()
+        session_names = json.dumps(list(parsed["sessions"]))
+        sessions = array("q", [value for stats in parsed["sessions"].values()
+                               for value in stats]).tobytes()
+        size = len(roster) + len(nets) + len(session_names) + len(sessions)
+
+        connection = self._connect()
+        with connection:
+            replaced = connection.execute(
+                "SELECT size FROM ledgers WHERE key = ?", (key,)).fetchone()
+            connection.execute(
+                "INSERT OR REPLACE INTO ledgers (key, roster, nets, "
+                "session_names, sessions, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, roster, nets, session_names, sessions, size,
+                 time.time_ns()))
+            total = self._total_bytes + size - (replaced[0] if replaced
+                                                else 0)
+            if total > self.max_bytes:
+                evicted = []
+                for old_key, old_size in connection.execute(
+                        "SELECT key, size FROM ledgers "
+                        "ORDER BY last_used, key"):
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append((old_key,))
+                    total -= old_size
+                connection.executemany("DELETE FROM ledgers WHERE key = ?",
+                                       evicted)
+        self._total_bytes = total
+
+    def parse(self, ledger_csv_path: str,
+              parser: Callable[[str], dict] = parse_ledger) -> dict:
+        """
+        Returns a parsed ledger from the cache, parsing and caching it on a
+        miss.
+
+        Args:
+            ledger_csv_path (str): The path to the ledger CSV.
+            parser (callable, optional): Parses a ledger on a miss. Defaults
+                to parse_ledger.
+
+        Returns:
+            dict: The parsed ledger.
+        """
+        key = self.key(ledger_csv_path)
+        parsed = self.get(key)
+        if parsed is None:
+            count("parse_cache_misses")
+            parsed = parser(ledger_csv_path)
+            self.put(key, parsed)
+        else:
+            count("parse_cache_hits")
+        return parsed
+
+    def __len__(self) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM ledgers").fetchone()[0]
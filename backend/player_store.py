@@ -0,0 +1,421 @@
+import json
+import os
+import sqlite3
+
+from ledger_manifest import SESSION_FIELDS, load_manifest, save_manifest
+from migrations import iter_json_layout
+from poker_utils import decode_player, encode_player
+from storage import atomic_write_json, file_lock, rotate_snapshots
+
+# player fields stored as columns of the players table, in data.json order
+SCALAR_FIELDS = ["id", "flag", "name", "putr", "net", "player_id"]
+STAT_FIELDS = ["biggest_win", "biggest_loss", "highest_net", "lowest_net",
+               "games_up_most", "games_down_most", "games_up", "games_down",
+               "average_net"]
+# player fields stored as JSON text
+LIST_FIELDS = ["games_played", "net_history"]
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    flag TEXT,
+    name TEXT NOT NULL,
+    putr REAL,
+    net INTEGER,
+    player_id TEXT,
+    biggest_win INTEGER,
+    biggest_loss INTEGER,
+    highest_net INTEGER,
+    lowest_net INTEGER,
+    games_up_most INTEGER,
+    games_down_most INTEGER,
+    games_up INTEGER,
+    games_down INTEGER,
+    average_net REAL,
+    games_played TEXT NOT NULL,
+    net_history TEXT NOT NULL,
+    extra TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS players_position ON players (position);
+CREATE TABLE IF NOT EXISTS nicknames (
+    nickname TEXT PRIMARY KEY,
+    player INTEGER NOT NULL REFERENCES players (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nicknames_player ON nicknames (player);
+CREATE TABLE IF NOT EXISTS games (
+    file TEXT PRIMARY KEY,
+    day TEXT NOT NULL,
+    start TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    up_most TEXT NOT NULL,
+    down_most TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    file TEXT NOT NULL REFERENCES games (file) ON DELETE CASCADE,
+    player INTEGER NOT NULL,
+    net INTEGER NOT NULL,
+    PRIMARY KEY (file, player)
+);
+CREATE INDEX IF NOT EXISTS results_player ON results (player);
+CREATE TABLE IF NOT EXISTS sessions (
+    file TEXT NOT NULL REFERENCES games (file) ON DELETE CASCADE,
+    player INTEGER NOT NULL,
+    seconds INTEGER NOT NULL,
+    buy_in INTEGER NOT NULL,
+    sessions INTEGER NOT NULL,
+    biggest_buy_in INTEGER NOT NULL,
+    open_sessions INTEGER NOT NULL,
+    PRIMARY KEY (file, player)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class JsonPlayerStore:
+    """
+    Keeps the player records in a single JSON array and the ledger manifest
+    in a JSON file next to it. Every save rewrites the whole file.
+
+    Amounts are stored in dollars, as the frontend reads them, and handed
+    to Poker in cents.
+    """
+
+    def __init__(self, json_path: str, manifest_path: str | None = None,
+                 snapshots: int = 0) -> None:
+        """
+        Args:
+            json_path (str): The path to the JSON file.
+            manifest_path (str, optional): The path to the ledger manifest.
+                Defaults to ledger_manifest.json next to the JSON file.
+            snapshots (int, optional): The number of previous versions of
+                the JSON file to keep as json_path.1, json_path.2, ...
+                Defaults to 0.
+        """
+        self.path: str = json_path
+        self.manifest_path: str = manifest_path or os.path.join(
+            os.path.dirname(json_path), "ledger_manifest.json")
+        self.snapshots: int = snapshots
+
+    def load(self) -> list[dict]:
+        """
+        Returns every player record.
+        """
+        with open(self.path, "r", encoding="utf-8") as json_file:
+            return [decode_player(player) for player in json.load(json_file)]
+
+    def save(self, players: list[dict],
+             changed_ids: set[str] | None = None) -> None:
+        """
+        Saves every player record. changed_ids is ignored, since a JSON
+        array can only be rewritten as a whole.
+        """
+        rotate_snapshots(self.path, self.snapshots)
+        atomic_write_json(self.path,
+                          [encode_player(player) for player in players])
+
+    def load_manifest(self) -> dict | None:
+        """
+        Returns the ledger manifest, or None if there is none yet.
+        """
+        return load_manifest(self.manifest_path)
+
+    def save_manifest(self, manifest: dict,
+                      changed_files: set[str] | None = None) -> None:
+        """
+        Saves the whole ledger manifest.
+        """
+        save_manifest(self.manifest_path, manifest)
+
+    def signature(self) -> tuple[int, int]:
+        """
+        Returns the modification time and size of the store, which change
+        whenever it is written.
+        """
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def lock(self):
+        """
+        Returns a context manager holding the store's exclusive lock.
+        """
+        return file_lock(self.path)
+
+
+class SqlitePlayerStore:
+    """
+    Keeps players, nicknames, games and per-game results in SQLite tables.
+
+    Saves run in one transaction and only rewrite the rows of the players
+    and ledgers that changed, so adding a game touches its roster's rows and
+    not the whole store. Amounts are stored in cents.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Args:
+            db_path (str): The path to the SQLite database.
+        """
+        self.path: str = db_path
+        self._connection: sqlite3.Connection | None = None
+
+    @classmethod
+    def create(cls, db_path: str) -> "SqlitePlayerStore":
+        """
+        Creates the database and its tables if they do not exist yet.
+
+        Args:
+            db_path (str): The path to the SQLite database.
+
+        Returns:
+            SqlitePlayerStore: The store for the database.
+        """
+        store = cls(db_path)
+        store._connect().executescript(SQLITE_SCHEMA)
+        return store
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute("PRAGMA foreign_keys = ON")
+        return self._connection
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def load(self) -> list[dict]:
+        """
+        Returns every player record, in the order of the JSON layout.
+        """
+        connection = self._connect()
+        nicknames: dict[int, list[str]] = {}
+        for nickname, player in connection.execute(
+                "SELECT nickname, player FROM nicknames ORDER BY rowid"):
+            nicknames.setdefault(player, []).append(nickname)
+
+        columns = SCALAR_FIELDS + STAT_FIELDS + LIST_FIELDS + ["extra"]
+        players = []
+        for row in connection.execute(
+                f"SELECT {', '.join(columns)} FROM players "
+                "ORDER BY position"):
+            values = dict(zip(columns, row))
+            player = {field: values[field] for field in SCALAR_FIELDS}
+            player["player_nicknames"] = nicknames.get(values["id"], [])
+            player["games_played"] = json.loads(values["games_played"])
+            player.update({field: values[field] for field in STAT_FIELDS})
+            player["net_history"] = json.loads(values["net_history"])
+            player.update(json.loads(values["extra"]))
+            players.append(player)
+        return players
+
+    def save(self, players: list[dict],
+             changed_ids: set[str] | None = None) -> None:
+        """
+        Upserts the players whose id is in changed_ids, along with their
+        nicknames, or replaces every player when changed_ids is None.
+        """
+        connection = self._connect()
+        known_fields = set(SCALAR_FIELDS + STAT_FIELDS + LIST_FIELDS
+                           + ["player_nicknames"])
+        columns = (["position"] + SCALAR_FIELDS + STAT_FIELDS + LIST_FIELDS
+                   + ["extra"])
+        upsert = (f"INSERT INTO players ({', '.join(columns)}) "
+                  f"VALUES ({', '.join('?' for _ in columns)}) "
+                  "ON CONFLICT (id) DO UPDATE SET "
+                  + ", ".join(f"{column} = excluded.{column}"
+                              for column in columns if column != "id"))
+
+        with connection:
+            if changed_ids is None:
+                connection.execute("DELETE FROM nicknames")
+                connection.execute("DELETE FROM players")
+            for position, player in enumerate(players):
+                if changed_ids is not None and (
+                        str(player["id"]) not in changed_ids):
+                    continue
+                extra = {key: value for key, value in player.items()
+                         if key not in known_fields}
+                connection.execute(upsert, [
+                    position,
+                    *(player.get(field) for field in SCALAR_FIELDS),
+                    *(player.get(field) for field in STAT_FIELDS),
+                    *(json.dumps(player[field]) for field in LIST_FIELDS),
+                    json.dumps(extra),
+                ])
+                connection.execute("DELETE FROM nicknames WHERE player = ?",
+                                   (player["id"],))
+                connection.executemany(
+                    "INSERT INTO nicknames (nickname, player, position) "
+                    "VALUES (?, ?, ?)",
+                    [(name, player["id"], position)
+                     for name in player["player_nicknames"]])
+
+    def load_manifest(self) -> dict | None:
+        """
+        Returns the ledger manifest rebuilt from the games and results
+        tables, or None if no manifest was ever saved.
+        """
+        connection = self._connect()
+        complete = connection.execute(
+            "SELECT value FROM meta WHERE key = 'manifest_complete'"
+        ).fetchone()
+        if complete is None:
+            return None
+
+        ledgers = {}
+        for (file, day, start, size, mtime_ns, sha256, up_most,
+             down_most) in connection.execute(
+                "SELECT file, day, start, size, mtime_ns, sha256, up_most, "
+                "down_most FROM games"):
+            ledgers[file] = {"size": size, "mtime_ns": mtime_ns,
+                             "sha256": sha256, "day": day, "start": start,
+                             "results": {},
+                             "up_most": json.loads(up_most),
+                             "down_most": json.loads(down_most),
+                             "sessions": {}}
+        for file, player, net in connection.execute(
+                "SELECT file, player, net FROM results ORDER BY rowid"):
+            ledgers[file]["results"][str(player)] = net
+        for file, player, *stats in connection.execute(
+                f"SELECT file, player, {', '.join(SESSION_FIELDS)} "
+                "FROM sessions ORDER BY rowid"):
+            ledgers[file]["sessions"][str(player)] = stats
+        return {"complete": complete[0] == "1", "ledgers": ledgers}
+
+    def save_manifest(self, manifest: dict,
+                      changed_files: set[str] | None = None) -> None:
+        """
+        Writes the ledgers in changed_files, or every ledger when
+        changed_files is None. Changed ledgers missing from the manifest are
+        deleted along with their results.
+        """
+        connection = self._connect()
+        ledgers = manifest["ledgers"]
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) "
+                "VALUES ('manifest_complete', ?)",
+                ("1" if manifest["complete"] else "0",))
+            if changed_files is None:
+                connection.execute("DELETE FROM games")
+                changed_files = set(ledgers)
+            for file in sorted(changed_files):
+                connection.execute("DELETE FROM games WHERE file = ?",
+                                   (file,))
+                entry = ledgers.get(file)
+                if entry is None:
+                    continue
+                connection.execute(
+                    "INSERT INTO games (file, day, start, size, mtime_ns, "
+                    "sha256, up_most, down_most) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (file, entry["day"], entry.get("start", ""),
+                     entry["size"], entry["mtime_ns"],
+                     entry["sha256"], json.dumps(entry["up_most"]),
+                     json.dumps(entry["down_most"])))
+                connection.executemany(
+                    "INSERT INTO results (file, player, net) "
+                    "VALUES (?, ?, ?)",
+                    [(file, int(player), net)
+                     for player, net in entry["results"].items()])
+                connection.executemany(
+                    f"INSERT INTO sessions (file, player, "
+                    f"{', '.join(SESSION_FIELDS)}) "
+                    f"VALUES (?, ?, {', '.join('?' for _ in SESSION_FIELDS)})",
+                    [(file, int(player), *stats)
+                     for player, stats in entry.get("sessions", {}).items()])
+
+    def signature(self) -> tuple[int, int]:
+        """
+        Returns the modification time and size of the database, which
+        change whenever it is written.
+        """
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def lock(self):
+        """
+        Returns a context manager holding the store's exclusive lock.
+        """
+        return file_lock(self.path)
+
+
+PLAYER_STORES = {
+    "json": JsonPlayerStore,
+    "sqlite": SqlitePlayerStore,
+}
+
+
+def read_json_layout(json_path: str) -> list[dict]:
+    """
+    Reads player records from either JSON layout.
+
+    data.json is a list of player records. restructured_data.json is a list
+    holding one object that maps each player's name to the rest of their
+    record.
+
+    Args:
+        json_path (str): The path to the JSON file.
+
+    Returns:
+        list: The player records in the data.json layout, in dollars.
+    """
+    return list(iter_json_layout(json_path))
+
+
+def migrate_json_to_sqlite(json_path: str, db_path: str,
+                           manifest_path: str | None = None) -> None:
+    """
+    Copies a JSON player store, and its ledger manifest if there is one,
+    into a SQLite database.
+
+    Args:
+        json_path (str): The path to a JSON file in either layout.
+        db_path (str): The path to the SQLite database to create or replace
+            the contents of.
+        manifest_path (str, optional): The path to the ledger manifest.
+            Defaults to ledger_manifest.json next to the JSON file.
+
+    Returns:
+        None
+    """
+    store = SqlitePlayerStore.create(db_path)
+    try:
+        store.save([decode_player(player)
+                    for player in read_json_layout(json_path)])
+        manifest = JsonPlayerStore(json_path, manifest_path).load_manifest()
+        if manifest is not None:
+            store.save_manifest(manifest)
+    finally:
+        store.close()
+
+
+def export_sqlite_to_json(db_path: str, json_path: str) -> None:
+    """
+    Writes the players in a SQLite database as a data.json file for the
+    static frontend.
+
+    Args:
+        db_path (str): The path to the SQLite database.
+        json_path (str): The path of the JSON file to write.
+
+    Returns:
+        None
+    """
+    store = SqlitePlayerStore(db_path)
+    try:
+        atomic_write_json(json_path, [encode_player(player)
+                                      for player in store.load()])
+    finally:
+        store.close()
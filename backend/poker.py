@@ -1,27 +1,138 @@
-import json
-import re
+import copy
+import importlib
 import os
-
-import pandas as pd
-
-from poker_utils import get_min_and_max_names
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+from alias_index import AliasIndex
+from frontend_export import write_frontend_files
+from game_catalog import GameCatalog, ledger_day
+from ledger_manifest import (content_hash, file_fingerprint, game_order,
+                             new_manifest)
+from ledger_reader import LEDGER_READERS
+from metrics import count, span
+from migrations import (SCHEMA_VERSION, STAT_DEFAULTS, migrate_json_file,
+                        upgrade_player)
+from net_history import downsample, history_range, sort_history
+from nickname_index import NicknameIndex
+from parse_cache import ParseCache, parse_ledger
+from player_store import PLAYER_STORES, JsonPlayerStore
+from poker_utils import encode_player, get_min_and_max_names, to_dollars
+from ranking_index import Leaderboard
+from sessions import combine_sessions, session_row
+from storage import rotate_snapshots
+
+# indexes built from the game results in the manifest, which games being
+# added update in place, by module and class. They load numpy, so they are
+# imported on first use and commands such as pg never pay for it.
+GAME_INDEXES = {
+    "coplay": ("coplay", "CoplayIndex"),
+    "sessions": ("sessions", "SessionIndex"),
+}
 
 
 class Poker:
-    def __init__(self, ledger_folder_path: str, json_path: str) -> None:
+    def __init__(self, ledger_folder_path: str, json_path: str,
+                 manifest_path: str | None = None,
+                 ledger_backend: str = "csv", snapshots: int = 0,
+                 export_dir: str | None = None,
+                 export_gzip: bool = False,
+                 store_backend: str = "json",
+                 catalog_path: str | None = None,
+                 parse_cache_path: str | None = None,
+                 auto_link: bool = False) -> None:
         """
         Initialize a Poker object.
 
         Args:
             ledger_folder_path (str): The path to the ledger folder.
-            json_path (str): The path to the JSON file.
+            json_path (str): The path to the JSON file, or to the SQLite
+                database when store_backend is "sqlite".
+            manifest_path (str, optional): The path to the ledger manifest
+                of a JSON store. Defaults to ledger_manifest.json next to the
+                JSON file.
+            ledger_backend (str, optional): How ledgers are parsed, either
+                "csv" for the streaming reader or "pandas". Defaults to "csv".
+            snapshots (int, optional): The number of previous versions of
+                a JSON store to keep as json_path.1, json_path.2, ...
+                Defaults to 0.
+            export_dir (str, optional): When given, the compact leaderboard
+                and per-player files for the frontend are written to this
+                directory every time the JSON file is saved.
+            export_gzip (bool, optional): Whether the frontend files are
+                also written gzipped. Defaults to False.
+            store_backend (str, optional): Where players and games are kept,
+                either "json" or "sqlite". Defaults to "json".
+            catalog_path (str, optional): The path to the game catalog of
+                the ledger folder. Defaults to game_catalog.json next to the
+                player store.
+            parse_cache_path (str, optional): The path to the cache of
+                parsed ledgers. Defaults to parse_cache.sqlite next to the
+                player store.
+            auto_link (bool, optional): Whether an unknown nickname is added
+                to the player it clearly belongs to, by player id or by a
+                close match, instead of the game being skipped. Defaults to
+                False.
 
         Returns:
             None
+
+        Raises:
+            ValueError: If the ledger or store backend is unknown.
         """
+        if ledger_backend not in LEDGER_READERS:
+            raise ValueError(f"Unknown ledger backend: {ledger_backend}")
+        if store_backend not in PLAYER_STORES:
+            raise ValueError(f"Unknown store backend: {store_backend}")
         self._validate_paths(ledger_folder_path, json_path)
+        self._read_net_cents = LEDGER_READERS[ledger_backend]
         self.ledger_folder_path: str = ledger_folder_path
         self.json_path: str = json_path
+        if store_backend == "json":
+            self.store = JsonPlayerStore(json_path, manifest_path, snapshots)
+        else:
+            self.store = PLAYER_STORES[store_backend](json_path)
+        store_dir = os.path.dirname(os.path.abspath(json_path))
+        if catalog_path is None:
+            catalog_path = os.path.join(store_dir, "game_catalog.json")
+        self.catalog = GameCatalog(ledger_folder_path, catalog_path)
+        if parse_cache_path is None:
+            parse_cache_path = os.path.join(store_dir, "parse_cache.sqlite")
+        self.parse_cache = ParseCache(parse_cache_path)
+        self._parse_ledger = partial(parse_ledger,
+                                     read_net_cents=self._read_net_cents)
+        self.export_dir: str | None = export_dir
+        self.export_gzip: bool = export_gzip
+        self.auto_link: bool = auto_link
+        self._lock_held: bool = False
+        # ids of players and names of ledgers changed since the last load,
+        # or None when everything may have changed
+        self._changed_ids: set[str] | None = set()
+        self._changed_files: set[str] | None = set()
+        self._nickname_index: NicknameIndex | None = None
+        self._nickname_index_signature: tuple[int, int] | None = None
+        # the records the nickname index was built from, which it stays
+        # valid for while they are being updated
+        self._nickname_index_records: list[dict] | None = None
+        self._alias_index: AliasIndex | None = None
+        self._alias_index_signature: tuple[int, int] | None = None
+        # the fingerprint and PokerNow player ids of every ledger, by path,
+        # read when the alias index is built
+        self._ledger_player_ids: dict[str, tuple[dict, dict[str, str]]] = {}
+        self._leaderboard: Leaderboard | None = None
+        self._leaderboard_signature: tuple[int, int] | None = None
+        # the player records and manifest as last saved, handed to the next
+        # load while the store is unchanged so a long-running process does
+        # not read the whole store again for every game
+        self._warm_signature: tuple[int, int] | None = None
+        self._warm_players: list[dict] | None = None
+        self._warm_manifest: dict | None = None
+        self._game_indexes: dict = {}
+        self._game_indexes_signature: tuple[int, int] | None = None
+        # the games added since the manifest was loaded, or None when
+        # recorded games may have changed
+        self._new_games: list[dict] | None = None
 
     def _validate_paths(self, ledger_folder_path: str, json_path: str) -> None:
         """
@@ -48,39 +159,326 @@ class Poker:
 
     def _load_json_data(self) -> dict:
         """
-        Loads JSON data from the specified file path.
+        Loads JSON data from the player store.
+
+        The records saved last are reused when nothing else has written the
+        store since. They are handed out once, so records left half updated
+        by a failed cycle are never reused.
 
         Returns:
             dict: The loaded JSON data.
         """
-        with open(self.json_path, "r", encoding="utf-8") as json_file:
-            return json.load(json_file)
+        self._changed_ids = set()
+        warm = self._is_warm()
+        players, self._warm_players = self._warm_players, None
+        if warm and players is not None:
+            return players
+        with span("load_players"):
+            players = self.store.load()
+        count("store_bytes_read", self._json_signature()[1])
+        return players
 
     def _save_json_data(self, data: dict) -> None:
         """
-        Save the given data as JSON to the specified file path.
+        Save the given data to the player store.
+
+        Only the players changed since the last load are written when the
+        store supports it, and only their positions in the cached rankings
+        are updated.
 
         Args:
-            data: The data to be saved as JSON.
+            data: The data to be saved.
 
         Returns:
             None
         """
-        with open(self.json_path, "w", encoding="utf-8") as json_file:
-            json.dump(data, json_file, indent=4)
+        signature = self._json_signature()
+        with span("save_players"):
+            self.store.save(data, self._changed_ids)
+        self._keep_warm(players=data)
+
+        if (self._leaderboard is not None
+                and self._leaderboard_signature == signature
+                and self._changed_ids is not None):
+            self._leaderboard.update_ids(data, self._changed_ids)
+        elif self.export_dir is not None:
+            self._leaderboard = Leaderboard(data)
+        else:
+            self._leaderboard = None
+        if self._leaderboard is not None:
+            self._leaderboard_signature = self._json_signature()
+
+        if self.export_dir is not None:
+            with span("export"):
+                write_frontend_files(data, self.export_dir, self.export_gzip,
+                                     self._leaderboard, self._changed_ids)
+
+        # nicknames only change when linked, which rebuilds the index from
+        # the records just saved, so the cached index stays valid
+        if self._nickname_index is not None:
+            self._nickname_index_signature = self._json_signature()
+
+    def _is_warm(self) -> bool:
+        """
+        Checks that the store has not been written since the warm records
+        were saved, dropping them if it has.
+
+        Returns:
+            bool: Whether the warm records are current.
+        """
+        if self._warm_signature == self._json_signature():
+            return True
+        self._warm_players = None
+        self._warm_manifest = None
+        return False
+
+    def _keep_warm(self, players: list[dict] | None = None,
+                   manifest: dict | None = None) -> None:
+        """
+        Keeps just saved player records or manifest for the next load.
+
+        Saves happen under the store lock after a load checked the warm
+        records, so whatever else is warm is still current and only the
+        signature moves on.
+
+        Args:
+            players (list, optional): The saved player records.
+            manifest (dict, optional): The saved manifest.
+
+        Returns:
+            None
+        """
+        if players is not None:
+            self._warm_players = players
+        if manifest is not None:
+            self._warm_manifest = manifest
+        self._warm_signature = self._json_signature()
+
+    @contextmanager
+    def _store_lock(self):
+        """
+        Holds the lock on the player store for a whole load-modify-save
+        cycle.
+
+        Nested uses within the same Poker object share the outer lock, so a
+        batch holds it once rather than once per game.
+
+        Yields:
+            None
+        """
+        if self._lock_held:
+            yield
+            return
+        with self.store.lock():
+            self._lock_held = True
+            try:
+                yield
+            finally:
+                self._lock_held = False
+
+    def _json_signature(self) -> tuple[int, int]:
+        """
+        Returns the signature of the player store, which changes whenever it
+        is written.
+
+        Returns:
+            tuple: The modification time in nanoseconds and the size in bytes.
+        """
+        return self.store.signature()
+
+    def _get_nickname_index(self, json_data: list[dict]) -> NicknameIndex:
+        """
+        Returns the nickname index for the player records, rebuilding it only
+        when the JSON file has changed since it was built.
+
+        Args:
+            json_data (list): The player records loaded from the JSON file.
+
+        Returns:
+            NicknameIndex: The nickname index.
+        """
+        signature = self._json_signature()
+        if (self._nickname_index is None
+                or (self._nickname_index_signature != signature
+                    and self._nickname_index_records is not json_data)):
+            self._nickname_index = NicknameIndex(json_data)
+            self._nickname_index_signature = signature
+            self._nickname_index_records = json_data
+        return self._nickname_index
+
+    def _get_alias_index(self, json_data: list[dict]) -> AliasIndex:
+        """
+        Returns the alias index for the player records, rebuilding it only
+        when the player store has changed since it was built.
 
-    def _load_game_data(self,
-                        ledger_csv_path: str) -> tuple[pd.DataFrame, str]:
+        Args:
+            json_data (list): The player records loaded from the store.
+
+        Returns:
+            AliasIndex: The alias index.
         """
-        Load game data from a CSV file.
+        signature = self._json_signature()
+        if (self._alias_index is None
+                or self._alias_index_signature != signature):
+            self._alias_index = AliasIndex(json_data,
+                                           self._ledger_ids(json_data))
+            self._alias_index_signature = signature
+        return self._alias_index
+
+    def _read_player_ids(self, ledger_csv_path: str) -> dict[str, str]:
+        """
+        Returns the PokerNow player id of every nickname in a ledger,
+        through the parse cache, reading it again only when it has changed.
+
+        Args:
+            ledger_csv_path (str): The path to the ledger CSV.
+
+        Returns:
+            dict: The player id of every nickname, empty for a ledger that
+            cannot be parsed.
+        """
+        fingerprint = file_fingerprint(ledger_csv_path)
+        cached = self._ledger_player_ids.get(ledger_csv_path)
+        if cached is None or cached[0] != fingerprint:
+            try:
+                player_ids = self.parse_cache.parse(
+                    ledger_csv_path, self._parse_ledger)["player_ids"]
+            except ValueError:
+                player_ids = {}
+            cached = (fingerprint, player_ids)
+            self._ledger_player_ids[ledger_csv_path] = cached
+        return cached[1]
+
+    def _ledger_ids(self, json_data: list[dict]) -> dict[str, int]:
+        """
+        Maps the PokerNow player ids that known nicknames sat under in the
+        ledgers to the positions of their players.
+
+        An id seen under the nicknames of two players, such as a shared
+        device, tells neither apart and is left out.
+
+        Args:
+            json_data (list): The player records.
+
+        Returns:
+            dict: A dictionary mapping PokerNow player ids to positions.
+        """
+        nickname_index = self._get_nickname_index(json_data)
+        positions: dict[str, int] = {}
+        shared: set[str] = set()
+        for path in self._ledger_paths():
+            for name, ledger_id in self._read_player_ids(path).items():
+                position = nickname_index.resolve(name)
+                if (position is not None
+                        and positions.setdefault(ledger_id, position)
+                        != position):
+                    shared.add(ledger_id)
+        for ledger_id in shared:
+            del positions[ledger_id]
+        return positions
+
+    def _link_nicknames(self, json_data: list[dict], names: list[str],
+                        player_ids: dict[str, str]) -> list[str]:
+        """
+        Adds unknown nicknames to the players they clearly belong to, and
+        records the PokerNow player id a nickname sat under as the player's
+        player_id when they have none yet.
+
+        Args:
+            json_data (list): The player records to update in place.
+            names (list): The unknown nicknames.
+            player_ids (dict): The PokerNow player id of every nickname in
+                the ledger.
+
+        Returns:
+            list: The nicknames that could not be linked.
+        """
+        alias_index = self._get_alias_index(json_data)
+        unlinked: list[str] = []
+        for name in names:
+            position = alias_index.auto_link(name, player_ids.get(name))
+            if position is None:
+                unlinked.append(name)
+                continue
+            player = json_data[position]
+            player["player_nicknames"].append(name)
+            if player_ids.get(name) and not player.get("player_id"):
+                player["player_id"] = player_ids[name]
+            self._mark_changed(player_id=str(player["id"]))
+            print(f"Linked {name} to {player['name']}")
+
+        if len(unlinked) < len(names):
+            # the linked records are saved with the game, until then the
+            # indexes only hold for them
+            self._nickname_index = NicknameIndex(json_data)
+            self._nickname_index_signature = None
+            self._nickname_index_records = json_data
+            self._alias_index = None
+        return unlinked
+
+    def _get_leaderboard(self,
+                         json_data: list[dict] | None = None) -> Leaderboard:
+        """
+        Returns the rankings of the players, rebuilding them only when the
+        player store has changed since they were built or last updated.
+
+        Args:
+            json_data (list, optional): The player records, when already
+                loaded. Loaded from the store if a rebuild needs them.
+
+        Returns:
+            Leaderboard: The rankings.
+        """
+        signature = self._json_signature()
+        if (self._leaderboard is None
+                or self._leaderboard_signature != signature):
+            if json_data is None:
+                json_data = self.store.load()
+            self._leaderboard = Leaderboard(json_data)
+            self._leaderboard_signature = signature
+        return self._leaderboard
+
+    def _get_game_index(self, name: str):
+        """
+        Returns one of the GAME_INDEXES, rebuilding it from the manifest only
+        when the store has changed since it was built or last updated.
+
+        Args:
+            name (str): The name of the index.
+
+        Returns:
+            The index.
+        """
+        signature = self._json_signature()
+        if self._game_indexes_signature != signature:
+            self._game_indexes = {}
+            self._game_indexes_signature = signature
+        if name not in self._game_indexes:
+            module, class_name = GAME_INDEXES[name]
+            index_class = getattr(importlib.import_module(module), class_name)
+            manifest = self.store.load_manifest()
+            self._game_indexes[name] = index_class(
+                manifest or new_manifest(complete=False))
+        return self._game_indexes[name]
+
+    def _load_game_data(
+        self, ledger_csv_path: str, game_data: dict | None = None
+            ) -> tuple[dict, dict]:
+        """
+        Load game data from a CSV file, through the parse cache.
 
         Args:
             ledger_csv_path (str): The path to the CSV file containing the game
             data.
+            game_data (dict, optional): The parsed ledger if it was already
+                parsed, e.g. by a worker pool. The path is validated either
+                way.
 
         Returns:
-            tuple: A tuple containing the loaded game data (pandas DataFrame)
-            and the extracted day (str).
+            tuple: A tuple containing the parsed ledger (dict), with the net
+            cents of each player nickname as "nets" and their session stats
+            as "sessions", and the ledger's catalog entry (dict), which holds
+            the game id and start time.
 
         Raises:
             FileNotFoundError: If the specified ledger path does not exist.
@@ -97,101 +495,415 @@ class Poker:
             raise FileNotFoundError("""Error: Game ledger
                                     file must be a CSV File""")
 
-        match = re.search(r"ledger(.*?)\.csv", ledger_csv_path.split("/")[-1])
-        if match is None or match.group(1) is None:
-            raise ValueError(
-                f"""Unable to extract date from ledger
-                    file name: {ledger_csv_path}"""
-            )
-
-        game_data: pd.DataFrame = pd.read_csv(ledger_csv_path)
-        day: str = match.group(1)
+        entry = self.catalog.entry(ledger_csv_path)
+        if game_data is None:
+            with span("parse_ledger"):
+                game_data = self.parse_cache.parse(ledger_csv_path,
+                                                   self._parse_ledger)
+        count("ledger_bytes_read", os.path.getsize(ledger_csv_path))
 
-        return game_data, day
+        return game_data, entry
 
     def _calculate_net_winnings(
-        self, game_data: pd.DataFrame, exclude_list: list[str] = []
-            ) -> dict[str, float]:
+        self, game_data: dict[str, int], exclude_list: list[str] = []
+            ) -> dict[str, int]:
         """
         Calculate the net winnings for each player in the game data.
 
         Parameters:
-        game_data (pd.DataFrame): The game data containing player information
-            and net winnings.
+        game_data (dict): The net cents of each player nickname.
         exclude_list (list): A list of player nicknames to exclude from the
             calculation. Default is an empty list.
 
         Returns:
-        dict: A dictionary containing the net winnings for each player,
-        excluding those in the exclude_list.
+        dict: A dictionary containing the net winnings in cents for each
+        player, excluding those in the exclude_list.
         """
 
-        net_winnings_by_player: dict[str, float] = (
-            game_data.groupby("player_nickname")["net"].sum() / 100).to_dict()
-
-        return {key: value for key, value in net_winnings_by_player.items()
+        return {key: value for key, value in game_data.items()
                 if key not in exclude_list}
 
     def _update_players(
-        self, json_data: list[dict], net_winnings_by_player: dict[str, float],
-            day: str, up_most: list[str], down_most: list[str]
-            ) -> tuple[int, list]:
+        self, json_data: list[dict], game: dict,
+            positions_by_id: dict[str, int],
+            only_ids: set[str] | None = None) -> tuple[int, list]:
         """
-        Updates the players' information based on the provided JSON data and
-        net winnings.
+        Updates the players' information with the results of one game.
+
+        Ratings are scored against the whole game, also when only some of
+        its players are updated.
 
         Args:
-            json_data (dict): The JSON data containing the player information.
-            net_winnings_by_player (dict): A dictionary mapping player names to
-                their net winnings.
-            day (str): The day for which the update is being performed.
-            up_most (list): A list to store the players who have gained the
-                most.
-            down_most (list): A list to store the players who have lost the
-            most.
+            json_data (list): The JSON data containing the player information.
+            game (dict): The game record, as built by _read_game.
+            positions_by_id (dict): A dictionary mapping player ids to their
+                positions in json_data.
+            only_ids (set, optional): When given, only players whose id is in
+                this set are updated.
 
         Returns:
             tuple: A tuple containing the number of players updated and a list
                 of the updated players' names.
         """
 
-        players_updated: int = 0
-        players_updated_list: list = []
-
-        for player in json_data:
-            for name in player["player_nicknames"]:
-                if name in net_winnings_by_player:
-                    self._update_individual_stats(
-                        player, name, net_winnings_by_player,
-                        day, up_most, down_most)
-                    players_updated += 1
-                    players_updated_list.append(name)
+        import numpy as np
+
+        from rating_engine import game_scores, update_ratings
+
+        with span("update_players"):
+            players_updated: int = 0
+            players_updated_list: list = []
+            up_most = set(game["up_most"])
+            down_most = set(game["down_most"])
+
+            player_ids = [player_id for player_id in game["results"]
+                          if only_ids is None or player_id in only_ids]
+            nets = np.fromiter(game["results"].values(), dtype=np.int64,
+                               count=len(game["results"]))
+            scores = dict(zip(game["results"], game_scores(
+                np.zeros(len(nets), dtype=np.int64), nets).tolist()))
+            players = [json_data[positions_by_id[player_id]]
+                       for player_id in player_ids]
+            ratings = update_ratings(
+                np.array([player["putr"] for player in players],
+                         dtype=np.float64),
+                np.array([len(player["games_played"]) for player in players],
+                         dtype=np.int64),
+                np.array([scores[player_id] for player_id in player_ids]))
+
+            for player_id, player, rating in zip(player_ids, players,
+                                                 ratings.tolist()):
+                player_net = game["results"][player_id]
+                player["putr"] = rating
+                self._update_individual_stats(
+                    player, player_net, game["day"],
+                    player_id in up_most, player_id in down_most)
+                players_updated += 1
+                players_updated_list.append(player["name"])
+                self._mark_changed(player_id=player_id)
         return players_updated, players_updated_list
 
     def _update_individual_stats(
-        self, player: dict, name: str,
-        net_winnings_by_player: dict[str, float], day: str,
-            up_most: list, down_most: list) -> None:
+        self, player: dict, player_net: int, day: str,
+            is_up_most: bool, is_down_most: bool) -> None:
 
-        player_net = net_winnings_by_player[name]
         player["net"] += player_net
         player["games_played"].append(day)
         player["biggest_win"] = max(player["biggest_win"], player_net)
         player["biggest_loss"] = min(player["biggest_loss"], player_net)
         player["highest_net"] = max(player["highest_net"], player["net"])
         player["lowest_net"] = min(player["lowest_net"], player["net"])
-        player["net_dictionary"][day[:5]] = player["net"]
+        player["net_history"].append(player["net"])
         player["average_net"] = player["net"] / len(player["games_played"])
 
-        if name in up_most:
+        if is_up_most:
             player["games_up_most"] += 1
-        if name in down_most:
+        if is_down_most:
             player["games_down_most"] += 1
         if player_net > 0:
             player["games_up"] += 1
         if player_net < 0:
             player["games_down"] += 1
 
+    def _reset_player(self, player: dict) -> None:
+        """
+        Resets the net-related fields of one player to their initial values.
+
+        Args:
+            player (dict): The player record to reset.
+
+        Returns:
+            None
+        """
+        from rating_engine import BASE_RATING
+
+        self._mark_changed(player_id=str(player["id"]))
+        player["putr"] = BASE_RATING
+        player.update(copy.deepcopy(STAT_DEFAULTS))
+
+    def _positions_by_id(self, json_data: list[dict]) -> dict[str, int]:
+        """
+        Maps each player's id, as stored in game records, to the position of
+        its record.
+
+        Args:
+            json_data (list): The player records.
+
+        Returns:
+            dict: A dictionary mapping player ids to positions.
+        """
+        return {str(player["id"]): position
+                for position, player in enumerate(json_data)}
+
+    def _read_game(self, json_data: list[dict], ledger_csv_path: str,
+                   exclude_list: list[str],
+                   game_data: dict | None = None
+                   ) -> tuple[str, dict | None]:
+        """
+        Reads and validates a single ledger without touching the player
+        records.
+
+        Args:
+            json_data (list): The player records.
+            ledger_csv_path (str): The file path of the ledger CSV.
+            exclude_list (list): A list of player nicknames to exclude from
+                the game data.
+            game_data (dict, optional): The already parsed ledger.
+
+        Returns:
+            tuple: The id of the game and its game record, or None if the
+            ledger has unknown players. A game record holds the game id as
+            its day, the start time, the net winnings by player id, the ids
+            of the players up and down the most and the session stats of
+            every player.
+        """
+        game_data, entry = self._load_game_data(ledger_csv_path, game_data)
+        day = entry["id"]
+
+        net_winnings_by_player = self._calculate_net_winnings(
+            game_data["nets"], exclude_list)
+
+        with span("resolve_players"):
+            nickname_index = self._get_nickname_index(json_data)
+            unknown_players = nickname_index.unknown(net_winnings_by_player)
+            if unknown_players and self.auto_link:
+                unknown_players = self._link_nicknames(
+                    json_data, unknown_players, game_data["player_ids"])
+                nickname_index = self._get_nickname_index(json_data)
+            if unknown_players:
+                alias_index = self._get_alias_index(json_data)
+                for name in unknown_players:
+                    suggestions = ", ".join(
+                        json_data[candidate["position"]]["name"]
+                        for candidate in alias_index.candidates(
+                            name, game_data["player_ids"].get(name), 3))
+                    print(f"{name} (did you mean {suggestions}?)"
+                          if suggestions else f"{name}")
+                print("Not all players known")
+                return day, None
+
+            net_winnings_by_id = {
+                str(json_data[position]["id"]): net
+                for position, net in nickname_index.group_nets(
+                    net_winnings_by_player).items()
+            }
+            up_most, down_most = get_min_and_max_names(net_winnings_by_id)
+
+            sessions_by_id: dict[str, list[int]] = {}
+            for name, stats in game_data["sessions"].items():
+                if name in exclude_list:
+                    continue
+                player_id = str(json_data[nickname_index.resolve(name)]["id"])
+                if player_id in sessions_by_id:
+                    stats = combine_sessions(sessions_by_id[player_id], stats)
+                sessions_by_id[player_id] = stats
+
+        count("players_resolved", len(net_winnings_by_player))
+        for name, net in net_winnings_by_player.items():
+            print(name, to_dollars(net))
+
+        return day, {"day": day, "start": entry["start"],
+                     "results": net_winnings_by_id,
+                     "up_most": up_most, "down_most": down_most,
+                     "sessions": sessions_by_id}
+
+    def _ingest_game(self, json_data: list[dict], manifest: dict,
+                     positions_by_id: dict[str, int], ledger_csv_path: str,
+                     exclude_list: list[str],
+                     game_data: dict | None = None
+                     ) -> tuple[str, bool]:
+        """
+        Folds a single ledger into already loaded player records and records
+        it in the manifest.
+
+        The game is validated before any record is touched, so a game with
+        unknown players leaves json_data unchanged. A ledger that is already
+        in the manifest is never folded twice. While the manifest is
+        incomplete, such as for a store written before it was kept, a game
+        whose day label or game id is already in a player's games_played is
+        not folded either.
+
+        Args:
+            json_data (list): The player records to update in place.
+            manifest (dict): The ledger manifest to update in place.
+            positions_by_id (dict): A dictionary mapping player ids to their
+                positions in json_data.
+            ledger_csv_path (str): The file path of the ledger CSV.
+            exclude_list (list): A list of player nicknames to exclude from
+                the game data.
+            game_data (dict, optional): The already parsed ledger.
+
+        Returns:
+            tuple: The day of the game and whether it was added.
+        """
+        file = os.path.basename(ledger_csv_path)
+        entry = manifest["ledgers"].get(file)
+        if entry is not None:
+            day = entry["day"]
+            if entry["sha256"] == content_hash(ledger_csv_path):
+                print(f"Poker game on {day} already added")
+            else:
+                print(f"Poker game on {day} has changed, run sync to "
+                      "update it")
+            return day, False
+
+        fingerprint = file_fingerprint(ledger_csv_path)
+        day, game = self._read_game(json_data, ledger_csv_path, exclude_list,
+                                    game_data)
+        if game is None:
+            return day, False
+        if not manifest["complete"] and self._already_played(
+                json_data, game, positions_by_id, ledger_day(file)):
+            print(f"Poker game on {day} is already in the player records, "
+                  "run sync to rebuild them from the ledgers")
+            return day, False
+
+        self._update_players(json_data, game, positions_by_id)
+        if self._new_games is not None:
+            self._new_games.append(game)
+        manifest["ledgers"][file] = {
+            **fingerprint, "sha256": content_hash(ledger_csv_path), **game}
+        self._mark_changed(file=file)
+        count("games_added")
+
+        print(f"Poker game on {day} added")
+        return day, True
+
+    def _already_played(self, json_data: list[dict], game: dict,
+                        positions_by_id: dict[str, int], label: str) -> bool:
+        """
+        Tells whether a player of a game already has it in games_played,
+        under its game id or under the day label older records used.
+
+        Args:
+            json_data (list): The player records.
+            game (dict): The game record, as built by _read_game.
+            positions_by_id (dict): A dictionary mapping player ids to their
+                positions in json_data.
+            label (str): The day label of the game's ledger.
+
+        Returns:
+            bool: Whether any player of the game has already played it.
+        """
+        return any({game["day"], label}.intersection(
+            json_data[positions_by_id[player_id]]["games_played"])
+            for player_id in game["results"])
+
+    def _ledger_paths(self) -> list[str]:
+        """
+        Returns the paths of all CSV ledgers in the ledger folder, in the
+        order their games were played.
+
+        Returns:
+            list: The ledger paths, from the game catalog.
+        """
+        return self.catalog.paths()
+
+    def _parse_ledgers(self, ledger_paths: list[str], workers: int):
+        """
+        Parses ledgers in a process pool, yielding them in the given order.
+
+        Parsing is independent per ledger, so only the fold that consumes
+        the results has to be ordered. Ledgers found in the parse cache are
+        not sent to the pool.
+
+        Args:
+            ledger_paths (list): The paths of the ledgers to parse.
+            workers (int): The number of worker processes. With one worker
+                or fewer, ledgers are parsed lazily as they are consumed.
+
+        Yields:
+            tuple: The path of each ledger and the parsed ledger, or None
+            when it is left to be parsed on demand.
+        """
+        if workers <= 1 or len(ledger_paths) <= 1:
+            for path in ledger_paths:
+                yield path, None
+            return
+
+        keys = [self.parse_cache.key(path) for path in ledger_paths]
+        cached = [self.parse_cache.get(key) for key in keys]
+        misses = [path for path, parsed in zip(ledger_paths, cached)
+                  if parsed is None]
+        if not misses:
+            yield from zip(ledger_paths, cached)
+            return
+
+        chunksize = max(1, len(misses) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed_misses = executor.map(self._parse_ledger, misses,
+                                         chunksize=chunksize)
+            for path, key, parsed in zip(ledger_paths, keys, cached):
+                if parsed is None:
+                    parsed = next(parsed_misses)
+                    self.parse_cache.put(key, parsed)
+                yield path, parsed
+
+    def _load_manifest(self) -> dict:
+        """
+        Loads the ledger manifest, starting an incomplete one if none exists.
+
+        Returns:
+            dict: The ledger manifest.
+        """
+        self._changed_files = set()
+        self._new_games = []
+        if self._game_indexes_signature != self._json_signature():
+            self._game_indexes = {}
+        warm = self._is_warm()
+        manifest, self._warm_manifest = self._warm_manifest, None
+        if warm and manifest is not None:
+            return manifest
+        with span("load_manifest"):
+            manifest = self.store.load_manifest()
+        if manifest is None:
+            return new_manifest(complete=False)
+        return manifest
+
+    def _save_manifest(self, manifest: dict) -> None:
+        """
+        Saves the ledger manifest to the player store.
+
+        Only the ledgers changed since the last load are written when the
+        store supports it.
+
+        Args:
+            manifest (dict): The ledger manifest.
+
+        Returns:
+            None
+        """
+        with span("save_manifest"):
+            self.store.save_manifest(manifest, self._changed_files)
+        self._keep_warm(manifest=manifest)
+
+        if self._new_games is not None:
+            for index in self._game_indexes.values():
+                for game in self._new_games:
+                    index.add_game(game)
+            self._game_indexes_signature = self._json_signature()
+        else:
+            self._game_indexes = {}
+        self._new_games = None
+
+    def _mark_changed(self, player_id: str | None = None,
+                      file: str | None = None) -> None:
+        """
+        Records that a player or a ledger's manifest entry changed, so the
+        next save can write just those.
+
+        Args:
+            player_id (str, optional): The id of the changed player.
+            file (str, optional): The file name of the changed ledger.
+
+        Returns:
+            None
+        """
+        if player_id is not None and self._changed_ids is not None:
+            self._changed_ids.add(player_id)
+        if file is not None and self._changed_files is not None:
+            self._changed_files.add(file)
+
     def add_poker_game(self, ledger_csv_path: str, exclude_list=[]) -> None:
         """
         Adds a poker game to the ledger.
@@ -205,44 +917,353 @@ class Poker:
         None
         """
 
-        json_data = self._load_json_data()
+        with self._store_lock():
+            json_data = self._load_json_data()
+            manifest = self._load_manifest()
+
+            _, added = self._ingest_game(json_data, manifest,
+                                         self._positions_by_id(json_data),
+                                         ledger_csv_path, exclude_list)
 
-        game_data, day = self._load_game_data(ledger_csv_path)
+            if added:
+                self._save_json_data(json_data)
+                self._save_manifest(manifest)
 
-        net_winnings_by_player = self._calculate_net_winnings(game_data,
-                                                              exclude_list)
+    def validate_ledger(self, ledger_csv_path: str) -> None:
+        """
+        Checks that a ledger can be parsed, without touching the player
+        store.
 
-        up_most, down_most = get_min_and_max_names(net_winnings_by_player)
+        Args:
+            ledger_csv_path (str): The file path of the ledger CSV.
 
-        players_updated, players_updated_list = self._update_players(
-            json_data, net_winnings_by_player, day, up_most, down_most)
+        Returns:
+            None
 
-        if players_updated == len(net_winnings_by_player):
-            for name, net in net_winnings_by_player.items():
-                print(name, net)
-            self._save_json_data(json_data)
-            print(f"Poker game on {day} added")
-        else:
-            for name in net_winnings_by_player.keys():
-                if name not in players_updated_list:
-                    print(f"{name}")
-            print("Not all players known")
+        Raises:
+            FileNotFoundError: If the ledger does not exist or is not a CSV
+                file.
+            ValueError: If the ledger is malformed, such as missing a column
+                or ending in a truncated row.
+        """
+        self._load_game_data(ledger_csv_path)
 
-    def add_all_games(self, exclude_list=[]) -> None:
+    def add_all_games(self, exclude_list=[], workers: int = 1) -> None:
         """
         Add all poker games from the ledger folder to the ledger.
 
+        The player store is loaded once, every ledger is folded into it in
+        date order and the result is saved once at the end, so a season of N
+        ledgers costs a single JSON round-trip instead of N.
+
+        Args:
+            exclude_list (list, optional): A list of player nicknames to
+            exclude from adding. Defaults to an empty list.
+            workers (int, optional): The number of processes parsing ledgers
+                ahead of the fold. Defaults to 1, which parses serially.
+
+        Returns:
+            None
+        """
+        self.add_games(self._ledger_paths(), exclude_list, workers)
+
+    def add_games(self, ledger_paths: list[str], exclude_list=[],
+                  workers: int = 1) -> list[str]:
+        """
+        Adds a batch of poker games with a single load and save of the
+        player store.
+
+        Args:
+            ledger_paths (list): The paths of the ledger CSVs, in the order
+                their games are folded.
+            exclude_list (list, optional): A list of player nicknames to
+            exclude from adding. Defaults to an empty list.
+            workers (int, optional): The number of processes parsing ledgers
+                ahead of the fold. Defaults to 1, which parses serially.
+
+        Returns:
+            list: The days of the games that were added.
+        """
+        with self._store_lock():
+            json_data = self._load_json_data()
+            manifest = self._load_manifest()
+
+            positions_by_id = self._positions_by_id(json_data)
+
+            added_days: list[str] = []
+            skipped_days: list[str] = []
+            for filepath, game_data in self._parse_ledgers(ledger_paths,
+                                                           workers):
+                day, added = self._ingest_game(json_data, manifest,
+                                               positions_by_id, filepath,
+                                               exclude_list, game_data)
+                if added:
+                    added_days.append(day)
+                else:
+                    skipped_days.append(day)
+
+            if added_days:
+                self._save_json_data(json_data)
+                self._save_manifest(manifest)
+
+            print(f"{len(added_days)} of "
+                  f"{len(added_days) + len(skipped_days)} games added")
+            if skipped_days:
+                print(f"Games skipped: {', '.join(skipped_days)}")
+            return added_days
+
+    def _compare_ledgers(self, ledgers: dict, current_files: dict[str, str]
+                         ) -> tuple[list[str], list[str], bool]:
+        """
+        Compares the ledger folder with the manifest.
+
+        Ledgers are compared by size and modification time first and by
+        content hash only when those differ. A ledger that was only touched
+        gets its new fingerprint in the manifest.
+
+        Args:
+            ledgers (dict): The manifest entries by file name, updated in
+                place.
+            current_files (dict): The paths of the ledgers in the folder by
+                file name.
+
+        Returns:
+            tuple: The files that are new or changed, the files that were
+            removed and whether any entry's fingerprint was updated.
+        """
+        pending: list[str] = []
+        touched = False
+        for file, path in current_files.items():
+            entry = ledgers.get(file)
+            if entry is None:
+                pending.append(file)
+                continue
+            fingerprint = file_fingerprint(path)
+            if (entry["size"] == fingerprint["size"]
+                    and entry["mtime_ns"] == fingerprint["mtime_ns"]):
+                continue
+            if entry["sha256"] == content_hash(path):
+                entry.update(fingerprint)
+                self._mark_changed(file=file)
+                touched = True
+                continue
+            pending.append(file)
+        removed = [file for file in ledgers if file not in current_files]
+        for file in pending + removed:
+            self._mark_changed(file=file)
+        return pending, removed, touched
+
+    def _read_ledgers(self, json_data: list[dict], ledger_paths: list[str],
+                      exclude_list: list[str], workers: int
+                      ) -> tuple[dict[str, dict], dict[str, str]]:
+        """
+        Reads a batch of ledgers into manifest entries without touching the
+        player records, apart from nicknames linked by auto_link.
+
+        Args:
+            json_data (list): The player records.
+            ledger_paths (list): The paths of the ledger CSVs.
+            exclude_list (list): A list of player nicknames to exclude from
+                the games.
+            workers (int): The number of processes parsing the ledgers.
+
+        Returns:
+            tuple: The manifest entries of the games that were read, by
+            file name in the order of ledger_paths, and the days of the
+            ledgers that were skipped for unknown players, by file name.
+        """
+        entries: dict[str, dict] = {}
+        skipped: dict[str, str] = {}
+        for path, game_data in self._parse_ledgers(ledger_paths, workers):
+            file = os.path.basename(path)
+            fingerprint = file_fingerprint(path)
+            day, game = self._read_game(json_data, path, exclude_list,
+                                        game_data)
+            if game is None:
+                skipped[file] = day
+            else:
+                entries[file] = {
+                    **fingerprint, "sha256": content_hash(path), **game}
+        return entries, skipped
+
+    def _replay_players(self, json_data: list[dict], ledgers: dict,
+                        affected_ids: set[str],
+                        new_games: list[dict]) -> None:
+        """
+        Recomputes the affected players from every recorded game they played
+        and appends the new games of everyone else.
+
+        Args:
+            json_data (list): The player records to update in place.
+            ledgers (dict): The manifest entries by file name, including the
+                new games.
+            affected_ids (set): The ids of the players to recompute.
+            new_games (list): The games played after every recorded game,
+                which are appended to the histories of unaffected players.
+
+        Returns:
+            None
+        """
+        positions_by_id = self._positions_by_id(json_data)
+        for player_id in affected_ids:
+            self._reset_player(json_data[positions_by_id[player_id]])
+        for file in game_order(ledgers):
+            game = ledgers[file]
+            if affected_ids.intersection(game["results"]):
+                self._update_players(json_data, game, positions_by_id,
+                                     affected_ids)
+        for game in new_games:
+            self._update_players(json_data, game, positions_by_id,
+                                 set(game["results"]) - affected_ids)
+
+    def _record_synced(self, ledgers: dict, entries: dict[str, dict],
+                       affected_ids: set[str]) -> list[dict]:
+        """
+        Records synced games in the manifest.
+
+        A game played before the last recorded game changes the histories
+        of its players from that point on, so its players are added to
+        affected_ids to be replayed.
+
+        Args:
+            ledgers (dict): The manifest entries by file name, updated in
+                place.
+            entries (dict): The manifest entries of the synced games by file
+                name.
+            affected_ids (set): The ids of the players to recompute, updated
+                in place.
+
+        Returns:
+            list: The games played after every recorded game.
+        """
+        def order_key(file: str) -> tuple[str, str]:
+            return ledgers[file].get("start", ""), file
+
+        last_key = max(map(order_key, ledgers), default=("", ""))
+        new_games: list[dict] = []
+        for file, entry in entries.items():
+            ledgers[file] = entry
+            if order_key(file) < last_key:
+                affected_ids.update(entry["results"])
+            else:
+                new_games.append(entry)
+            count("games_synced")
+            print(f"Poker game on {entry['day']} synced")
+        return new_games
+
+    def sync(self, exclude_list=[], workers: int = 1,
+             force: bool = False) -> list[str]:
+        """
+        Brings the player store up to date with the ledger folder.
+
+        Ledgers are compared with the manifest by size and modification time
+        first and by content hash only when those differ, so syncing an
+        unchanged folder only stats the files. New ledgers are folded in,
+        and when a ledger changes or disappears only the players who played
+        in it are recomputed from the recorded game results. Without a
+        complete manifest the store is rebuilt from every ledger.
+
+        A rebuild, or a changed ledger, that would drop a game for unknown
+        players saves nothing unless forced, since the game's results would
+        be lost from the store.
+
         Args:
             exclude_list (list, optional): A list of player nicknames to
             exclude from adding. Defaults to an empty list.
+            workers (int, optional): The number of processes parsing new and
+                changed ledgers. Defaults to 1, which parses serially.
+            force (bool, optional): Whether to save even when games would be
+                dropped. Defaults to False.
+
+        Returns:
+            list: The days of the games that were added or replaced.
+        """
+        with self._store_lock():
+            manifest = self._load_manifest()
+            # games may be replaced or removed, so pairs are rebuilt
+            self._new_games = None
+            rebuild = not manifest["complete"]
+            if rebuild:
+                print("No complete ledger manifest, rebuilding all games")
+                manifest = new_manifest(complete=True)
+                self._changed_files = None
+            ledgers = manifest["ledgers"]
+
+            current_files = {os.path.basename(path): path
+                             for path in self._ledger_paths()}
+            pending, removed, touched = self._compare_ledgers(ledgers,
+                                                              current_files)
+            if not (rebuild or pending or removed):
+                if touched:
+                    self._save_manifest(manifest)
+                print("Ledgers up to date")
+                return []
+
+            json_data = self._load_json_data()
+            changed = {file: ledgers.pop(file) for file in pending
+                       if file in ledgers}
+            entries, skipped = self._read_ledgers(
+                json_data, [current_files[file] for file in pending],
+                exclude_list, workers)
+            dropped = [day for file, day in skipped.items()
+                       if rebuild or file in changed]
+            if dropped and not force:
+                print(f"Nothing synced, {len(dropped)} games would be "
+                      f"dropped: {', '.join(dropped)}")
+                print("Exclude their unknown nicknames with --exclude, or "
+                      "pass --force to drop them")
+                return []
+
+            if rebuild:
+                for player in json_data:
+                    self._reset_player(player)
+            # players whose history must be replayed rather than appended to
+            affected_ids: set[str] = set()
+            for entry in changed.values():
+                affected_ids.update(entry["results"])
+            for file in removed:
+                entry = ledgers.pop(file)
+                affected_ids.update(entry["results"])
+                print(f"Poker game on {entry['day']} removed")
+            new_games = self._record_synced(ledgers, entries, affected_ids)
+
+            self._replay_players(json_data, ledgers, affected_ids, new_games)
+            self._save_json_data(json_data)
+            self._save_manifest(manifest)
+            print(f"{len(entries)} of {len(pending)} games synced, "
+                  f"{len(removed)} removed, "
+                  f"{len(affected_ids)} players recomputed")
+            return [entry["day"] for entry in entries.values()]
+
+    def recompute_stats(self) -> None:
+        """
+        Rebuilds every player's stats from the game results recorded in the
+        ledger manifest, in one vectorized pass and without reading any
+        ledger.
+
+        Requires a complete manifest, since games missing from it would be
+        dropped from the stats.
 
         Returns:
             None
         """
-        for file in sorted(os.listdir(self.ledger_folder_path)):
-            if file.endswith(".csv"):
-                filepath: str = f"{self.ledger_folder_path}/{file}"
-                self.add_poker_game(filepath, exclude_list)
+        from stats_engine import compute_player_stats, results_log
+
+        with self._store_lock():
+            manifest = self._load_manifest()
+            if not manifest["complete"]:
+                print("Ledger manifest is incomplete, run sync instead")
+                return
+
+            json_data = self._load_json_data()
+            stats = compute_player_stats(results_log(manifest))
+            for player in json_data:
+                self._reset_player(player)
+                player.update(stats.get(str(player["id"]), {}))
+
+            self._save_json_data(json_data)
+            print(f"Stats of {len(stats)} players recomputed from "
+                  f"{len(manifest['ledgers'])} games")
 
     def print_game_results(self, ledger_path: str) -> None:
         """
@@ -257,9 +1278,8 @@ class Poker:
 
         game_data, _ = self._load_game_data(ledger_path)
 
-        net_winnings_by_player = (
-            game_data.groupby("player_nickname")["net"].sum() / 100
-        ).to_dict()
+        net_winnings_by_player = self._calculate_net_winnings(
+            game_data["nets"])
         sorted_winnings = dict(
             sorted(
                 net_winnings_by_player.items(),
@@ -267,70 +1287,67 @@ class Poker:
             )
         )
         for name, net in sorted_winnings.items():
-            print(f"{name}: {net}")
+            print(f"{name}: {to_dollars(net)}")
 
-    def print_unique_nicknames(self) -> None:
+    def print_unique_nicknames(self, workers: int = 1) -> None:
         """
         Prints the unique nicknames of players found in the CSV
-        files within the ledger folder.
+        files within the ledger folder, followed by the ones that do not
+        belong to any player.
+
+        Args:
+            workers (int, optional): The number of processes parsing
+                ledgers. Defaults to 1, which parses serially.
 
         Returns:
             None
         """
         unique_nicknames = set()
 
-        for file in os.listdir(self.ledger_folder_path):
-            if file != ".DS_Store":
-                file_name = f"{self.ledger_folder_path}/{file}"
-                data = pd.read_csv(file_name)
-                unique_nicknames.update(data["player_nickname"].unique())
+        for file_name, game_data in self._parse_ledgers(
+                self._ledger_paths(), workers):
+            game_data, _ = self._load_game_data(file_name, game_data)
+            unique_nicknames.update(game_data["nets"])
 
         print(list(unique_nicknames))
 
+        nickname_index = self._get_nickname_index(self._load_json_data())
+        unknown_nicknames = nickname_index.unknown(sorted(unique_nicknames))
+        if unknown_nicknames:
+            print(f"Unknown nicknames: {unknown_nicknames}")
+
     def reset_net_fields(self) -> None:
         """
         Resets the net-related fields for each player in the JSON data.
 
-        This method sets the following fields to their initial values:
-        - net: 0
-        - games_played: []
-        - biggest_win: 0
-        - biggest_loss: 0
-        - highest_net: 0
-        - lowest_net: 0
-        - net_dictionary: {"01_01": 0}
-        - games_up_most: 0
-        - games_down_most: 0
-        - games_up: 0
-        - games_down: 0
+        This method sets putr to the base rating and the fields of
+        STAT_DEFAULTS, such as net, games_played and net_history, to their
+        initial values.
+
+        The ledger manifest is cleared as well, so every ledger can be added
+        again.
 
         Returns:
         None
         """
-        json_data = self._load_json_data()
+        with self._store_lock():
+            json_data = self._load_json_data()
 
-        for player in json_data:
-            player["net"] = 0
-            player["games_played"] = []
-            player["biggest_win"] = 0
-            player["biggest_loss"] = 0
-            player["highest_net"] = 0
-            player["lowest_net"] = 0
-            player["net_dictionary"] = {"01_01": 0}
-            player["games_up_most"] = 0
-            player["games_down_most"] = 0
-            player["games_up"] = 0
-            player["games_down"] = 0
-            player["average_net"] = 0
-
-        self._save_json_data(json_data)
+            for player in json_data:
+                self._reset_player(player)
+
+            self._save_json_data(json_data)
+            self._changed_files = None
+            self._save_manifest(new_manifest(complete=True))
 
     def sort_days_list(self) -> None:
         """
         Sorts the 'games_played' list for each player in the JSON data.
 
         This method loads the JSON data, sorts the 'games_played'list for each
-        player, and then saves the updated JSON data.
+        player along with its 'net_history' in the order the games were
+        played, and then saves the updated JSON data. Games missing from the
+        ledger folder go last.
 
         Parameters:
             None
@@ -338,20 +1355,25 @@ class Poker:
         Returns:
             None
         """
-        json_data = self._load_json_data()
+        with self._store_lock():
+            json_data = self._load_json_data()
 
-        for player in json_data:
-            player["games_played"] = sorted(player["games_played"])
+            position = {game_id: index for index, game_id
+                        in enumerate(self.catalog.game_ids())}
+            for player in json_data:
+                player["games_played"], player["net_history"] = sort_history(
+                    player["games_played"], player["net_history"],
+                    key=lambda day: (position.get(day, len(position)), day))
 
-        self._save_json_data(json_data)
+            self._changed_ids = None
+            self._save_json_data(json_data)
 
     def print_all_games(self) -> None:
         """
-        Prints the day of each game found in the ledger folder.
+        Prints the id of each game found in the ledger folder.
 
-        This method iterates over the files in the ledger folder and prints the
-        day of each game by extracting it from the file name. Only files with
-        the ".csv" extension are considered.
+        The games are listed from the game catalog in the order they were
+        played.
 
         Args:
             self (object): The instance of the class.
@@ -359,28 +1381,337 @@ class Poker:
         Returns:
             None
         """
-        for file in sorted(os.listdir(self.ledger_folder_path)):
-            if file.endswith(".csv"):
-                day = re.search(r"ledger(.*?)\.csv", file).group(1)
-                print(day)
+        for game_id in self.catalog.game_ids():
+            print(game_id)
 
-    def add_field(self) -> None:
+    def convert_game_ids(self) -> None:
         """
-        Adds a new field to each player in the JSON data.
+        Replaces the day labels of games recorded before games had
+        year-aware ids, such as "10_31(2)", with their ids, such as
+        "2023-10-31(2)".
 
-        This method iterates over each player in the JSON data and adds a new
-        field called "mock_field" with a default value of 0.
+        Labels are matched to ledgers of the ledger folder by file name, and
+        the start time of every recorded ledger is filled in from the game
+        catalog. Labels without a ledger are left as they are.
 
-        Args:
+        Returns:
             None
+        """
+        with self._store_lock():
+            json_data = self._load_json_data()
+            manifest = self._load_manifest()
+            entries = {entry["file"]: entry for entry in self.catalog.games()}
+            id_by_day = {entry["day"]: entry["id"]
+                         for entry in entries.values()}
+
+            for player in json_data:
+                games_played = [id_by_day.get(day, day)
+                                for day in player["games_played"]]
+                if games_played != player["games_played"]:
+                    player["games_played"] = games_played
+                    self._mark_changed(player_id=str(player["id"]))
+
+            for file, ledger in manifest["ledgers"].items():
+                entry = entries.get(file)
+                if entry is not None and "start" not in ledger:
+                    ledger["day"] = entry["id"]
+                    ledger["start"] = entry["start"]
+                    self._mark_changed(file=file)
+
+            self._save_json_data(json_data)
+            self._save_manifest(manifest)
+
+    def migrate_store(self) -> None:
+        """
+        Upgrades every player record to the current schema version.
+
+        A JSON store is streamed through record by record and rewritten in
+        its own layout, so the whole store is never held in memory. Only the
+        upgraded players of other stores are written.
 
         Returns:
             None
         """
-        json_data = self._load_json_data()
+        with self._store_lock():
+            if isinstance(self.store, JsonPlayerStore):
+                rotate_snapshots(self.store.path, self.store.snapshots)
+                migrated, total = migrate_json_file(self.store.path)
+                self._warm_players = None
+            else:
+                json_data = self._load_json_data()
+                for player in json_data:
+                    if upgrade_player(player):
+                        self._mark_changed(player_id=str(player["id"]))
+                migrated, total = len(self._changed_ids), len(json_data)
+                self._save_json_data(json_data)
+        print(f"Migrated {migrated} of {total} players to schema version "
+              f"{SCHEMA_VERSION}")
+
+    def top_players(self, key: str = "net", k: int = 10) -> list[dict]:
+        """
+        Returns the k highest ranked players.
+
+        Args:
+            key (str, optional): The ranking key, one of "net", "putr",
+                "average_net", "games_played" and "win_rate". Defaults to
+                "net".
+            k (int, optional): The number of players. Defaults to 10.
+
+        Returns:
+            list: The leaderboard rows with their rank, in dollars.
 
+        Raises:
+            ValueError: If the ranking key is unknown.
+        """
+        return self._get_leaderboard().top(key, k)
+
+    def player_rank(self, player_id: int, key: str = "net") -> dict | None:
+        """
+        Returns the rank of one player.
+
+        Args:
+            player_id (int): The id of the player.
+            key (str, optional): The ranking key. Defaults to "net".
+
+        Returns:
+            dict | None: The leaderboard row with its rank, in dollars, or
+            None if there is no player with this id.
+
+        Raises:
+            ValueError: If the ranking key is unknown.
+        """
+        return self._get_leaderboard().rank(key, player_id)
+
+    def leaderboard_page(self, key: str = "net", page: int = 1,
+                         size: int = 20) -> dict:
+        """
+        Returns one page of a ranking.
+
+        Args:
+            key (str, optional): The ranking key. Defaults to "net".
+            page (int, optional): The 1-based page number. Defaults to 1.
+            size (int, optional): The number of rows per page.
+                Defaults to 20.
+
+        Returns:
+            dict: The ranking key, page, page size, total number of players
+            and the rows of the page.
+
+        Raises:
+            ValueError: If the ranking key is unknown or the page or size is
+                not positive.
+        """
+        return self._get_leaderboard().page(key, page, size)
+
+    def _find_player(self, player_id: int) -> dict | None:
+        """
+        Returns the record of the player with the given id, in cents, or
+        None if there is no such player.
+        """
+        for player in self.store.load():
+            if player["id"] == player_id:
+                return player
+        return None
+
+    def player(self, player_id: int) -> dict | None:
+        """
+        Returns the full record of one player.
+
+        Args:
+            player_id (int): The id of the player.
+
+        Returns:
+            dict | None: The player record in dollars, or None if there is
+            no player with this id.
+        """
+        player = self._find_player(player_id)
+        if player is None:
+            return None
+        return encode_player(player)
+
+    def game(self, game_id: str) -> dict | None:
+        """
+        Returns the recorded results of one game.
+
+        Args:
+            game_id (str): The id of the game, such as "2023-10-31(2)".
+
+        Returns:
+            dict | None: The game id, ledger file, start time, ids of the
+            players up and down the most and the net of every player, highest
+            first and in dollars, or None if no game with this id was added.
+        """
+        manifest = self.store.load_manifest() or new_manifest(complete=False)
+        for file, entry in manifest["ledgers"].items():
+            if entry.get("day") == game_id:
+                break
+        else:
+            return None
+
+        names = {str(player["id"]): player["name"]
+                 for player in self.store.load()}
+        results = sorted(entry["results"].items(),
+                         key=lambda result: (-result[1], result[0]))
+        return {"id": game_id, "file": file, "start": entry.get("start"),
+                "up_most": entry["up_most"], "down_most": entry["down_most"],
+                "results": [{"id": int(player_id),
+                             "name": names.get(player_id),
+                             "net": to_dollars(net)}
+                            for player_id, net in results]}
+
+    def player_history(self, player_id: int, start: str | None = None,
+                       end: str | None = None,
+                       max_points: int | None = None) -> dict | None:
+        """
+        Returns a player's cumulative net after every game, ready to chart.
+
+        Args:
+            player_id (int): The id of the player.
+            start (str, optional): The first date to include, such as
+                "2023-10-01". Defaults to the first game.
+            end (str, optional): The last date to include. Defaults to the
+                last game.
+            max_points (int, optional): When given, the history is
+                downsampled to at most this many points, keeping the peaks
+                and troughs.
+
+        Returns:
+            dict | None: The game days and the cumulative net after each of
+            them in dollars, or None if there is no player with this id.
+
+        Raises:
+            ValueError: If max_points is below 2.
+        """
+        player = self._find_player(player_id)
+        if player is None:
+            return None
+
+        days, history = history_range(player["games_played"],
+                                      player["net_history"], start, end)
+        if max_points is not None:
+            positions = downsample(history, max_points)
+            days = [days[position] for position in positions]
+            history = [history[position] for position in positions]
+        return {"games": days, "net": [to_dollars(net) for net in history]}
+
+    def head_to_head(self, player_id: int, other_id: int) -> dict | None:
+        """
+        Returns how two players fared in the games they played together.
+
+        Args:
+            player_id (int): The id of the player.
+            other_id (int): The id of the other player.
+
+        Returns:
+            dict | None: The number of games shared and, for each of the two
+            players, their net, average net and games up in those games, in
+            dollars, or None if they never played together.
+        """
+        from coplay import shared_stats_row
+
+        coplay = self._get_game_index("coplay")
+        stats = coplay.pair(str(player_id), str(other_id))
+        if stats is None:
+            return None
+        other_stats = coplay.pair(str(other_id), str(player_id))
+        return {"games": stats["games"], "players": [
+            {"id": player_id, **shared_stats_row(stats)},
+            {"id": other_id, **shared_stats_row(other_stats)}]}
+
+    def partners(self, player_id: int) -> list[dict] | None:
+        """
+        Returns how a player fares with each player they have played with,
+        against how they fare without them.
+
+        Args:
+            player_id (int): The id of the player.
+
+        Returns:
+            list | None: For every other player, most shared games first,
+            their id, name, the games shared and the player's net, average
+            net and games up in them, along with the player's average net
+            in their other games, in dollars. None if there is no player
+            with this id.
+        """
+        json_data = self.store.load()
+        names = {str(player["id"]): player["name"] for player in json_data}
         for player in json_data:
-            # edit line below to add desired field
-            player["mock_field"] = 0
+            if player["id"] == player_id:
+                break
+        else:
+            return None
+
+        from coplay import shared_stats_row
+
+        games = len(player["games_played"])
+        coplay = self._get_game_index("coplay")
+        rows = []
+        for other_id, stats in coplay.partners(str(player_id)).items():
+            games_without = games - stats["games"]
+            rows.append({
+                "id": int(other_id), "name": names.get(other_id),
+                **shared_stats_row(stats),
+                "average_net_without": to_dollars(
+                    (player["net"] - stats["net"]) / games_without)
+                if games_without else None})
+        rows.sort(key=lambda row: (-row["games"], row["id"]))
+        return rows
+
+    def session_stats(self, player_id: int) -> dict | None:
+        """
+        Returns a player's time at the table and buy-ins over the games that
+        recorded sessions.
+
+        Args:
+            player_id (int): The id of the player.
+
+        Returns:
+            dict | None: The games with session data, the timed games
+            without open sessions and the hours played and net per hour in
+            them, total buy-in, rebuys, biggest buy-in of one session and
+            number of sessions left open, in dollars, or None if the player
+            has no recorded sessions.
+        """
+        totals = self._get_game_index("sessions").totals(str(player_id))
+        if totals is None:
+            return None
+        return session_row(totals)
+
+    def nickname_candidates(self, name: str, player_id: str | None = None,
+                            limit: int = 5) -> list[dict]:
+        """
+        Returns the players a nickname most likely belongs to.
+
+        Args:
+            name (str): The nickname.
+            player_id (str, optional): The PokerNow player id the nickname
+                sat under.
+            limit (int, optional): The most candidates to return. Defaults
+                to 5.
+
+        Returns:
+            list: The id and name of every candidate, best first, with the
+            similarity score from 0 to 1 and the alias that matched.
+        """
+        json_data = self._load_json_data()
+        return [{"id": json_data[candidate["position"]]["id"],
+                 "name": json_data[candidate["position"]]["name"],
+                 "score": candidate["score"], "alias": candidate["alias"]}
+                for candidate in self._get_alias_index(json_data).candidates(
+                    name, player_id, limit)]
+
+    def export_frontend(self, output_dir: str, compress: bool = False) -> None:
+        """
+        Writes the compact leaderboard and per-player files for the frontend.
+
+        Args:
+            output_dir (str): The directory to write the files to.
+            compress (bool, optional): Whether to also write gzipped copies.
+                Defaults to False.
 
-        self._save_json_data(json_data)
+        Returns:
+            None
+        """
+        json_data = self._load_json_data()
+        write_frontend_files(json_data, output_dir, compress,
+                             self._get_leaderboard(json_data))
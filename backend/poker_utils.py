@@ -1,3 +1,6 @@
+from migrations import upgrade_player
+
+
 def get_min_and_max_names(amount_dict: dict) -> tuple[list, list]:
     """
     Returns the names with the maximum and minimum amounts from the given
@@ -30,3 +33,81 @@ def get_min_and_max_names(amount_dict: dict) -> tuple[list, list]:
             min_amount = amount
 
     return max_names, min_names
+
+
+# player fields holding amounts of money
+MONEY_FIELDS = ["net", "biggest_win", "biggest_loss", "highest_net",
+                "lowest_net", "average_net"]
+
+
+def to_cents(dollars: float) -> int:
+    """
+    Converts an amount in dollars to integer cents.
+
+    Args:
+        dollars (float): The amount in dollars.
+
+    Returns:
+        int: The amount in cents, rounded to the nearest cent.
+    """
+    return round(dollars * 100)
+
+
+def to_dollars(cents: float) -> float:
+    """
+    Converts an amount in cents to dollars.
+
+    Args:
+        cents (float): The amount in cents.
+
+    Returns:
+        float: The amount in dollars.
+    """
+    return cents / 100
+
+
+def decode_player(player: dict) -> dict:
+    """
+    Converts the money fields of a player record from dollars, as stored in
+    JSON, to cents, in place.
+
+    average_net stays a float number of cents, every other amount becomes
+    an integer. Records of an older schema are upgraded first.
+
+    Args:
+        player (dict): The player record in dollars.
+
+    Returns:
+        dict: The same player record, in cents.
+    """
+    upgrade_player(player)
+    for field in MONEY_FIELDS:
+        if field == "average_net":
+            if field in player:
+                player[field] = player[field] * 100
+        elif field in player:
+            player[field] = to_cents(player[field])
+    if "net_history" in player:
+        player["net_history"] = [to_cents(net)
+                                 for net in player["net_history"]]
+    return player
+
+
+def encode_player(player: dict) -> dict:
+    """
+    Returns a copy of a player record with its money fields in dollars.
+
+    Args:
+        player (dict): The player record in cents.
+
+    Returns:
+        dict: A copy of the player record, in dollars.
+    """
+    encoded = dict(player)
+    for field in MONEY_FIELDS:
+        if field in encoded:
+            encoded[field] = to_dollars(encoded[field])
+    if "net_history" in encoded:
+        encoded["net_history"] = [to_dollars(net)
+                                  for net in encoded["net_history"]]
+    return encoded
@@ -0,0 +1,268 @@
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterable
+
+from poker_utils import to_dollars
+
+LEADERBOARD_FIELDS = ["id", "flag", "name", "putr", "net"]
+
+
+def leaderboard_row(player: dict) -> dict:
+    """
+    Returns the fields the leaderboard renders for one player.
+
+    Args:
+        player (dict): The player record, in cents.
+
+    Returns:
+        dict: The leaderboard fields, in dollars.
+    """
+    return {field: to_dollars(player[field]) if field == "net"
+            else player[field] for field in LEADERBOARD_FIELDS}
+
+
+def win_rate(player: dict) -> float:
+    """
+    Returns the share of a player's games that they finished up.
+
+    Args:
+        player (dict): The player record.
+
+    Returns:
+        float: The win rate, or 0 for a player without games.
+    """
+    games = len(player["games_played"])
+    return player["games_up"] / games if games else 0.0
+
+
+# how every ranking reads its value from a player record, highest first
+RANKING_KEYS: dict[str, Callable[[dict], float]] = {
+    "net": lambda player: player["net"],
+    "putr": lambda player: player["putr"],
+    "average_net": lambda player: player["average_net"],
+    "games_played": lambda player: len(player["games_played"]),
+    "win_rate": win_rate,
+}
+# rankings whose values are amounts of money, kept in cents
+MONEY_KEYS = {"net", "average_net"}
+
+
+class RankingIndex:
+    """
+    Keeps player ids sorted by one ranking key, highest first.
+
+    Entries are (-value, id) tuples in a sorted list, so ties are broken by
+    id and finding a player's position is a binary search.
+    """
+
+    def __init__(self, key: str) -> None:
+        """
+        Creates an empty index.
+
+        Args:
+            key (str): The ranking key, one of RANKING_KEYS.
+
+        Raises:
+            ValueError: If the ranking key is unknown.
+        """
+        if key not in RANKING_KEYS:
+            raise ValueError(f"Unknown ranking key: {key}")
+        self.key = key
+        self._value = RANKING_KEYS[key]
+        self._entries: list[tuple[float, int]] = []
+        self._entry_by_id: dict[int, tuple[float, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, player: dict) -> bool:
+        """
+        Inserts a player, or repositions them if their value changed.
+
+        Args:
+            player (dict): The player record.
+
+        Returns:
+            bool: Whether the player was inserted or moved.
+        """
+        entry = (-self._value(player), player["id"])
+        old_entry = self._entry_by_id.get(player["id"])
+        if old_entry == entry:
+            return False
+        if old_entry is not None:
+            del self._entries[bisect_left(self._entries, old_entry)]
+        insort(self._entries, entry)
+        self._entry_by_id[player["id"]] = entry
+        return True
+
+    def rank(self, player_id: int) -> int | None:
+        """
+        Returns the 1-based rank of a player.
+
+        Args:
+            player_id (int): The id of the player.
+
+        Returns:
+            int | None: The rank, or None if the player is not indexed.
+        """
+        entry = self._entry_by_id.get(player_id)
+        if entry is None:
+            return None
+        return bisect_left(self._entries, entry) + 1
+
+    def ids(self, start: int = 0, stop: int | None = None) -> list[int]:
+        """
+        Returns the ids of the players ranked start + 1 to stop.
+
+        Args:
+            start (int, optional): The number of players to skip.
+                Defaults to 0.
+            stop (int, optional): The position to stop at. Defaults to the
+                end of the ranking.
+
+        Returns:
+            list: The player ids, highest ranked first.
+        """
+        return [player_id for _, player_id in self._entries[start:stop]]
+
+
+class Leaderboard:
+    """
+    Holds a RankingIndex per ranking key together with the rendered
+    leaderboard row of every player.
+
+    Updating a player only touches the indexes whose value changed, and
+    queries read the rows without going back to the player records.
+    """
+
+    def __init__(self, json_data: list[dict]) -> None:
+        """
+        Builds the rankings of all players.
+
+        Args:
+            json_data (list): The player records, in cents.
+        """
+        self._indexes = {key: RankingIndex(key) for key in RANKING_KEYS}
+        self._rows: dict[int, dict] = {}
+        self._positions: dict[str, int] = {}
+        for position, player in enumerate(json_data):
+            self._positions[str(player["id"])] = position
+        self.update(json_data)
+
+    def update(self, players: Iterable[dict]) -> int:
+        """
+        Refreshes the rows and ranking positions of some players.
+
+        Args:
+            players (iterable): The changed player records, in cents.
+
+        Returns:
+            int: The number of ranking positions that moved.
+        """
+        moved = 0
+        for player in players:
+            row = leaderboard_row(player)
+            for key, index in self._indexes.items():
+                value = RANKING_KEYS[key](player)
+                row[key] = to_dollars(value) if key in MONEY_KEYS else value
+                moved += index.update(player)
+            self._rows[player["id"]] = row
+        return moved
+
+    def update_ids(self, json_data: list[dict],
+                   player_ids: Iterable[str]) -> int:
+        """
+        Refreshes the players with the given ids.
+
+        Args:
+            json_data (list): The player records the leaderboard was built
+                from, in cents.
+            player_ids (iterable): The ids of the changed players.
+
+        Returns:
+            int: The number of ranking positions that moved.
+        """
+        return self.update(json_data[self._positions[player_id]]
+                           for player_id in player_ids)
+
+    def _index(self, key: str) -> RankingIndex:
+        if key not in self._indexes:
+            raise ValueError(f"Unknown ranking key: {key}")
+        return self._indexes[key]
+
+    def _ranked_rows(self, key: str, start: int,
+                     stop: int | None) -> list[dict]:
+        return [dict(self._rows[player_id], rank=rank)
+                for rank, player_id in enumerate(
+                    self._index(key).ids(start, stop), start + 1)]
+
+    def top(self, key: str, k: int) -> list[dict]:
+        """
+        Returns the rows of the k highest ranked players.
+
+        Args:
+            key (str): The ranking key.
+            k (int): The number of players.
+
+        Returns:
+            list: The leaderboard rows with their rank, in dollars.
+
+        Raises:
+            ValueError: If the ranking key is unknown.
+        """
+        return self._ranked_rows(key, 0, k)
+
+    def rank(self, key: str, player_id: int) -> dict | None:
+        """
+        Returns the row of one player with their rank.
+
+        Args:
+            key (str): The ranking key.
+            player_id (int): The id of the player.
+
+        Returns:
+            dict | None: The leaderboard row with its rank, in dollars, or
+            None if the player is unknown.
+
+        Raises:
+            ValueError: If the ranking key is unknown.
+        """
+        rank = self._index(key).rank(player_id)
+        if rank is None:
+            return None
+        return dict(self._rows[player_id], rank=rank)
+
+    def rankings(self) -> dict[str, list[dict]]:
+        """
+        Returns every ranking in full.
+
+        Returns:
+            dict: A dictionary mapping ranking keys to all leaderboard rows
+            with their rank, in dollars.
+        """
+        return {key: self._ranked_rows(key, 0, None)
+                for key in self._indexes}
+
+    def page(self, key: str, page: int = 1, size: int = 20) -> dict:
+        """
+        Returns one page of a ranking.
+
+        Args:
+            key (str): The ranking key.
+            page (int, optional): The 1-based page number. Defaults to 1.
+            size (int, optional): The number of rows per page.
+                Defaults to 20.
+
+        Returns:
+            dict: The ranking key, page, page size, total number of players
+            and the rows of the page.
+
+        Raises:
+            ValueError: If the ranking key is unknown or the page or size is
+                not positive.
+        """
+        if page < 1 or size < 1:
+            raise ValueError("Page and page size must be positive")
+        start = (page - 1) * size
+        return {"key": key, "page": page, "size": size,
+                "total": len(self._index(key)),
+                "rows": self._ranked_rows(key, start, start + size)}
@@ -0,0 +1,85 @@
+import numpy as np
+
+# rating of a player who has not played yet
+BASE_RATING = 12.0
+# rating points per standard deviation of a game's nets
+RATING_SCALE = 2.0
+# per-game scores are clipped to this many standard deviations
+MAX_SCORE = 3.0
+# phantom games at the base rating, so a few lucky games do not make a
+# new player the best in the league
+PRIOR_GAMES = 5
+
+
+def game_scores(game: np.ndarray, net_cents: np.ndarray) -> np.ndarray:
+    """
+    Scores every result against the other results of its game.
+
+    A score is the number of standard deviations a net is above the mean
+    net of its game, clipped to MAX_SCORE. Games where everybody broke even
+    score 0.
+
+    Args:
+        game (np.ndarray): The game index of every result.
+        net_cents (np.ndarray): The net of every result, in cents.
+
+    Returns:
+        np.ndarray: The score of every result.
+    """
+    if not len(game):
+        return np.zeros(0)
+    net_cents = net_cents.astype(np.float64)
+    counts = np.bincount(game)
+    means = np.bincount(game, weights=net_cents) / np.maximum(counts, 1)
+    deviations = net_cents - means[game]
+    stds = np.sqrt(np.bincount(game, weights=deviations ** 2)
+                   / np.maximum(counts, 1))
+    spread = stds[game]
+    scores = np.divide(deviations, spread, out=np.zeros_like(deviations),
+                       where=spread > 0)
+    return np.clip(scores, -MAX_SCORE, MAX_SCORE)
+
+
+def update_ratings(ratings: np.ndarray, games: np.ndarray,
+                   scores: np.ndarray) -> np.ndarray:
+    """
+    Folds one game into the ratings of the players who played it.
+
+    Args:
+        ratings (np.ndarray): The ratings before the game.
+        games (np.ndarray): The number of games each player had played
+            before the game.
+        scores (np.ndarray): The score of each player in the game.
+
+    Returns:
+        np.ndarray: The ratings after the game.
+    """
+    weights = games + PRIOR_GAMES
+    return ((ratings * weights + BASE_RATING + RATING_SCALE * scores)
+            / (weights + 1))
+
+
+def compute_ratings(game: np.ndarray, player: np.ndarray,
+                    net_cents: np.ndarray) -> dict[str, float]:
+    """
+    Computes the PUTR of every player from their whole game history.
+
+    The results form a sparse player by game matrix, given as one entry per
+    result. The rating is the base rating plus the scaled sum of a player's
+    scores, averaged over their games and PRIOR_GAMES phantom games, so it
+    matches folding the games one by one with update_ratings.
+
+    Args:
+        game (np.ndarray): The game index of every result.
+        player (np.ndarray): The player id of every result.
+        net_cents (np.ndarray): The net of every result, in cents.
+
+    Returns:
+        dict: A dictionary mapping player ids to their ratings.
+    """
+    ids, codes = np.unique(player, return_inverse=True)
+    scores = game_scores(game, net_cents)
+    totals = np.bincount(codes, weights=scores, minlength=len(ids))
+    games = np.bincount(codes, minlength=len(ids))
+    ratings = BASE_RATING + RATING_SCALE * totals / (games + PRIOR_GAMES)
+    return dict(zip(ids.tolist(), ratings.tolist()))
@@ -0,0 +1,206 @@
+import csv
+from datetime import datetime, timedelta
+
+from ledger_manifest import SESSION_FIELDS
+from ledger_reader import complete_rows
+from poker_utils import to_dollars
+
+SESSION_COLUMNS = ["player_nickname", "session_start_at", "session_end_at",
+                   "buy_in"]
+# a player's totals in a SessionIndex: the sums of SESSION_FIELDS, with the
+# largest biggest_buy_in, their net, the seconds, net and number of the games
+# without open sessions, and the number of games
+TOTAL_FIELDS = SESSION_FIELDS + ["net", "timed_seconds", "timed_net",
+                                 "timed_games", "games"]
+
+
+def _timestamp(value: str) -> datetime | None:
+    """
+    Parses an ISO 8601 UTC timestamp, with an empty value becoming None.
+    """
+    return datetime.fromisoformat(value.rstrip("Z")) if value else None
+
+
+def read_sessions(ledger_csv_path: str) -> dict[str, list[int]]:
+    """
+    Sums up the sessions of every player in a ledger in one pass over its
+    rows.
+
+    Every row of a ledger is a session, from sitting down to leaving the
+    table, with the chips bought during it. A session without an end was
+    still open when the ledger was downloaded, so its length is unknown: it
+    is counted as open and adds no time.
+
+    Args:
+        ledger_csv_path (str): The path to the ledger CSV.
+
+    Returns:
+        dict: A dictionary mapping player nicknames to their seconds played,
+        total buy-in in cents, number of sessions, biggest buy-in of one
+        session in cents and number of open sessions, as in SESSION_FIELDS.
+        Empty for a ledger missing a session column, such as an older
+        export, which has no sessions to record.
+
+    Raises:
+        ValueError: If a row is truncated.
+    """
+    with open(ledger_csv_path, "r", newline="",
+              encoding="utf-8") as ledger_file:
+        reader = csv.reader(ledger_file)
+        header = next(reader, [])
+        if not set(SESSION_COLUMNS).issubset(header):
+            return {}
+        indexes = [header.index(column) for column in SESSION_COLUMNS]
+        rows = [(name, _timestamp(start), _timestamp(end), int(buy_in or 0))
+                for name, start, end, buy_in
+                in ([row[index] for index in indexes]
+                    for row in complete_rows(reader, header,
+                                             ledger_csv_path))]
+
+    milliseconds: dict[str, int] = {}
+    stats: dict[str, list[int]] = {}
+    for name, start, end, buy_in in rows:
+        if start is not None and end is not None:
+            milliseconds[name] = milliseconds.get(name, 0) + max(
+                (end - start) // timedelta(milliseconds=1), 0)
+        totals = stats.setdefault(name, [0, 0, 0, 0, 0])
+        totals[1] += buy_in
+        totals[2] += 1
+        totals[3] = max(totals[3], buy_in)
+        totals[4] += end is None
+    for name, totals in stats.items():
+        totals[0] = milliseconds.get(name, 0) // 1000
+    return dict(sorted(stats.items()))
+
+
+def _game_totals(game: dict, player_id: str, stats: list[int]) -> list[int]:
+    """
+    Returns what one game adds to a player's totals, in the order of
+    TOTAL_FIELDS without the game count.
+    """
+    net = game["results"].get(player_id, 0)
+    timed = not stats[4]
+    return [*stats, net, stats[0] * timed, net * timed, int(timed)]
+
+
+def combine_sessions(first: list[int], second: list[int]) -> list[int]:
+    """
+    Combines the session stats of two nicknames of the same player, or of
+    two games.
+
+    Args:
+        first (list): Session stats, as in SESSION_FIELDS.
+        second (list): Session stats, as in SESSION_FIELDS.
+
+    Returns:
+        list: The combined stats, with the larger biggest buy-in.
+    """
+    combined = [a + b for a, b in zip(first, second)]
+    combined[3] = max(first[3], second[3])
+    return combined
+
+
+def session_row(totals: dict) -> dict:
+    """
+    Returns a player's session stats as shown to users.
+
+    The length of a session still open when its ledger was downloaded is
+    unknown, so hours and the hourly rate only cover the timed games, in
+    which every session of the player was closed.
+
+    Args:
+        totals (dict): The player's totals from a SessionIndex, in cents
+            and seconds.
+
+    Returns:
+        dict: The games with session data, the timed games, hours played and
+        net per hour in them, total buy-in, rebuys, biggest buy-in and open
+        sessions, in dollars. The hourly rate is None without any time
+        played.
+    """
+    hours = totals["timed_seconds"] / 3600
+    return {"games": totals["games"], "timed_games": totals["timed_games"],
+            "hours": round(hours, 2),
+            "hourly_rate": to_dollars(totals["timed_net"] / hours) if hours
+            else None,
+            "buy_in": to_dollars(totals["buy_in"]),
+            "rebuys": totals["sessions"] - totals["games"],
+            "biggest_buy_in": to_dollars(totals["biggest_buy_in"]),
+            "open_sessions": totals["open_sessions"]}
+
+
+class SessionIndex:
+    """
+    Holds every player's session totals over the games that recorded
+    sessions, along with the time and net of their timed games, in which
+    none of their sessions was left open.
+
+    The totals are built from the session stats stored with every game in
+    the manifest, so no ledger is read, and a new game only updates its own
+    players.
+    """
+
+    def __init__(self, manifest: dict) -> None:
+        """
+        Builds the totals of every game in a ledger manifest.
+
+        Args:
+            manifest (dict): The ledger manifest.
+        """
+        import numpy as np
+
+        self._totals: dict[str, list[int]] = {}
+        ids, values = [], []
+        for entry in manifest["ledgers"].values():
+            for player_id, stats in entry.get("sessions", {}).items():
+                ids.append(player_id)
+                values.append(_game_totals(entry, player_id, stats))
+        if not ids:
+            return
+
+        ids, codes = np.unique(np.array(ids), return_inverse=True)
+        values = np.array(values, dtype=np.int64)
+        sums = np.zeros((len(ids), values.shape[1]), dtype=np.int64)
+        np.add.at(sums, codes, values)
+        biggest = np.zeros(len(ids), dtype=np.int64)
+        np.maximum.at(biggest, codes, values[:, 3])
+        sums[:, 3] = biggest
+        games = np.bincount(codes, minlength=len(ids))
+        for player_id, row, count in zip(ids.tolist(), sums.tolist(),
+                                         games.tolist()):
+            self._totals[player_id] = [*row, count]
+
+    def add_game(self, game: dict) -> None:
+        """
+        Folds the sessions of one game into its players' totals.
+
+        Args:
+            game (dict): The game record, with its results and sessions.
+
+        Returns:
+            None
+        """
+        for player_id, stats in game.get("sessions", {}).items():
+            totals = self._totals.get(player_id, [0] * len(TOTAL_FIELDS))
+            game_totals = _game_totals(game, player_id, stats)
+            self._totals[player_id] = [
+                *combine_sessions(totals[:5], stats),
+                *(total + value for total, value
+                  in zip(totals[5:], game_totals[5:])),
+                totals[-1] + 1]
+
+    def totals(self, player_id: str) -> dict | None:
+        """
+        Returns a player's session totals.
+
+        Args:
+            player_id (str): The id of the player.
+
+        Returns:
+            dict | None: The totals of TOTAL_FIELDS, in cents and seconds,
+            or None if the player has no recorded sessions.
+        """
+        totals = self._totals.get(player_id)
+        if totals is None:
+            return None
+        return dict(zip(TOTAL_FIELDS, totals))
@@ -0,0 +1,236 @@
+import json
+import os
+from html import escape
+
+from poker_utils import encode_player
+from ranking_index import Leaderboard
+from storage import atomic_write_bytes, remove_stale_files
+
+# pre-rendered leaderboard page of every ordering the frontend offers
+SITE_PAGES = {"net": "index.html", "putr": "putr.html"}
+
+LEADERBOARD_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <link rel="stylesheet" type="text/css" href="{static}/style.css">
+    <title>Poker Leaderboard</title>
+</head>
+<body>
+<div class="Leaderboard-header">
+    <div id="brown-logo">
+      <img src="{static}/images/brownlogo.png">
+    </div>
+    <div id="header-text">
+      <h1>BMT Poker Leaderboard</h1>
+    </div>
+    <div id="putr-logo">
+      <img src="{static}/images/opt1-clear.png">
+    </div>
+</div>
+<div class="leaderboard-container">
+    <div class="table-container">
+        <table class="leaderboard-table" id="leaderboard-table">
+            <thead>
+              <tr id="table-header">
+                <th>Flag</th>
+                <th>Name</th>
+                <th><a href="putr.html">PUTR &#x25B2;</a></th>
+                <th><a href="index.html">Net W/L ($) &#x25B2;</a></th>
+              </tr>
+            </thead>
+            <tbody id="table-body">
+{rows}
+            </tbody>
+          </table>
+    </div>
+</div>
+</body>
+</html>
+"""
+
+LEADERBOARD_ROW = """              <tr>
+                <td class="flag-container">
+                  <img src="{static}/{flag}" class="player-flag"/>
+                </td>
+                <td class="player-name">
+                  <a href="players/{id}.html">{name}</a>
+                </td>
+                <td class="player-putr">{putr:.2f}</td>
+                <td class="player-net">{net:.2f}</td>
+              </tr>"""
+
+PROFILE_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <link rel="stylesheet" type="text/css" href="{static}/style.css">
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <title>{name}</title>
+</head>
+<body>
+    <div class="profile-container">
+        <button><a href="../index.html">Home</a></button>
+        <div id="playerInfo">
+            <h1>{name}</h1>
+        </div>
+        <div id="playerStats">
+            <p>PUTR: {putr:.2f}</p>
+            <p>Net: {net:.2f}</p>
+            <p>Games Played: {games}</p>
+            <p>Biggest Win: {biggest_win:.2f}</p>
+            <p>Biggest Loss: {biggest_loss:.2f}</p>
+            <p>Highest Net: {highest_net:.2f}</p>
+            <p>Lowest Net: {lowest_net:.2f}</p>
+            <p>Games Up Most: {games_up_most}</p>
+            <p>Games Down Most: {games_down_most}</p>
+            <p>Games Up: {games_up}</p>
+            <p>Games Down: {games_down}</p>
+            <p>Average Net {average_net:.2f}</p>
+        </div>
+        <canvas id="lineChart"></canvas>
+    </div>
+    <script>
+        new Chart(document.getElementById('lineChart').getContext('2d'), {{
+            type: 'line',
+            data: {{
+                labels: {dates},
+                datasets: [{{
+                    label: 'Net Winnings Chart',
+                    data: {nets},
+                    borderColor: 'blue',
+                    borderWidth: 2,
+                    fill: false
+                }}]
+            }},
+            options: {{
+                scales: {{
+                    x: {{title: {{display: true, text: 'Date'}},
+                         beginAtZero: true}},
+                    y: {{title: {{display: true, text: 'Net Winnings ($)'}},
+                         beginAtZero: true}}
+                }}
+            }}
+        }});
+    </script>
+</body>
+</html>
+"""
+
+
+def _script_json(data) -> str:
+    """
+    Returns data as JSON that is safe to embed in a script element.
+    """
+    return json.dumps(data).replace("</", "<\\/")
+
+
+def _relative_url(path: str, start: str) -> str:
+    """
+    Returns the relative URL path from the directory start to path.
+    """
+    return os.path.relpath(os.path.abspath(path),
+                           os.path.abspath(start)).replace(os.sep, "/")
+
+
+def render_leaderboard(rows: list[dict], static: str = "..") -> str:
+    """
+    Renders a leaderboard page with its rows in the given order.
+
+    Args:
+        rows (list): The leaderboard rows, in dollars, as ranked by a
+            Leaderboard.
+        static (str, optional): The URL path from the page to the
+            stylesheet, images and flags of the frontend. Defaults to "..".
+
+    Returns:
+        str: The HTML page.
+    """
+    return LEADERBOARD_PAGE.format(static=static, rows="\n".join(
+        LEADERBOARD_ROW.format(id=row["id"], static=static,
+                               flag=escape(row["flag"]),
+                               name=escape(row["name"]), putr=row["putr"],
+                               net=row["net"])
+        for row in rows))
+
+
+def render_profile(player: dict, static: str = "../..") -> str:
+    """
+    Renders a player's profile page, with the data of their net chart
+    embedded.
+
+    Args:
+        player (dict): The player record, in dollars.
+        static (str, optional): The URL path from the page to the
+            stylesheet of the frontend. Defaults to "../..".
+
+    Returns:
+        str: The HTML page.
+    """
+    return PROFILE_PAGE.format(
+        static=static, name=escape(player["name"]), putr=player["putr"],
+        net=player["net"], games=len(player["games_played"]),
+        biggest_win=player["biggest_win"],
+        biggest_loss=player["biggest_loss"],
+        highest_net=player["highest_net"], lowest_net=player["lowest_net"],
+        games_up_most=player["games_up_most"],
+        games_down_most=player["games_down_most"],
+        games_up=player["games_up"], games_down=player["games_down"],
+        average_net=player["average_net"],
+        dates=_script_json(player["games_played"]),
+        nets=_script_json(player["net_history"]))
+
+
+def write_site(json_data: list[dict], output_dir: str,
+               leaderboard: Leaderboard | None = None,
+               changed_ids: set[str] | None = None,
+               static_dir: str | None = None) -> None:
+    """
+    Pre-renders the leaderboard and profile pages to site/ in output_dir,
+    so serving them is a plain file read.
+
+    The leaderboard pages are rendered every time, since any game can move
+    every rank, but only the profiles of changed players are rendered
+    again. The profiles of players no longer in json_data are removed.
+
+    Args:
+        json_data (list): The player records, in cents.
+        output_dir (str): The directory to write site/ to.
+        leaderboard (Leaderboard, optional): The up to date rankings of
+            json_data. Built from json_data when not given.
+        changed_ids (set, optional): The ids of the players changed since
+            the pages were last written. Every profile is rendered when not
+            given.
+        static_dir (str, optional): The directory holding the stylesheet,
+            images and flags of the frontend, which the pages link to.
+            Defaults to the parent of output_dir.
+
+    Returns:
+        None
+    """
+    site_dir = os.path.join(output_dir, "site")
+    players_dir = os.path.join(site_dir, "players")
+    if static_dir is None:
+        static_dir = os.path.dirname(os.path.abspath(output_dir))
+    static = _relative_url(static_dir, site_dir)
+    profile_static = _relative_url(static_dir, players_dir)
+    os.makedirs(players_dir, exist_ok=True)
+    if leaderboard is None:
+        leaderboard = Leaderboard(json_data)
+
+    rankings = leaderboard.rankings()
+    for key, page in SITE_PAGES.items():
+        atomic_write_bytes(os.path.join(site_dir, page),
+                           render_leaderboard(rankings[key],
+                                              static).encode("utf-8"))
+    for player in json_data:
+        path = os.path.join(players_dir, f"{player['id']}.html")
+        if (changed_ids is not None and str(player["id"]) not in changed_ids
+                and os.path.exists(path)):
+            continue
+        atomic_write_bytes(path, render_profile(
+            encode_player(player), profile_static).encode("utf-8"))
+    remove_stale_files(players_dir,
+                       {f"{player['id']}.html" for player in json_data})
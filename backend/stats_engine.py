@@ -0,0 +1,94 @@
+import pandas as pd
+
+from ledger_manifest import game_order
+from rating_engine import compute_ratings
+
+LOG_COLUMNS = ["game", "day", "player", "net_cents", "up_most", "down_most"]
+
+
+def results_log(manifest: dict) -> pd.DataFrame:
+    """
+    Flattens the ledger manifest into a results log with one row per player
+    per game.
+
+    Games are numbered in the order they were played, which is the order
+    they are folded into the player store.
+
+    Args:
+        manifest (dict): The ledger manifest.
+
+    Returns:
+        pd.DataFrame: The log, with columns game, day, player, net_cents,
+        up_most and down_most.
+    """
+    rows = []
+    ledgers = manifest["ledgers"]
+    for game, file in enumerate(game_order(ledgers)):
+        entry = ledgers[file]
+        up_most = set(entry["up_most"])
+        down_most = set(entry["down_most"])
+        for player, net in entry["results"].items():
+            rows.append((game, entry["day"], player, net,
+                         player in up_most, player in down_most))
+    return pd.DataFrame(rows, columns=LOG_COLUMNS).astype(
+        {"game": "int64", "net_cents": "int64", "up_most": "bool",
+         "down_most": "bool"})
+
+
+def compute_player_stats(log: pd.DataFrame) -> dict[str, dict]:
+    """
+    Computes the stats block of every player in a results log in one pass.
+
+    The result matches folding the games one by one into freshly reset
+    players: extremes start from 0 and putr starts from the base rating.
+
+    Args:
+        log (pd.DataFrame): The results log, as built by results_log.
+
+    Returns:
+        dict: A dictionary mapping player ids to their stats, in cents.
+    """
+    ratings = compute_ratings(log["game"].to_numpy(),
+                              log["player"].to_numpy(),
+                              log["net_cents"].to_numpy())
+    log = log.sort_values(["player", "game"], kind="stable")
+    log = log.assign(
+        cumulative=log.groupby("player", sort=False)["net_cents"].cumsum(),
+        up=log["net_cents"] > 0,
+        down=log["net_cents"] < 0,
+    )
+    grouped = log.groupby("player", sort=False)
+
+    summary = pd.DataFrame({
+        "net": grouped["net_cents"].sum(),
+        "biggest_win": grouped["net_cents"].max().clip(lower=0),
+        "biggest_loss": grouped["net_cents"].min().clip(upper=0),
+        "highest_net": grouped["cumulative"].max().clip(lower=0),
+        "lowest_net": grouped["cumulative"].min().clip(upper=0),
+        "games_up_most": grouped["up_most"].sum(),
+        "games_down_most": grouped["down_most"].sum(),
+        "games_up": grouped["up"].sum(),
+        "games_down": grouped["down"].sum(),
+        "games": grouped.size(),
+    })
+    days = grouped["day"].agg(list)
+    cumulatives = grouped["cumulative"].agg(list)
+
+    stats = {}
+    for player, row in summary.iterrows():
+        stats[player] = {
+            "putr": ratings[player],
+            "net": int(row["net"]),
+            "games_played": days[player],
+            "biggest_win": int(row["biggest_win"]),
+            "biggest_loss": int(row["biggest_loss"]),
+            "highest_net": int(row["highest_net"]),
+            "lowest_net": int(row["lowest_net"]),
+            "net_history": [int(net) for net in cumulatives[player]],
+            "games_up_most": int(row["games_up_most"]),
+            "games_down_most": int(row["games_down_most"]),
+            "games_up": int(row["games_up"]),
+            "games_down": int(row["games_down"]),
+            "average_net": int(row["net"]) / int(row["games"]),
+        }
+    return stats
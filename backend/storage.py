@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from metrics import count
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock
+    fcntl = None
+
+
+@contextmanager
+def atomic_open(path: str):
+    """
+    Opens a temporary file to write path through, so that path always holds
+    either the old or the new contents, even if the process dies mid-write.
+
+    The temporary file is in the same directory as path. When the block
+    exits normally it is fsynced and renamed over path, and when it raises
+    it is removed and path is left as it was.
+
+    Args:
+        path (str): The path of the file to write.
+
+    Yields:
+        BinaryIO: The temporary file, open for writing bytes.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            yield temp_file
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+            size = temp_file.tell()
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    _fsync_directory(directory)
+    count("bytes_written", size)
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """
+    Writes data so that path always holds either the old or the new
+    contents, even if the process dies mid-write.
+
+    Args:
+        path (str): The path of the file to write.
+        data (bytes): The contents to write.
+
+    Returns:
+        None
+    """
+    with atomic_open(path) as temp_file:
+        temp_file.write(data)
+
+
+def atomic_write_json(path: str, data, indent: int | None = 4,
+                      separators: tuple[str, str] | None = None) -> None:
+    """
+    Atomically writes data as JSON.
+
+    Args:
+        path (str): The path of the JSON file to write.
+        data: The data to be saved as JSON.
+        indent (int | None): The indentation passed to json.dumps.
+        separators (tuple | None): The separators passed to json.dumps.
+
+    Returns:
+        None
+    """
+    atomic_write_bytes(path, json.dumps(
+        data, indent=indent, separators=separators).encode("utf-8"))
+
+
+def _fsync_directory(directory: str) -> None:
+    """
+    Flushes a directory entry so a rename inside it survives a crash.
+
+    Args:
+        directory (str): The directory to flush.
+
+    Returns:
+        None
+    """
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def remove_stale_files(directory: str, keep: set[str]) -> list[str]:
+    """
+    Removes the files of a directory whose names are not in keep, such as
+    the pages of players that are no longer in the store. Hidden files,
+    like the temporary files of atomic_open, are left alone.
+
+    Args:
+        directory (str): The directory to clean.
+        keep (set): The names of the files to keep.
+
+    Returns:
+        list: The names of the removed files.
+    """
+    removed = []
+    for entry in os.scandir(directory):
+        if (entry.is_file() and entry.name not in keep
+                and not entry.name.startswith(".")):
+            os.unlink(entry.path)
+            removed.append(entry.name)
+    return sorted(removed)
+
+
+def rotate_snapshots(path: str, keep: int) -> None:
+    """
+    Copies path to path.1, shifting older snapshots up to path.<keep>.
+
+    Args:
+        path (str): The path of the file to snapshot.
+        keep (int): The number of snapshots to keep.
+
+    Returns:
+        None
+    """
+    if keep <= 0 or not os.path.exists(path):
+        return
+    for n in range(keep - 1, 0, -1):
+        if os.path.exists(f"{path}.{n}"):
+            os.replace(f"{path}.{n}", f"{path}.{n + 1}")
+    shutil.copy2(path, f"{path}.1")
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Holds an exclusive advisory lock on path.lock for the duration of the
+    block, so two processes cannot interleave read-modify-write cycles on
+    path. The lock is a no-op where flock is unavailable.
+
+    Args:
+        path (str): The path of the file to lock.
+
+    Yields:
+        None
+    """
+    with open(f"{path}.lock", "a", encoding="utf-8") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
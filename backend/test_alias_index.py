@@ -0,0 +1,67 @@
+from alias_index import AliasIndex, normalize
+
+
+def make_players():
+    return [
+        {"name": "Chun Lam", "player_id": "-6-yYmPWx-",
+         "player_nicknames": ["Chun", "Chun1"]},
+        {"name": "Noah Hernandez", "player_id": "",
+         "player_nicknames": ["noah", "nnoah"]},
+        {"name": "Alex Koong", "player_id": "",
+         "player_nicknames": ["Koong"]},
+    ]
+
+
+def test_normalize():
+    assert normalize("Chun1") == normalize("chun") == "chun"
+    assert normalize(" Zoë!") == "zoe"
+    assert normalize("42") == "42"
+    assert normalize("!!") == ""
+
+
+def test_candidates():
+    alias_index = AliasIndex(make_players())
+
+    assert alias_index.candidates("CHUN2")[0] == {
+        "position": 0, "score": 1.0, "alias": "Chun"}
+    # players are matched by their name too
+    assert alias_index.candidates("Hernandez")[0]["position"] == 1
+    assert alias_index.candidates("hun")[0]["position"] == 0
+    assert alias_index.candidates("Zzyzx") == []
+
+
+def test_player_id_is_a_strong_key():
+    alias_index = AliasIndex(make_players())
+
+    candidates = alias_index.candidates("Koong", player_id="-6-yYmPWx-")
+    assert candidates[0] == {"position": 0, "score": 1.0,
+                             "alias": "player_id"}
+    assert candidates[1]["position"] == 2
+
+
+def test_auto_link():
+    alias_index = AliasIndex(make_players())
+
+    assert alias_index.auto_link("chun3") == 0
+    assert alias_index.auto_link("Stranger", "-6-yYmPWx-") == 0
+    # close, but not close enough to link without asking
+    assert alias_index.auto_link("Koongg") is None
+    assert alias_index.auto_link("Zzyzx") is None
+
+
+def test_ledger_ids_are_a_strong_key():
+    alias_index = AliasIndex(make_players(), {"wz04g67XLY": 2})
+
+    assert alias_index.candidates("Matt", "wz04g67XLY")[0] == {
+        "position": 2, "score": 1.0, "alias": "player_id"}
+    assert alias_index.auto_link("Matt", "wz04g67XLY") == 2
+
+
+def test_name_words_never_auto_link():
+    alias_index = AliasIndex(make_players())
+
+    # suggested, but a first name is shared by too many people to link
+    assert alias_index.candidates("Alex")[0] == {
+        "position": 2, "score": 1.0, "alias": "Alex"}
+    assert alias_index.auto_link("Alex") is None
+    assert alias_index.auto_link("Noah Hernandez") == 1
@@ -0,0 +1,110 @@
+import http.client
+import json
+import os
+import shutil
+import threading
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from api_server import ApiServer, is_not_modified, render
+from poker import Poker
+
+
+@pytest.fixture
+def server():
+    with TemporaryDirectory() as tempdir:
+        shutil.copytree("backend/testing/mock_jsons",
+                        os.path.join(tempdir, "mock_jsons"))
+        shutil.copytree("backend/testing/mock_ledgers",
+                        os.path.join(tempdir, "mock_ledgers"))
+        poker = Poker(os.path.join(tempdir, "mock_ledgers"),
+                      os.path.join(tempdir, "mock_jsons", "mock2_data.json"))
+        poker.reset_net_fields()
+        poker.add_poker_game(
+            os.path.join(tempdir, "mock_ledgers", "ledger01_01.csv"))
+
+        server = ApiServer(poker, port=0, quiet=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+
+def get(server: ApiServer, path: str,
+        headers: dict | None = None) -> http.client.HTTPResponse:
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    connection.request("GET", path, headers=headers or {})
+    response = connection.getresponse()
+    response.body = response.read()
+    connection.close()
+    return response
+
+
+def test_endpoints(server):
+    poker = server.cache.poker
+
+    response = get(server, "/leaderboard?by=putr&size=2")
+    assert response.status == 200
+    assert json.loads(response.body) == poker.leaderboard_page("putr", 1, 2)
+
+    assert json.loads(get(server, "/players/1").body)["net"] == 5.5
+    assert json.loads(get(server, "/players/1/history").body) == {
+        "games": ["2023-01-01"], "net": [5.5]}
+    assert json.loads(get(server, "/players/1/sessions").body)[
+        "buy_in"] == 10.0
+    game = json.loads(get(server, "/games/2023-01-01").body)
+    assert [result["net"] for result in game["results"]] == [
+        5.5, -1.25, -4.25]
+
+
+def test_errors(server):
+    assert get(server, "/players/99").status == 404
+    assert get(server, "/games/2023-01-02").status == 404
+    assert get(server, "/nowhere").status == 404
+    assert get(server, "/leaderboard?by=luck").status == 400
+    assert get(server, "/leaderboard?page=two").status == 400
+
+
+def test_revalidation(server):
+    response = get(server, "/players/1")
+    etag = response.getheader("ETag")
+    last_modified = response.getheader("Last-Modified")
+
+    response = get(server, "/players/1", {"If-None-Match": etag})
+    assert response.status == 304
+    assert response.body == b""
+    assert get(server, "/players/1",
+               {"If-Modified-Since": last_modified}).status == 304
+    assert get(server, "/players/1",
+               {"If-None-Match": '"stale"'}).status == 200
+
+
+def test_ingest_invalidates_cache(server):
+    poker = server.cache.poker
+    etag = get(server, "/players/1").getheader("ETag")
+
+    poker.add_poker_game(os.path.join(poker.ledger_folder_path,
+                                      "ledger01_02.csv"), ["Joe"])
+
+    response = get(server, "/players/1", {"If-None-Match": etag})
+    assert response.status == 200
+    assert json.loads(response.body)["net"] == 11.0
+
+
+def test_render_game_id_with_suffix(server):
+    status, _ = render(server.cache.poker, "/games/2023-01-01%282%29")
+    assert status == 404
+
+
+def test_is_not_modified():
+    etag = '"abc"'
+    assert is_not_modified({"If-None-Match": 'W/"abc", "def"'}, etag, 0)
+    assert is_not_modified({"If-None-Match": "*"}, etag, 0)
+    # If-None-Match takes precedence over If-Modified-Since
+    assert not is_not_modified(
+        {"If-None-Match": '"def"',
+         "If-Modified-Since": "Sun, 01 Jan 2023 00:00:00 GMT"}, etag, 0)
+    assert not is_not_modified({"If-Modified-Since": "garbage"}, etag, 0)
+    assert not is_not_modified({}, etag, 0)
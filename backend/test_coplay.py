@@ -0,0 +1,38 @@
+import numpy as np
+
+from coplay import CoplayIndex, compute_pair_stats, table_pairs
+from ledger_manifest import new_manifest
+
+
+def test_table_pairs():
+    first, second = table_pairs(np.array([0, 0, 1, 1, 1]))
+
+    assert sorted(zip(first.tolist(), second.tolist())) == [
+        (0, 1), (1, 0), (2, 3), (2, 4), (3, 2), (3, 4), (4, 2), (4, 3)]
+
+
+def test_compute_pair_stats():
+    stats = compute_pair_stats(np.array([7, 7, 7, 3, 3]),
+                               np.array(["1", "2", "3", "1", "2"]),
+                               np.array([500, -200, -300, -100, 100]))
+
+    assert stats["1"] == {"2": [2, 400, 1], "3": [1, 500, 1]}
+    assert stats["2"] == {"1": [2, -100, 1], "3": [1, -200, 0]}
+    assert stats["3"] == {"1": [1, -300, 0], "2": [1, -300, 0]}
+
+
+def test_add_game_matches_rebuild():
+    rng = np.random.default_rng(0)
+    manifest = new_manifest(complete=True)
+    index = CoplayIndex(manifest)
+    for game in range(40):
+        players = rng.choice(8, rng.integers(2, 6), replace=False)
+        results = {str(player): int(rng.integers(-5000, 5000))
+                   for player in players}
+        manifest["ledgers"][f"ledger{game}.csv"] = {"results": results}
+        index.add_game({"results": results})
+
+    rebuilt = CoplayIndex(manifest)
+    for player in map(str, range(8)):
+        assert index.partners(player) == rebuilt.partners(player)
+    assert index.pair("0", "0") is None
@@ -0,0 +1,94 @@
+import gzip
+import json
+
+from frontend_export import leaderboard_rows, write_frontend_files
+
+
+def make_players():
+    return [
+        {"id": 1, "flag": "flags/us.png", "name": "Alice", "putr": 12.3,
+         "net": 550, "games_played": ["01_01"], "games_up": 1,
+         "average_net": 550.0, "net_history": [550], "biggest_win": 550,
+         "biggest_loss": 0, "highest_net": 550, "lowest_net": 0,
+         "games_up_most": 1, "games_down_most": 0, "games_down": 0},
+        {"id": 2, "flag": "flags/us.png", "name": "Bob", "putr": 11.4,
+         "net": -550, "games_played": ["01_01"], "games_up": 0,
+         "average_net": -550.0, "net_history": [-550], "biggest_win": 0,
+         "biggest_loss": -550, "highest_net": 0, "lowest_net": -550,
+         "games_up_most": 0, "games_down_most": 1, "games_down": 1},
+    ]
+
+
+def test_leaderboard_rows():
+    assert leaderboard_rows(make_players()) == [
+        {"id": 1, "flag": "flags/us.png", "name": "Alice", "putr": 12.3,
+         "net": 5.5},
+        {"id": 2, "flag": "flags/us.png", "name": "Bob", "putr": 11.4,
+         "net": -5.5},
+    ]
+
+
+def test_write_frontend_files(tmp_path):
+    write_frontend_files(make_players(), str(tmp_path), compress=True)
+
+    leaderboard = (tmp_path / "leaderboard.json").read_bytes()
+    assert b" " not in leaderboard.replace(b"flags/us.png", b"")
+    assert json.loads(leaderboard)[1]["name"] == "Bob"
+    assert gzip.decompress(
+        (tmp_path / "leaderboard.json.gz").read_bytes()) == leaderboard
+
+    player = json.loads((tmp_path / "players" / "2.json").read_text())
+    assert player["net_history"] == [-5.5]
+
+    putr = json.loads((tmp_path / "rankings" / "putr.json").read_text())
+    assert [(row["rank"], row["name"]) for row in putr] == [
+        (1, "Alice"), (2, "Bob")]
+
+
+def test_write_frontend_files_writes_changed_players(tmp_path):
+    players = make_players()
+    write_frontend_files(players, str(tmp_path))
+
+    players[0]["name"] = "Alicia"
+    players[1]["name"] = "Robert"
+    write_frontend_files(players, str(tmp_path), changed_ids={"1"})
+
+    assert json.loads(
+        (tmp_path / "players" / "1.json").read_text())["name"] == "Alicia"
+    assert json.loads(
+        (tmp_path / "players" / "2.json").read_text())["name"] == "Bob"
+    assert "Alicia" in (tmp_path / "site" / "index.html").read_text()
+
+
+def test_write_frontend_files_removes_removed_players(tmp_path):
+    players = make_players()
+    write_frontend_files(players, str(tmp_path), compress=True)
+
+    write_frontend_files(players[:1], str(tmp_path), compress=True,
+                         changed_ids=set())
+
+    assert sorted(path.name for path in (tmp_path / "players").iterdir()) == [
+        "1.json", "1.json.gz"]
+    assert not (tmp_path / "site" / "players" / "2.html").exists()
+
+
+def test_write_frontend_files_removes_gzipped_copies(tmp_path):
+    players = make_players()
+    write_frontend_files(players, str(tmp_path), compress=True)
+
+    write_frontend_files(players, str(tmp_path), changed_ids=set())
+
+    assert sorted(path.name for path in (tmp_path / "players").iterdir()) == [
+        "1.json", "2.json"]
+    assert not (tmp_path / "leaderboard.json.gz").exists()
+    assert not list((tmp_path / "rankings").glob("*.gz"))
+
+
+def test_write_frontend_files_compresses_unchanged_players(tmp_path):
+    players = make_players()
+    write_frontend_files(players, str(tmp_path))
+
+    write_frontend_files(players, str(tmp_path), compress=True,
+                         changed_ids=set())
+
+    assert (tmp_path / "players" / "2.json.gz").exists()
@@ -0,0 +1,131 @@
+import os
+
+import pytest
+
+import game_catalog
+from game_catalog import GameCatalog, game_id, ledger_day
+
+HEADER = ("player_nickname,player_id,session_start_at,session_end_at,"
+          "buy_in,buy_out,stack,net\n")
+
+
+def write_ledger(folder, file, start):
+    path = folder / file
+    path.write_text(HEADER + f'"Alice",A1,{start},,1000,,1550,550\n')
+    return path
+
+
+def test_game_id():
+    assert game_id("10_31(2)", "2023-10-31T02:12:56.556Z") == "2023-10-31(2)"
+    # games crossing New Year in UTC keep the year of their label
+    assert game_id("12_31", "2024-01-01T01:00:00.000Z") == "2023-12-31"
+    assert game_id("01_01", "2023-12-31T23:00:00.000Z") == "2024-01-01"
+
+
+def test_ledger_day():
+    assert ledger_day("ledger10_31(2).csv") == "10_31(2)"
+    with pytest.raises(ValueError):
+        ledger_day("notes.csv")
+
+
+def test_catalog_orders_games_chronologically(tmp_path):
+    write_ledger(tmp_path, "ledger12_30.csv", "2023-12-30T20:00:00.000Z")
+    write_ledger(tmp_path, "ledger01_02.csv", "2024-01-02T20:00:00.000Z")
+    write_ledger(tmp_path, "ledger12_30(1).csv", "2023-12-30T02:00:00.000Z")
+
+    catalog = GameCatalog(str(tmp_path))
+
+    assert catalog.game_ids() == ["2023-12-30(1)", "2023-12-30",
+                                  "2024-01-02"]
+    assert catalog.paths()[0] == os.path.join(str(tmp_path),
+                                              "ledger12_30(1).csv")
+
+
+def test_catalog_reads_only_new_ledgers(tmp_path, monkeypatch):
+    ledger_folder = tmp_path / "ledgers"
+    ledger_folder.mkdir()
+    catalog_path = str(tmp_path / "game_catalog.json")
+    write_ledger(ledger_folder, "ledger01_01.csv", "2024-01-01T20:00:00.000Z")
+    GameCatalog(str(ledger_folder), catalog_path).files()
+
+    read = []
+    original = game_catalog.read_session_start
+    monkeypatch.setattr(game_catalog, "read_session_start",
+                        lambda path: read.append(path) or original(path))
+
+    catalog = GameCatalog(str(ledger_folder), catalog_path)
+    assert catalog.game_ids() == ["2024-01-01"]
+    assert read == []
+
+    write_ledger(ledger_folder, "ledger01_03.csv", "2024-01-03T20:00:00.000Z")
+    assert catalog.game_ids() == ["2024-01-01", "2024-01-03"]
+    assert [os.path.basename(path) for path in read] == ["ledger01_03.csv"]
+
+
+def test_catalog_skips_unchanged_folder(tmp_path, monkeypatch):
+    ledger_folder = tmp_path / "ledgers"
+    ledger_folder.mkdir()
+    catalog_path = str(tmp_path / "game_catalog.json")
+    write_ledger(ledger_folder, "ledger01_01.csv", "2024-01-01T20:00:00.000Z")
+    GameCatalog(str(ledger_folder), catalog_path).files()
+
+    listed = []
+    original = os.listdir
+    monkeypatch.setattr(os, "listdir",
+                        lambda path: listed.append(path) or original(path))
+
+    catalog = GameCatalog(str(ledger_folder), catalog_path)
+    assert catalog.game_ids() == ["2024-01-01"]
+    assert listed == []
+
+
+def test_catalog_reads_ledgers_edited_in_place(tmp_path):
+    ledger_folder = tmp_path / "ledgers"
+    ledger_folder.mkdir()
+    catalog_path = str(tmp_path / "game_catalog.json")
+    write_ledger(ledger_folder, "ledger01_01.csv", "2024-01-01T20:00:00.000Z")
+    write_ledger(ledger_folder, "ledger01_01(1).csv",
+                 "2024-01-01T21:00:00.000Z")
+    assert GameCatalog(str(ledger_folder), catalog_path).files() == [
+        "ledger01_01.csv", "ledger01_01(1).csv"]
+
+    # rewriting a ledger need not change the folder's modification time,
+    # so the listing stays as it was until the ledger's entry is asked for
+    folder_mtime_ns = os.stat(ledger_folder).st_mtime_ns
+    path = write_ledger(ledger_folder, "ledger01_01.csv",
+                        "2024-01-01T22:00:00.000Z")
+    os.utime(ledger_folder, ns=(folder_mtime_ns, folder_mtime_ns))
+    os.utime(path, ns=(folder_mtime_ns + 10**9, folder_mtime_ns + 10**9))
+
+    catalog = GameCatalog(str(ledger_folder), catalog_path)
+    assert catalog.files() == ["ledger01_01.csv", "ledger01_01(1).csv"]
+    assert catalog.entry(str(path))["start"] == "2024-01-01T22:00:00.000Z"
+    assert catalog.files() == ["ledger01_01(1).csv", "ledger01_01.csv"]
+
+
+def test_catalog_dates_ledgers_without_start_by_neighbours(tmp_path, capfd):
+    path = tmp_path / "ledger12_31.csv"
+    path.write_text("player_nickname,net\nAlice,550\n")
+    # the modification time is years off and must not be used
+    os.utime(path, ns=(1790000000 * 10**9, 1790000000 * 10**9))
+    write_ledger(tmp_path, "ledger01_02.csv", "2024-01-02T20:00:00.000Z")
+
+    catalog = GameCatalog(str(tmp_path))
+    assert catalog.games()[0]["start"] == "2023-12-31T00:00:00.000Z"
+    assert catalog.game_ids() == ["2023-12-31", "2024-01-02"]
+    assert catalog.entry(str(path))["id"] == "2023-12-31"
+    GameCatalog(str(tmp_path)).files()
+
+    out, _ = capfd.readouterr()
+    assert out.count("no session start times") == 1
+
+
+def test_catalog_leaves_year_out_without_dated_games(tmp_path, capfd):
+    path = tmp_path / "ledger01_01.csv"
+    path.write_text("player_nickname,net\nAlice,550\n")
+
+    catalog = GameCatalog(str(tmp_path))
+    assert catalog.game_ids() == ["01_01"]
+    assert catalog.games()[0]["start"] == ""
+    out, _ = capfd.readouterr()
+    assert "no dated games" in out
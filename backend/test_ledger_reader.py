@@ -0,0 +1,55 @@
+import pytest
+
+from ledger_reader import read_net_cents, read_net_cents_pandas
+
+
+def test_read_net_cents():
+    assert read_net_cents("backend/testing/mock_ledgers/ledger01_02.csv") == {
+        "Alice": 550, "Bob": -425, "Charlie": -125, "Joe": 550}
+
+
+def test_read_net_cents_sums_rebuys(tmp_path):
+    ledger_csv_path = tmp_path / "ledger01_01.csv"
+    ledger_csv_path.write_text(
+        "player_nickname,player_id,session_start_at,session_end_at,buy_in,"
+        "buy_out,stack,net\n"
+        '"Koong",h5,2023-10-30T18:00:16.447Z,,2000,,2180,180\n'
+        '"Koong",h5,2023-10-30T17:42:50.251Z,2023-10-30T17:59:58.262Z,'
+        "1000,0,0,-1000\n"
+        '"cito",ug,2023-10-30T17:34:24.853Z,,1000,,1820,820\n'
+    )
+
+    assert read_net_cents(str(ledger_csv_path)) == {"Koong": -820,
+                                                    "cito": 820}
+
+
+def test_read_net_cents_missing_column(tmp_path):
+    ledger_csv_path = tmp_path / "ledger01_01.csv"
+    ledger_csv_path.write_text("player_nickname,buy_in\nAlice,1000\n")
+
+    with pytest.raises(ValueError):
+        read_net_cents(str(ledger_csv_path))
+
+
+@pytest.mark.parametrize("row, error", [
+    ('"Alice",a1,2023-01-01T00:00:00.000Z', "Ledger row 3 is truncated"),
+    ('"Alice",a1,2023-01-01T00:00:00.000Z,,1000,,1000,',
+     "Ledger row 3 has a net of ''"),
+])
+def test_read_net_cents_malformed_row(tmp_path, row, error):
+    ledger_csv_path = tmp_path / "ledger01_01.csv"
+    ledger_csv_path.write_text(
+        "player_nickname,player_id,session_start_at,session_end_at,buy_in,"
+        "buy_out,stack,net\n"
+        '"Bob",b2,2023-01-01T00:00:00.000Z,,1000,,1000,0\n' + row + "\n")
+
+    with pytest.raises(ValueError, match=error):
+        read_net_cents(str(ledger_csv_path))
+
+
+def test_backends_agree():
+    pytest.importorskip("pandas")
+    ledger_csv_path = "backend/testing/mock_ledgers/ledger01_02.csv"
+
+    assert (list(read_net_cents(ledger_csv_path).items())
+            == list(read_net_cents_pandas(ledger_csv_path).items()))
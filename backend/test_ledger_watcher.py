@@ -0,0 +1,164 @@
+import asyncio
+import json
+import os
+import shutil
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from ledger_watcher import LedgerWatcher
+from poker import Poker
+
+
+@pytest.fixture
+def empty_folder():
+    with TemporaryDirectory() as tempdir:
+        shutil.copytree("backend/testing/mock_jsons",
+                        os.path.join(tempdir, "mock_jsons"))
+        ledger_path = os.path.join(tempdir, "ledgers")
+        os.mkdir(ledger_path)
+        json_path = os.path.join(tempdir, "mock_jsons", "mock2_data.json")
+        poker = Poker(ledger_path, json_path)
+        poker.reset_net_fields()
+        yield poker, ledger_path, json_path
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_scan_waits_for_ledgers_to_settle(empty_folder):
+    poker, ledger_path, _ = empty_folder
+    clock = FakeClock()
+    watcher = LedgerWatcher(poker, settle=2, clock=clock)
+    path = os.path.join(ledger_path, "ledger01_01.csv")
+
+    with open(path, "w") as ledger_file:
+        ledger_file.write("player_nickname,net\n")
+    assert watcher.scan() == []
+    clock.now = 1
+    with open(path, "a") as ledger_file:
+        ledger_file.write("Alice,550\n")
+    assert watcher.scan() == []
+
+    clock.now = 2.5
+    assert watcher.scan() == []
+    clock.now = 3
+    assert watcher.scan() == ["ledger01_01.csv"]
+    clock.now = 10
+    assert watcher.scan() == []
+
+
+def test_ingest_skips_invalid_ledgers(empty_folder, capfd):
+    poker, ledger_path, json_path = empty_folder
+    shutil.copy("backend/testing/mock_ledgers/ledger01_01.csv", ledger_path)
+    with open(os.path.join(ledger_path, "ledger01_02.csv"), "w") as file:
+        file.write("player_nickname,session_start_at\nAlice,\n")
+
+    watcher = LedgerWatcher(poker)
+    assert watcher.ingest(["ledger01_01.csv", "ledger01_02.csv"]) == [
+        "2023-01-01"]
+
+    out, _ = capfd.readouterr()
+    assert "Skipping ledger01_02.csv: Ledger is missing" in out
+    with open(json_path) as json_file:
+        assert json.load(json_file)[0]["net"] == 5.5
+
+
+def test_run_adds_a_burst_as_one_batch(empty_folder, capfd):
+    poker, ledger_path, json_path = empty_folder
+    watcher = LedgerWatcher(poker, ["Joe"], interval=0.01, settle=0.05,
+                            batch_window=0.2)
+    saves = []
+    save = poker.store.save
+    poker.store.save = lambda *args: saves.append(1) or save(*args)
+
+    async def upload_and_wait():
+        stop = asyncio.Event()
+        task = asyncio.create_task(watcher.run(stop))
+        await asyncio.sleep(0.05)
+        for file in ("ledger01_02.csv", "ledger01_01.csv"):
+            shutil.copy(f"backend/testing/mock_ledgers/{file}", ledger_path)
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if poker.store.load_manifest() is not None and len(
+                    poker.store.load_manifest()["ledgers"]) == 2:
+                break
+        stop.set()
+        await task
+
+    asyncio.run(upload_and_wait())
+
+    out, _ = capfd.readouterr()
+    assert "2 of 2 games added" in out
+    # the initial sync found no ledgers, so the burst was the only save
+    assert saves == [1]
+    with open(json_path) as json_file:
+        assert json.load(json_file)[0]["games_played"] == [
+            "2023-01-01", "2023-01-02"]
+
+
+def test_ingest_syncs_rewritten_ledgers(empty_folder, capfd):
+    poker, ledger_path, json_path = empty_folder
+    shutil.copy("backend/testing/mock_ledgers/ledger01_01.csv", ledger_path)
+    clock = FakeClock()
+    watcher = LedgerWatcher(poker, settle=2, clock=clock)
+    for clock.now in (0, 3):
+        files = watcher.scan()
+    assert watcher.ingest(files) == ["2023-01-01"]
+
+    # Charlie's result changes after the game was added
+    with open(os.path.join(ledger_path, "ledger01_01.csv"), "a") as file:
+        file.write("Charlie1,A3,2023-11-20T03:32:04.396Z,,1000,,900,-100\n")
+    for clock.now in (4, 7):
+        files = watcher.scan()
+    assert watcher.ingest(files) == ["2023-01-01"]
+
+    out, _ = capfd.readouterr()
+    assert "1 of 1 games synced, 0 removed, 3 players recomputed" in out
+    with open(json_path) as json_file:
+        assert json.load(json_file)[2]["net"] == -2.25
+
+
+def test_run_survives_a_failed_batch(empty_folder, capfd):
+    poker, ledger_path, json_path = empty_folder
+    watcher = LedgerWatcher(poker, ["Joe"], interval=0.01, settle=0.05,
+                            batch_window=0.05)
+    ingest = watcher.ingest
+    calls = []
+
+    def fail_once(files):
+        calls.append(files)
+        if len(calls) == 1:
+            raise RuntimeError("disk full")
+        return ingest(files)
+    watcher.ingest = fail_once
+
+    async def upload_and_wait():
+        stop = asyncio.Event()
+        task = asyncio.create_task(watcher.run(stop))
+        for file in ("ledger01_01.csv", "ledger01_02.csv"):
+            await asyncio.sleep(0.05)
+            shutil.copy(f"backend/testing/mock_ledgers/{file}", ledger_path)
+            for _ in range(200):
+                await asyncio.sleep(0.01)
+                if any(file in batch for batch in calls):
+                    break
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if poker.store.load_manifest() is not None:
+                break
+        stop.set()
+        await task
+
+    asyncio.run(upload_and_wait())
+
+    out, _ = capfd.readouterr()
+    assert "Failed to add ledger01_01.csv: RuntimeError('disk full')" in out
+    assert "1 of 1 games added" in out
+    with open(json_path) as json_file:
+        assert json.load(json_file)[0]["games_played"] == ["2023-01-02"]
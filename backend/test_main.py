@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+import main
+
+# cumulative import time of main, in microseconds
+IMPORT_BUDGET_US = 250_000
+HEAVY_MODULES = {"pandas", "numpy"}
+
+
+def import_times(code: str) -> dict[str, int]:
+    """Runs code under -X importtime and returns cumulative times."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime",
+         "-c", code],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)))
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line.split("|")
+            if cumulative.strip().isdigit():
+                times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_import_budget():
+    times = import_times("import main")
+
+    assert times["main"] < IMPORT_BUDGET_US
+    assert not HEAVY_MODULES.intersection(times)
+    assert "poker" not in times
+
+
+def test_pgs_does_not_import_poker():
+    times = import_times(
+        "import sys, main; sys.argv = ['main', 'pgs']; "
+        "main.LEDGER_FOLDER_PATH = 'testing/mock_ledgers'; "
+        "main.CATALOG_PATH = None; "
+        "main.cli(standalone_mode=False)")
+
+    assert "poker" not in times
+    assert not HEAVY_MODULES.intersection(times)
+
+
+def test_pg_does_not_import_heavy_modules(tmp_path):
+    times = import_times(
+        "import sys, main; sys.argv = ['main', 'pg', '01_01']; "
+        "main.LEDGER_FOLDER_PATH = 'testing/mock_ledgers'; "
+        "main.JSON_PATH = 'testing/mock_jsons/mock1_data.json'; "
+        f"main.CATALOG_PATH = {str(tmp_path / 'game_catalog.json')!r}; "
+        f"main.PARSE_CACHE_PATH = {str(tmp_path / 'parse.sqlite')!r}; "
+        "main.EXPORT_DIR = None; "
+        "main.cli(standalone_mode=False)")
+
+    assert "poker" in times
+    assert not HEAVY_MODULES.intersection(times)
+
+
+def test_pgs(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "LEDGER_FOLDER_PATH",
+                        "backend/testing/mock_ledgers")
+    monkeypatch.setattr(main, "CATALOG_PATH",
+                        str(tmp_path / "game_catalog.json"))
+
+    result = CliRunner().invoke(main.cli, ["pgs"])
+
+    assert result.output == "2023-01-01\n2023-01-02\n"
+    assert (tmp_path / "game_catalog.json").exists()
+
+
+def test_metrics_log(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "LEDGER_FOLDER_PATH",
+                        "backend/testing/mock_ledgers")
+    monkeypatch.setattr(main, "CATALOG_PATH",
+                        str(tmp_path / "game_catalog.json"))
+    metrics_path = tmp_path / "metrics.jsonl"
+
+    result = CliRunner().invoke(
+        main.cli, ["--profile", "stages", "--metrics-log", str(metrics_path),
+                   "pgs"])
+
+    assert result.output.startswith("2023-01-01\n2023-01-02\nstage")
+    record = json.loads(metrics_path.read_text())
+    assert record["command"] == "pgs"
+    assert record["seconds"] > 0
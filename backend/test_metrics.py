@@ -0,0 +1,48 @@
+import json
+
+from metrics import Metrics
+
+
+def test_spans_and_counters():
+    metrics = Metrics()
+    for _ in range(3):
+        with metrics.span("parse_ledger"):
+            pass
+    metrics.count("ledger_rows", 10)
+    metrics.count("ledger_rows", 5)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["spans"]["parse_ledger"]["calls"] == 3
+    assert snapshot["spans"]["parse_ledger"]["seconds"] >= 0
+    assert snapshot["counters"] == {"ledger_rows": 15}
+
+    report = metrics.report(1.0)
+    assert "parse_ledger" in report and "ledger_rows" in report
+
+    metrics.reset()
+    assert metrics.snapshot() == {"spans": {}, "counters": {}}
+
+
+def test_span_is_timed_when_it_raises():
+    metrics = Metrics()
+    try:
+        with metrics.span("save_players"):
+            raise OSError
+    except OSError:
+        pass
+
+    assert metrics.spans["save_players"][0] == 1
+
+
+def test_write_json_line(tmp_path):
+    metrics = Metrics()
+    metrics.count("games_added", 2)
+    path = tmp_path / "metrics.jsonl"
+
+    metrics.write_json_line(str(path), command="sync")
+    metrics.write_json_line(str(path), command="ag")
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["command"] for record in records] == ["sync", "ag"]
+    assert records[0]["counters"] == {"games_added": 2}
+    assert "time" in records[0]
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from migrations import (SCHEMA_VERSION, iter_json_layout, json_layout,
+                        migrate_json_file, upgrade_player, write_json_layout)
+
+PLAYERS = [
+    {"id": 1, "flag": "flags/us.png", "name": "Alice", "net": 12.345,
+     "player_nicknames": ["Alice", "alï\"ce"], "games_played": ["01_01"],
+     "net_history": [12.345], "schema_version": SCHEMA_VERSION},
+    {"id": 2, "flag": "", "name": "Bob", "net": -123456789,
+     "player_nicknames": [], "games_played": [], "net_history": [],
+     "schema_version": SCHEMA_VERSION},
+]
+
+
+def test_upgrade_legacy_record():
+    player = {"id": 1, "name": "Alice", "net": 3.0,
+              "games_played": ["10_30", "10_31"],
+              "net_dictionary": {"10_30": -2.0, "10_31": 3.0}}
+
+    assert upgrade_player(player)
+    assert "net_dictionary" not in player
+    assert player["net_history"] == [-2.0, 3.0]
+    # fields the record already had are kept
+    assert player["net"] == 3.0
+    assert player["games_up"] == 0
+    assert player["schema_version"] == SCHEMA_VERSION
+    assert not upgrade_player(player)
+
+
+def test_upgrade_rejects_newer_schema():
+    with pytest.raises(ValueError):
+        upgrade_player({"name": "Alice",
+                        "schema_version": SCHEMA_VERSION + 1})
+
+
+@pytest.mark.parametrize("layout", ["list", "by_name"])
+def test_layout_round_trip(tmp_path, layout):
+    json_path = str(tmp_path / "data.json")
+
+    write_json_layout(json_path, iter(PLAYERS), layout)
+
+    assert json_layout(json_path) == layout
+    # chunks this small split keys, strings and numbers across reads
+    assert list(iter_json_layout(json_path, chunk_size=3)) == PLAYERS
+
+
+def test_list_layout_matches_json_dumps(tmp_path):
+    json_path = tmp_path / "data.json"
+
+    write_json_layout(str(json_path), PLAYERS)
+
+    assert json_path.read_text() == json.dumps(PLAYERS, indent=4)
+
+
+def test_by_name_layout_matches_restructured_data(tmp_path):
+    json_path = tmp_path / "restructured_data.json"
+
+    write_json_layout(str(json_path), PLAYERS, "by_name")
+
+    assert json.loads(json_path.read_text()) == [
+        {player["name"]: {field: value for field, value in player.items()
+                          if field != "name"}
+         for player in PLAYERS}]
+
+
+@pytest.mark.parametrize("layout", ["list", "by_name"])
+def test_empty_store(tmp_path, layout):
+    json_path = str(tmp_path / "data.json")
+
+    write_json_layout(json_path, [], layout)
+
+    assert list(iter_json_layout(json_path)) == []
+
+
+def test_migrate_json_file_converts_layout(tmp_path):
+    json_path = tmp_path / "restructured_data.json"
+    json_path.write_text(json.dumps([{"Alice": {
+        "id": 1, "flag": "flags/us.png", "net": 3.0,
+        "player_nicknames": ["Alice"], "games_played": ["10_30"],
+        "net_dictionary": {"10_30": 3.0}}}]))
+    output_path = str(tmp_path / "data.json")
+
+    assert migrate_json_file(str(json_path), output_path, "list") == (1, 1)
+
+    with open(output_path) as output_file:
+        [player] = json.load(output_file)
+    assert list(player)[:3] == ["id", "flag", "name"]
+    assert player["net_history"] == [3.0]
+    assert player["schema_version"] == SCHEMA_VERSION
+
+    # in place, the layout of the file is kept
+    assert migrate_json_file(str(json_path)) == (1, 1)
+    assert json_layout(str(json_path)) == "by_name"
+    assert migrate_json_file(str(json_path)) == (0, 1)
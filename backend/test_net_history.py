@@ -0,0 +1,37 @@
+import pytest
+
+from net_history import downsample, game_nets, history_range, sort_history
+
+
+def test_sort_history_rebuilds_cumulative_nets():
+    days, history = sort_history(["10_31", "10_30", "10_31(1)"],
+                                 [500, 200, -100])
+
+    assert days == ["10_30", "10_31", "10_31(1)"]
+    assert history == [-300, 200, -100]
+    assert game_nets(history) == [-300, 500, -300]
+
+
+def test_history_range_includes_every_game_of_a_date():
+    days = ["10_30", "10_31", "10_31(1)", "10_31(2)", "11_01"]
+    history = [1, 2, 3, 4, 5]
+
+    assert history_range(days, history, "10_31", "10_31") == (
+        ["10_31", "10_31(1)", "10_31(2)"], [2, 3, 4])
+    assert history_range(days, history, start="10_31")[1] == [2, 3, 4, 5]
+    assert history_range(days, history, end="10_30") == (["10_30"], [1])
+    assert history_range(days, history) == (days, history)
+
+
+def test_downsample_keeps_extremes():
+    history = [0, 1, 2, 9, 3, 4, -7, 5, 6, 2]
+
+    positions = downsample(history, 6)
+
+    assert positions[0] == 0 and positions[-1] == len(history) - 1
+    assert {3, 6} <= set(positions)
+    assert len(positions) <= 6
+    assert downsample(history, 20) == list(range(len(history)))
+
+    with pytest.raises(ValueError):
+        downsample(history, 1)
@@ -0,0 +1,50 @@
+import pytest
+
+from nickname_index import NicknameIndex
+
+
+def make_players():
+    return [
+        {"name": "Alice", "player_nicknames": ["Alice", "Alice1"]},
+        {"name": "Bob", "player_nicknames": ["Bob", "Bob1"]},
+    ]
+
+
+def test_resolve():
+    nickname_index = NicknameIndex(make_players())
+
+    assert nickname_index.resolve("Alice1") == 0
+    assert nickname_index.resolve("Bob") == 1
+    assert nickname_index.resolve("Joe") is None
+    assert "Bob1" in nickname_index
+    assert len(nickname_index) == 4
+
+
+def test_unknown():
+    nickname_index = NicknameIndex(make_players())
+
+    assert nickname_index.unknown(["Joe", "Alice", "Eve"]) == ["Joe", "Eve"]
+
+
+def test_group_nets_merges_aliases():
+    nickname_index = NicknameIndex(make_players())
+
+    assert nickname_index.group_nets(
+        {"Alice": 5.5, "Alice1": -1.5, "Bob": -4, "Joe": 3}
+    ) == {0: 4.0, 1: -4}
+
+
+def test_ambiguous_nickname():
+    players = make_players()
+    players[1]["player_nicknames"].append("Alice1")
+
+    with pytest.raises(ValueError, match="'Alice1' is ambiguous"):
+        NicknameIndex(players)
+
+
+def test_duplicate_nickname():
+    players = make_players()
+    players[0]["player_nicknames"].append("Alice")
+
+    with pytest.raises(ValueError, match="'Alice' is listed twice"):
+        NicknameIndex(players)
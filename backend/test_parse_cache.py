@@ -0,0 +1,77 @@
+import pytest
+
+from metrics import METRICS
+from parse_cache import ParseCache, parse_ledger
+
+LEDGER = """player_nickname,player_id,session_start_at,session_end_at,buy_in,\
+buy_out,stack,net
+"Alice",a,2023-01-01T20:00:00.000Z,2023-01-01T21:00:00.000Z,1000,0,0,-1000
+"Alice",a,2023-01-01T21:00:00.000Z,,2000,,2500,500
+"Bob",b,2023-01-01T20:30:00.000Z,2023-01-01T22:00:00.500Z,1000,1500,0,500
+"""
+
+
+def not_parsed(path):
+    raise AssertionError(f"{path} was parsed again")
+
+
+def write_ledger(path, text=LEDGER):
+    path.write_text(text)
+    return str(path)
+
+
+def test_parse_is_cached(tmp_path):
+    path = write_ledger(tmp_path / "ledger01_01.csv")
+    cache = ParseCache(str(tmp_path / "parse_cache.sqlite"))
+
+    parsed = cache.parse(path)
+    assert parsed == parse_ledger(path)
+    assert parsed["nets"] == {"Alice": -500, "Bob": 500}
+    assert cache.parse(path, not_parsed) == parsed
+
+    # a copy of the ledger hits, and the cache outlives its connection
+    copy = write_ledger(tmp_path / "ledger01_02.csv")
+    cache.close()
+    assert ParseCache(cache.path).parse(copy, not_parsed) == parsed
+
+
+def test_rows_are_counted_only_when_parsed(tmp_path):
+    path = write_ledger(tmp_path / "ledger01_01.csv",
+                        "player_nickname,net\nAlice,5\nBob,-5\n")
+    cache = ParseCache(str(tmp_path / "parse_cache.sqlite"))
+    METRICS.reset()
+
+    cache.parse(path)
+    cache.parse(path)
+
+    # the ledger has no session columns, and the second parse hits
+    assert METRICS.snapshot()["counters"]["ledger_rows"] == 2
+
+
+def test_changed_ledger_is_parsed_again(tmp_path):
+    path = write_ledger(tmp_path / "ledger01_01.csv")
+    cache = ParseCache(str(tmp_path / "parse_cache.sqlite"))
+    cache.parse(path)
+
+    write_ledger(tmp_path / "ledger01_01.csv",
+                 LEDGER.replace("1500,0,500", "1600,0,600"))
+    with pytest.raises(AssertionError):
+        cache.parse(path, not_parsed)
+    assert cache.parse(path)["nets"]["Bob"] == 600
+    assert len(cache) == 2
+
+
+def test_least_recently_used_are_evicted(tmp_path):
+    cache = ParseCache(str(tmp_path / "parse_cache.sqlite"))
+    parsed = parse_ledger(write_ledger(tmp_path / "ledger01_01.csv"))
+    cache.put("a", parsed)
+    cache.max_bytes = cache._total_bytes * 2
+
+    cache.put("b", parsed)
+    assert cache.get("a") == parsed
+    cache.put("c", parsed)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == parsed
+    assert cache.get("c") == parsed
+    assert len(cache) == 2
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from player_store import (SqlitePlayerStore, export_sqlite_to_json,
+                          migrate_json_to_sqlite, read_json_layout)
+from poker import Poker
+
+
+@pytest.fixture
+def sqlite_fixture(tmp_path):
+    json_path = str(tmp_path / "data.json")
+    shutil.copy("backend/testing/mock_jsons/mock1_data.json", json_path)
+    # add a player who sits out the mock game
+    with open(json_path) as json_file:
+        players = json.load(json_file)
+    players.append(dict(players[0], id=4, name="Dana",
+                        player_nicknames=["Dana"]))
+    with open(json_path, "w") as json_file:
+        json.dump(players, json_file)
+
+    ledger_path = str(tmp_path / "ledgers")
+    os.mkdir(ledger_path)
+    shutil.copy("backend/testing/mock_ledgers/ledger01_01.csv", ledger_path)
+
+    db_path = str(tmp_path / "players.db")
+    migrate_json_to_sqlite(json_path, db_path)
+    yield json_path, ledger_path, db_path
+
+
+def test_migrate_round_trip(sqlite_fixture, tmp_path):
+    json_path, _, db_path = sqlite_fixture
+
+    export_path = str(tmp_path / "export.json")
+    export_sqlite_to_json(db_path, export_path)
+
+    with open(json_path) as json_file, open(export_path) as export_file:
+        assert json.load(export_file) == json.load(json_file)
+
+
+def test_read_restructured_layout(tmp_path):
+    json_path = str(tmp_path / "restructured_data.json")
+    with open(json_path, "w") as json_file:
+        json.dump([{"Alice": {"id": 1, "flag": "flags/us.png", "net": 5.5,
+                              "player_nicknames": ["Alice"]}}], json_file)
+
+    assert read_json_layout(json_path) == [
+        {"id": 1, "flag": "flags/us.png", "name": "Alice", "net": 5.5,
+         "player_nicknames": ["Alice"]}]
+
+
+def test_sqlite_add_poker_game(sqlite_fixture, capfd):
+    json_path, ledger_path, db_path = sqlite_fixture
+    json_poker = Poker(ledger_path, json_path)
+    sqlite_poker = Poker(ledger_path, db_path, store_backend="sqlite")
+
+    statements = []
+    sqlite_poker.store._connect().set_trace_callback(statements.append)
+    json_poker.add_poker_game(ledger_path + "/ledger01_01.csv")
+    sqlite_poker.add_poker_game(ledger_path + "/ledger01_01.csv")
+
+    # only the three players in the game are written
+    assert len([statement for statement in statements
+                if statement.startswith("INSERT INTO players")]) == 3
+    assert sqlite_poker.store.load() == json_poker.store.load()
+    assert (sqlite_poker.store.load_manifest()
+            == json_poker.store.load_manifest())
+
+
+def test_sqlite_rejects_ambiguous_nicknames(sqlite_fixture):
+    _, _, db_path = sqlite_fixture
+    store = SqlitePlayerStore(db_path)
+    players = store.load()
+    players[1]["player_nicknames"].append("Alice")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        store.save(players)
+    assert store.load()[1]["player_nicknames"] == ["Bob", "Bob1"]
@@ -4,6 +4,7 @@ import os
 import json
 from tempfile import TemporaryDirectory
 
+from migrations import SCHEMA_VERSION
 from poker import Poker
 
 
@@ -74,7 +75,7 @@ def test_add_poker_game1(tem_dir_fixture1, capfd):
         assert json_data[0]["games_down"] == 0
         assert json_data[0]["games_up_most"] == 1
         assert json_data[0]["games_down_most"] == 0
-        assert json_data[0]["net_dictionary"] == {"01_01": 5.5}
+        assert json_data[0]["net_history"] == [5.5]
         assert json_data[0]["average_net"] == 5.5
 
         assert json_data[1]["net"] == -4.25
@@ -86,7 +87,7 @@ def test_add_poker_game1(tem_dir_fixture1, capfd):
         assert json_data[1]["games_down"] == 1
         assert json_data[1]["games_up_most"] == 0
         assert json_data[1]["games_down_most"] == 1
-        assert json_data[1]["net_dictionary"] == {"01_01": -4.25}
+        assert json_data[1]["net_history"] == [-4.25]
         assert json_data[1]["average_net"] == -4.25
 
         assert json_data[2]["net"] == -1.25
@@ -98,15 +99,193 @@ def test_add_poker_game1(tem_dir_fixture1, capfd):
         assert json_data[2]["games_down"] == 1
         assert json_data[2]["games_up_most"] == 0
         assert json_data[2]["games_down_most"] == 0
-        assert json_data[2]["net_dictionary"] == {"01_01": -1.25}
+        assert json_data[2]["net_history"] == [-1.25]
         assert json_data[2]["average_net"] == -1.25
 
     out, _ = capfd.readouterr()
     assert out == (
-        "Alice 5.5\nBob -4.25\nCharlie -1.25\nPoker game on 01_01 added\n"
+        "Alice 5.5\nBob -4.25\nCharlie -1.25\n"
+        "Poker game on 2023-01-01 added\n"
         )
 
 
+@pytest.mark.parametrize("played", ["01_01", "2023-01-01"])
+def test_add_poker_game_without_manifest_skips_played_game(
+        tem_dir_fixture1, capfd, played):
+    poker, ledger_path, json_path = tem_dir_fixture1
+    with open(json_path) as json_file:
+        json_data = json.load(json_file)
+    # a store written before the manifest was kept
+    json_data[1]["games_played"].append(played)
+    with open(json_path, "w") as json_file:
+        json.dump(json_data, json_file)
+
+    poker.add_poker_game(ledger_path + "/ledger01_01.csv")
+
+    out, _ = capfd.readouterr()
+    assert out.endswith("Poker game on 2023-01-01 is already in the player "
+                        "records, run sync to rebuild them from the "
+                        "ledgers\n")
+    with open(json_path) as json_file:
+        assert json.load(json_file) == json_data
+
+
+def test_add_poker_game_updates_putr(tem_dir_fixture1):
+    poker, ledger_path, json_path = tem_dir_fixture1
+
+    poker.reset_net_fields()
+    poker.add_poker_game(ledger_path + "/ledger01_01.csv")
+
+    with open(json_path) as json_file:
+        alice, bob, charlie = json.load(json_file)
+    assert alice["putr"] > charlie["putr"] > bob["putr"]
+    # scores of a game sum to zero
+    assert alice["putr"] - 12 == pytest.approx(
+        (12 - bob["putr"]) + (12 - charlie["putr"]))
+
+
+def test_rankings_follow_added_games(tem_dir_fixture1):
+    poker, ledger_path, _ = tem_dir_fixture1
+
+    poker.reset_net_fields()
+    assert poker.player_rank(2)["rank"] == 2
+    poker.add_poker_game(ledger_path + "/ledger01_01.csv")
+
+    assert [row["name"] for row in poker.top_players("net", 3)] == [
+        "Alice", "Charlie", "Bob"]
+    assert poker.player_rank(2, "net") == dict(
+        poker.leaderboard_page("net", page=3, size=1)["rows"][0], rank=3)
+    # the incrementally updated rankings match a rebuild
+    cached = poker.leaderboard_page("putr")
+    poker._leaderboard = None
+    assert poker.leaderboard_page("putr") == cached
+
+
+def test_player_history(tem_dir_fixture2):
+    poker, _, _ = tem_dir_fixture2
+
+    poker.reset_net_fields()
+    poker.add_all_games(["Joe"])
+
+    assert poker.player_history(1) == {"games": ["2023-01-01", "2023-01-02"],
+                                       "net": [5.5, 11.0]}
+    assert poker.player_history(2, start="2023-01-02") == {
+        "games": ["2023-01-02"], "net": [-8.5]}
+    assert poker.player_history(3, max_points=2)["net"] == [-1.25, -2.5]
+    assert poker.player_history(99) is None
+
+
+def test_player_and_game(tem_dir_fixture1):
+    poker, ledger_path, _ = tem_dir_fixture1
+
+    poker.reset_net_fields()
+    poker.add_poker_game(ledger_path + "/ledger01_01.csv")
+
+    assert poker.player(2)["net"] == -4.25
+    assert poker.player(99) is None
+    assert poker.game("2023-01-01") == {
+        "id": "2023-01-01", "file": "ledger01_01.csv",
+        "start": "2023-11-20T02:32:04.388Z", "up_most": ["1"],
+        "down_most": ["2"],
+        "results": [{"id": 1, "name": "Alice", "net": 5.5},
+                    {"id": 3, "name": "Charlie", "net": -1.25},
+                    {"id": 2, "name": "Bob", "net": -4.25}]}
+    assert poker.game("2023-01-02") is None
+
+
+def test_head_to_head(tem_dir_fixture2):
+    poker, ledger_path, _ = tem_dir_fixture2
+
+    poker.reset_net_fields()
+    poker.add_poker_game(ledger_path + "/ledger01_01.csv")
+    assert poker.head_to_head(1, 2)["games"] == 1
+    coplay = poker._get_game_index("coplay")
+    poker.add_poker_game(ledger_path + "/ledger01_02.csv", ["Joe"])
+
+    # the cached pairs were updated in place rather than rebuilt
+    assert poker._get_game_index("coplay") is coplay
+    assert poker.head_to_head(1, 2) == {"games": 2, "players": [
+        {"id": 1, "games": 2, "net": 11.0, "average_net": 5.5,
+         "games_up": 2},
+        {"id": 2, "games": 2, "net": -8.5, "average_net": -4.25,
+         "games_up": 0}]}
+    assert poker.head_to_head(1, 99) is None
+    assert poker.partners(3) == [
+        {"id": 1, "name": "Alice", "games": 2, "net": -2.5,
+         "average_net": -1.25, "games_up": 0, "average_net_without": None},
+        {"id": 2, "name": "Bob", "games": 2, "net": -2.5,
+         "average_net": -1.25, "games_up": 0, "average_net_without": None}]
+    assert poker.partners(99) is None
+
+
+def test_session_stats(tem_dir_fixture2):
+    poker, ledger_path, _ = tem_dir_fixture2
+
+    poker.reset_net_fields()
+    poker.add_poker_game(ledger_path + "/ledger01_01.csv")
+    assert poker.session_stats(2)["buy_in"] == 10.0
+    poker.add_poker_game(ledger_path + "/ledger01_02.csv", ["Joe"])
+
+    assert poker.session_stats(1) == {
+        "games": 2, "timed_games": 0, "hours": 0.0, "hourly_rate": None,
+        "buy_in": 20.0, "rebuys": 0, "biggest_buy_in": 10.0,
+        "open_sessions": 2}
+    assert poker.session_stats(99) is None
+    entry = poker.store.load_manifest()["ledgers"]["ledger01_02.csv"]
+    assert entry["sessions"]["1"] == [0, 1000, 1, 1000, 1]
+
+
+def test_saved_records_stay_warm(tem_dir_fixture2):
+    poker, ledger_path, json_path = tem_dir_fixture2
+    poker.reset_net_fields()
+    loads = []
+    load = poker.store.load
+    poker.store.load = lambda: loads.append(1) or load()
+
+    poker.add_games([ledger_path + "/ledger01_01.csv"])
+    assert loads == []
+
+    # a write from elsewhere is picked up
+    with open(json_path) as json_file:
+        json_data = json.load(json_file)
+    json_data[0]["name"] = "Alicia"
+    with open(json_path, "w") as json_file:
+        json.dump(json_data, json_file)
+    poker.add_games([ledger_path + "/ledger01_02.csv"], ["Joe"])
+
+    assert loads == [1]
+    with open(json_path) as json_file:
+        alice = json.load(json_file)[0]
+    assert alice["name"] == "Alicia"
+    assert alice["net"] == 11.0
+
+
+def test_convert_game_ids(tem_dir_fixture1):
+    poker, ledger_path, json_path = tem_dir_fixture1
+    poker.add_poker_game(ledger_path + "/ledger01_01.csv")
+
+    # roll back to the layout written before year-aware game ids
+    with open(json_path) as json_file:
+        json_data = json.load(json_file)
+    json_data[0]["games_played"] = ["01_01", "12_24"]
+    with open(json_path, "w") as json_file:
+        json.dump(json_data, json_file)
+    manifest = poker.store.load_manifest()
+    entry = manifest["ledgers"]["ledger01_01.csv"]
+    entry["day"] = "01_01"
+    del entry["start"]
+    poker.store.save_manifest(manifest)
+
+    poker.convert_game_ids()
+
+    with open(json_path) as json_file:
+        assert json.load(json_file)[0]["games_played"] == [
+            "2023-01-01", "12_24"]
+    entry = poker.store.load_manifest()["ledgers"]["ledger01_01.csv"]
+    assert entry["day"] == "2023-01-01"
+    assert entry["start"] == "2023-11-20T02:32:04.388Z"
+
+
 def test_add_poker_game2(tem_dir_fixture2, capfd):
     poker, ledger_path, json_path = tem_dir_fixture2
 
@@ -123,7 +302,7 @@ def test_add_poker_game2(tem_dir_fixture2, capfd):
         assert json_data[0]["games_down"] == 1
         assert json_data[0]["games_up_most"] == 2
         assert json_data[0]["games_down_most"] == 1
-        assert json_data[0]["net_dictionary"] == {"01_01": 5.5}
+        assert json_data[0]["net_history"] == [5.5]
         assert json_data[0]["average_net"] == 5.5
 
         assert json_data[1]["net"] == -4.25
@@ -135,7 +314,7 @@ def test_add_poker_game2(tem_dir_fixture2, capfd):
         assert json_data[1]["games_down"] == 2
         assert json_data[1]["games_up_most"] == 1
         assert json_data[1]["games_down_most"] == 2
-        assert json_data[1]["net_dictionary"] == {"01_01": -4.25}
+        assert json_data[1]["net_history"] == [-4.25]
         assert json_data[1]["average_net"] == -4.25
 
         assert json_data[2]["net"] == -1.25
@@ -147,12 +326,13 @@ def test_add_poker_game2(tem_dir_fixture2, capfd):
         assert json_data[2]["games_down"] == 2
         assert json_data[2]["games_up_most"] == 1
         assert json_data[2]["games_down_most"] == 1
-        assert json_data[2]["net_dictionary"] == {"01_01": -1.25}
+        assert json_data[2]["net_history"] == [-1.25]
         assert json_data[2]["average_net"] == -1.25
 
     out, _ = capfd.readouterr()
     assert (
-      out == "Alice 5.5\nBob -4.25\nCharlie -1.25\nPoker game on 01_01 added\n"
+      out == "Alice 5.5\nBob -4.25\nCharlie -1.25\n"
+      "Poker game on 2023-01-01 added\n"
     )
 
 
@@ -163,10 +343,174 @@ def test_add_all_games(tem_dir_fixture1, capfd):
 
     out, _ = capfd.readouterr()
     assert (
-      out == "Alice 5.5\nBob -4.25\nCharlie -1.25\nPoker game on 01_01 added\n"
+      out == "Alice 5.5\nBob -4.25\nCharlie -1.25\n"
+      "Poker game on 2023-01-01 added\n1 of 1 games added\n"
         )
 
 
+def test_add_all_games_skips_unknown(tem_dir_fixture2, capfd):
+    poker, _, json_path = tem_dir_fixture2
+
+    poker.add_all_games()
+
+    with open(json_path) as json_file:
+        json_data = json.load(json_file)
+        assert json_data[0]["net"] == 5.5
+        assert json_data[0]["games_played"] == ["2023-01-01"]
+
+    out, _ = capfd.readouterr()
+    assert out.endswith(
+        "Joe (did you mean Alice?)\nNot all players known\n"
+        "1 of 2 games added\nGames skipped: 2023-01-02\n")
+
+
+def test_add_poker_game_twice(tem_dir_fixture1, capfd):
+    poker, ledger_path, json_path = tem_dir_fixture1
+
+    poker.add_poker_game(ledger_path + "/ledger01_01.csv")
+    poker.add_poker_game(ledger_path + "/ledger01_01.csv")
+
+    with open(json_path) as json_file:
+        json_data = json.load(json_file)
+        assert json_data[0]["net"] == 5.5
+        assert json_data[0]["games_played"] == ["2023-01-01"]
+
+    out, _ = capfd.readouterr()
+    assert out.endswith("Poker game on 2023-01-01 already added\n")
+
+
+def test_sync(tem_dir_fixture1, capfd):
+    poker, ledger_path, json_path = tem_dir_fixture1
+
+    poker.sync()
+    out, _ = capfd.readouterr()
+    assert out.startswith("No complete ledger manifest, rebuilding all games")
+
+    poker.sync()
+    out, _ = capfd.readouterr()
+    assert out == "Ledgers up to date\n"
+
+    with open(json_path) as json_file:
+        json_data = json.load(json_file)
+        assert json_data[0]["net"] == 5.5
+        assert json_data[0]["games_played"] == ["2023-01-01"]
+
+
+def test_sync_changed_and_new_ledgers(tem_dir_fixture1, capfd):
+    poker, ledger_path, json_path = tem_dir_fixture1
+
+    poker.reset_net_fields()
+    poker.add_all_games()
+
+    # Charlie's result changes on 01_01, Alice and Bob play again on 01_02
+    with open(ledger_path + "/ledger01_01.csv", "a") as ledger_file:
+        ledger_file.write("Charlie1,A3,2023-11-20T03:32:04.396Z,,1000,,900,"
+                          "-100\n")
+    with open(ledger_path + "/ledger01_02.csv", "w") as ledger_file:
+        ledger_file.write(
+            "player_nickname,player_id,session_start_at,session_end_at,"
+            "buy_in,buy_out,stack,net\n"
+            "Alice,A1,2023-11-21T02:32:04.388Z,,1000,,1100,100\n"
+            "Bob,A2,2023-11-21T02:32:04.392Z,,1000,,900,-100\n"
+        )
+
+    poker.sync()
+
+    with open(json_path) as json_file:
+        json_data = json.load(json_file)
+        assert json_data[0]["net"] == 6.5
+        assert json_data[0]["games_played"] == ["2023-01-01", "2023-01-02"]
+        assert json_data[0]["games_up_most"] == 2
+        assert json_data[1]["net"] == -5.25
+        assert json_data[1]["games_down_most"] == 2
+        assert json_data[2]["net"] == -2.25
+        assert json_data[2]["games_played"] == ["2023-01-01"]
+
+    out, _ = capfd.readouterr()
+    assert out.endswith(
+        "2 of 2 games synced, 0 removed, 3 players recomputed\n")
+
+
+def test_sync_rebuild_keeps_store_when_games_would_be_dropped(
+        tem_dir_fixture2, capfd):
+    poker, _, json_path = tem_dir_fixture2
+    with open(json_path) as json_file:
+        original = json_file.read()
+
+    poker.sync()
+
+    with open(json_path) as json_file:
+        assert json_file.read() == original
+    out, _ = capfd.readouterr()
+    assert "Nothing synced, 1 games would be dropped: 2023-01-02\n" in out
+
+    poker.sync(["Joe"])
+
+    out, _ = capfd.readouterr()
+    assert out.endswith("2 of 2 games synced, 0 removed, 0 players "
+                        "recomputed\n")
+
+
+def test_sync_force_drops_unknown_games(tem_dir_fixture2, capfd):
+    poker, _, json_path = tem_dir_fixture2
+
+    poker.sync(force=True)
+
+    with open(json_path) as json_file:
+        json_data = json.load(json_file)
+        assert json_data[0]["games_played"] == ["2023-01-01"]
+    out, _ = capfd.readouterr()
+    assert out.endswith("1 of 2 games synced, 0 removed, 0 players "
+                        "recomputed\n")
+
+
+def test_recompute_stats(tem_dir_fixture2, capfd):
+    poker, _, json_path = tem_dir_fixture2
+
+    poker.reset_net_fields()
+    poker.add_all_games(["Joe"])
+    with open(json_path) as json_file:
+        folded = json.load(json_file)
+
+    poker.recompute_stats()
+
+    with open(json_path) as json_file:
+        recomputed = json.load(json_file)
+    # ratings are summed in a different order, so only match to rounding
+    for player, folded_player in zip(recomputed, folded):
+        assert player.pop("putr") == pytest.approx(folded_player.pop("putr"))
+    assert recomputed == folded
+
+    out, _ = capfd.readouterr()
+    assert out.endswith("Stats of 3 players recomputed from 2 games\n")
+
+
+def test_recompute_stats_needs_complete_manifest(tem_dir_fixture1, capfd):
+    poker, _, _ = tem_dir_fixture1
+
+    poker.recompute_stats()
+
+    out, _ = capfd.readouterr()
+    assert out == "Ledger manifest is incomplete, run sync instead\n"
+
+
+def test_add_all_games_parallel(tem_dir_fixture2, capfd):
+    poker, _, json_path = tem_dir_fixture2
+
+    poker.reset_net_fields()
+    poker.add_all_games(["Joe"])
+    with open(json_path) as json_file:
+        serial = json.load(json_file)
+    serial_out, _ = capfd.readouterr()
+
+    poker.reset_net_fields()
+    poker.add_all_games(["Joe"], workers=2)
+    with open(json_path) as json_file:
+        assert json.load(json_file) == serial
+    parallel_out, _ = capfd.readouterr()
+    assert parallel_out == serial_out
+
+
 def test_print_game_results(tem_dir_fixture1, capfd):
 
     poker, ledger_path, _ = tem_dir_fixture1
@@ -189,6 +533,38 @@ def test_unique_nicknames(tem_dir_fixture1, capfd):
     assert "Charlie" in out
 
 
+def test_unique_nicknames_reports_unknown(tem_dir_fixture2, capfd):
+
+    poker, _, _ = tem_dir_fixture2
+
+    poker.print_unique_nicknames()
+
+    out, _ = capfd.readouterr()
+    assert out.endswith("Unknown nicknames: ['Joe']\n")
+
+
+def test_add_game_merges_aliases(tem_dir_fixture1, capfd):
+    poker, ledger_path, json_path = tem_dir_fixture1
+
+    with open(ledger_path + "/ledger01_03.csv", "w") as ledger_file:
+        ledger_file.write(
+            "player_nickname,player_id,session_start_at,session_end_at,"
+            "buy_in,buy_out,stack,net\n"
+            "Alice,A1,2023-11-20T02:32:04.388Z,,1000,,1550,550\n"
+            "Alice1,A1,2023-11-20T03:32:04.388Z,,1000,,900,-100\n"
+            "Bob,A2,2023-11-20T02:32:04.392Z,,1000,,550,-450\n"
+        )
+
+    poker.add_poker_game(ledger_path + "/ledger01_03.csv")
+
+    with open(json_path) as json_file:
+        json_data = json.load(json_file)
+        assert json_data[0]["net"] == 4.5
+        assert json_data[0]["games_played"] == ["2023-01-03"]
+        assert json_data[0]["games_up_most"] == 1
+        assert json_data[1]["games_down_most"] == 1
+
+
 def test_print_all_games(tem_dir_fixture1, capfd):
 
     poker, _, _ = tem_dir_fixture1
@@ -196,7 +572,7 @@ def test_print_all_games(tem_dir_fixture1, capfd):
     poker.print_all_games()
 
     out, _ = capfd.readouterr()
-    assert "01_01" in out
+    assert "2023-01-01" in out
 
 
 def test_reset_net_fields(tem_dir_fixture1, capfd):
@@ -217,20 +593,30 @@ def test_reset_net_fields(tem_dir_fixture1, capfd):
             assert player_data["games_down"] == 0
             assert player_data["games_up_most"] == 0
             assert player_data["games_down_most"] == 0
-            assert player_data["net_dictionary"] == {"01_01": 0}
+            assert player_data["net_history"] == []
             assert player_data["average_net"] == 0
 
 
-def test_add_field(tem_dir_fixture1, capfd):
+def test_migrate_store(tem_dir_fixture1, capfd):
 
     poker, _, json_path = tem_dir_fixture1
+    with open(json_path) as json_file:
+        json_data = json.load(json_file)
+    for player_data in json_data:
+        del player_data["schema_version"]
+        del player_data["games_up"]
+    with open(json_path, "w") as json_file:
+        json.dump(json_data, json_file)
 
-    poker.add_field()
+    poker.migrate_store()
 
+    assert (f"Migrated 3 of 3 players to schema version {SCHEMA_VERSION}"
+            in capfd.readouterr().out)
     with open(json_path) as json_file:
         json_data = json.load(json_file)
         for player_data in json_data:
-            assert player_data["mock_field"] == 0
+            assert player_data["games_up"] == 0
+            assert player_data["schema_version"] == SCHEMA_VERSION
 
 
 def test_add_game_print_unknown_names(tem_dir_fixture2, capfd):
@@ -240,7 +626,59 @@ def test_add_game_print_unknown_names(tem_dir_fixture2, capfd):
     poker.add_poker_game(ledger_path + "/ledger01_02.csv")
 
     out, _ = capfd.readouterr()
-    assert out == "Joe\nNot all players known\n"
+    # Joe sat under the PokerNow player id Alice has in ledger01_01
+    assert out == "Joe (did you mean Alice?)\nNot all players known\n"
+
+
+def test_add_game_auto_links_nicknames(tem_dir_fixture2, capfd):
+    poker, ledger_path, json_path = tem_dir_fixture2
+    ledger = os.path.join(ledger_path, "ledger01_03.csv")
+    with open(os.path.join(ledger_path, "ledger01_01.csv")) as ledger_file:
+        rows = ledger_file.read()
+    with open(ledger, "w") as ledger_file:
+        ledger_file.write(rows.replace('"Bob"', '"bob2"'))
+
+    poker.add_poker_game(ledger)
+    out, _ = capfd.readouterr()
+    assert out == "bob2 (did you mean Bob?)\nNot all players known\n"
+
+    poker.auto_link = True
+    poker.add_poker_game(ledger)
+    out, _ = capfd.readouterr()
+    assert out.startswith("Linked bob2 to Bob\n")
+    assert "Poker game on 2023-01-03 added" in out
+    with open(json_path) as json_file:
+        bob = json.load(json_file)[1]
+    assert bob["player_nicknames"] == ["Bob", "Bob1", "bob2"]
+    assert bob["games_played"][-1] == "2023-01-03"
+
+
+def test_add_game_auto_links_by_ledger_player_id(tem_dir_fixture2, capfd):
+    poker, ledger_path, json_path = tem_dir_fixture2
+    with open(json_path) as json_file:
+        json_data = json.load(json_file)
+    json_data[0]["player_id"] = ""
+    with open(json_path, "w") as json_file:
+        json.dump(json_data, json_file)
+    poker.add_poker_game(os.path.join(ledger_path, "ledger01_01.csv"))
+    capfd.readouterr()
+
+    poker.auto_link = True
+    poker.add_poker_game(os.path.join(ledger_path, "ledger01_02.csv"))
+
+    out, _ = capfd.readouterr()
+    assert out.startswith("Linked Joe to Alice\n")
+    with open(json_path) as json_file:
+        alice = json.load(json_file)[0]
+    assert alice["player_nicknames"] == ["Alice", "Alice1", "Joe"]
+    assert alice["player_id"] == "F9j4Iofc1U"
+
+
+def test_nickname_candidates_match_ledger_player_ids(tem_dir_fixture2):
+    poker, _, _ = tem_dir_fixture2
+
+    assert poker.nickname_candidates("Stranger", "i7bj3YBOve") == [
+        {"id": 2, "name": "Bob", "score": 1.0, "alias": "player_id"}]
 
 
 def test_sort_days_list(tem_dir_fixture1):
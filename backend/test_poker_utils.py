@@ -1,4 +1,6 @@
-from poker_utils import get_min_and_max_names
+from migrations import SCHEMA_VERSION
+from poker_utils import (decode_player, encode_player, get_min_and_max_names,
+                         to_cents)
 
 def test_get_extreme_names():
     # Test case 1: Empty dictionary
@@ -22,3 +24,31 @@ def test_get_extreme_names():
     assert get_min_and_max_names(amount_dict) == (['John', 'Alice', 'Bob', 'Eve'], ['John', 'Alice', 'Bob', 'Eve'])
 
 
+def test_to_cents_rounds_float_dollars():
+    assert to_cents(0.1 + 0.2) == 30
+    assert to_cents(-4.35) == -435
+    assert sum(to_cents(0.1) for _ in range(10)) == 100
+
+
+def test_player_money_round_trip():
+    player = {"name": "Alice", "net": 5.5, "biggest_loss": -10.05,
+              "average_net": 2.75, "games_up": 1,
+              "games_played": ["01_01", "01_02"], "net_history": [-4.55, 5.5],
+              "schema_version": SCHEMA_VERSION}
+
+    decoded = decode_player(dict(player))
+    assert decoded["net"] == 550
+    assert decoded["biggest_loss"] == -1005
+    assert decoded["net_history"] == [-455, 550]
+    assert decoded["games_up"] == 1
+    assert encode_player(decoded) == player
+
+
+def test_decode_legacy_net_dictionary():
+    player = decode_player({
+        "net": 3.0, "games_played": ["10_30", "10_31(1)", "10_31"],
+        "net_dictionary": {"01_01": 0, "10_30": -2.0, "10_31": 3.0}})
+
+    assert "net_dictionary" not in player
+    # games on the same date share the date's last value
+    assert player["net_history"] == [-200, 300, 300]
@@ -0,0 +1,73 @@
+import pytest
+
+from ranking_index import Leaderboard, RankingIndex
+
+
+def make_players():
+    return [
+        {"id": id_, "flag": "flags/us.png", "name": name, "putr": putr,
+         "net": net, "games_played": ["01_01"] * games, "games_up": up,
+         "average_net": net / games}
+        for id_, name, putr, net, games, up in [
+            (1, "Alice", 12.5, 550, 2, 1),
+            (2, "Bob", 11.0, -1000, 4, 1),
+            (3, "Charlie", 12.0, 450, 1, 1),
+            (4, "Dana", 12.0, 0, 3, 0),
+        ]
+    ]
+
+
+def test_ranking_index_orders_highest_first():
+    index = RankingIndex("putr")
+    for player in make_players():
+        index.update(player)
+
+    # ties are broken by id
+    assert index.ids() == [1, 3, 4, 2]
+    assert index.rank(4) == 3
+    assert index.rank(5) is None
+
+
+def test_ranking_index_repositions_changed_players():
+    index = RankingIndex("net")
+    players = make_players()
+    for player in players:
+        index.update(player)
+
+    assert not index.update(players[0])
+    players[1]["net"] = 600
+    assert index.update(players[1])
+    assert index.ids() == [2, 1, 3, 4]
+    assert len(index) == 4
+
+
+def test_leaderboard_queries():
+    leaderboard = Leaderboard(make_players())
+
+    assert [row["name"] for row in leaderboard.top("games_played", 2)] == [
+        "Bob", "Dana"]
+    assert leaderboard.rank("win_rate", 1) == {
+        "id": 1, "flag": "flags/us.png", "name": "Alice", "putr": 12.5,
+        "net": 5.5, "average_net": 2.75, "games_played": 2,
+        "win_rate": 0.5, "rank": 2}
+
+    page = leaderboard.page("net", page=2, size=3)
+    assert page["total"] == 4
+    assert [(row["rank"], row["name"]) for row in page["rows"]] == [
+        (4, "Bob")]
+
+
+def test_leaderboard_update_ids():
+    players = make_players()
+    leaderboard = Leaderboard(players)
+
+    players[3]["net"] = 10000
+    leaderboard.update_ids(players, ["4"])
+
+    assert leaderboard.top("net", 1)[0]["name"] == "Dana"
+    assert leaderboard.rank("net", 4)["net"] == 100.0
+
+
+def test_leaderboard_rejects_unknown_key():
+    with pytest.raises(ValueError):
+        Leaderboard(make_players()).top("biggest_win", 3)
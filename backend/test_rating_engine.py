@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from rating_engine import (BASE_RATING, MAX_SCORE, compute_ratings,
+                           game_scores, update_ratings)
+
+
+def test_game_scores():
+    scores = game_scores(np.array([0, 0, 1, 1, 1]),
+                         np.array([500, -500, 0, 0, 0]))
+
+    assert scores.tolist() == [1.0, -1.0, 0.0, 0.0, 0.0]
+
+
+def test_game_scores_clipped():
+    scores = game_scores(np.zeros(11, dtype=np.int64),
+                         np.array([1000] + [-100] * 10))
+
+    assert scores[0] == MAX_SCORE
+
+
+def test_compute_ratings_matches_incremental_updates():
+    rng = np.random.default_rng(0)
+    game = np.repeat(np.arange(50), 4)
+    player = np.array([str(i) for _ in range(50)
+                       for i in rng.choice(10, 4, replace=False)])
+    net_cents = rng.integers(-5000, 5000, len(game))
+
+    ratings = {}
+    games = {}
+    for g in range(50):
+        in_game = game == g
+        ids = player[in_game].tolist()
+        scores = game_scores(np.zeros(len(ids), dtype=np.int64),
+                             net_cents[in_game])
+        updated = update_ratings(
+            np.array([ratings.get(i, BASE_RATING) for i in ids]),
+            np.array([games.get(i, 0) for i in ids]), scores)
+        for i, rating in zip(ids, updated.tolist()):
+            ratings[i] = rating
+            games[i] = games.get(i, 0) + 1
+
+    computed = compute_ratings(game, player, net_cents)
+    assert computed == pytest.approx(ratings)
+
+
+def test_compute_ratings_empty():
+    assert compute_ratings(np.array([], dtype=np.int64), np.array([]),
+                           np.array([], dtype=np.int64)) == {}
@@ -0,0 +1,88 @@
+import numpy as np
+
+from ledger_manifest import new_manifest
+from sessions import SessionIndex, read_sessions, session_row
+
+LEDGER = """player_nickname,player_id,session_start_at,session_end_at,buy_in,\
+buy_out,stack,net
+"Alice",a,2023-01-01T20:00:00.000Z,2023-01-01T21:00:00.000Z,1000,0,0,-1000
+"Alice",a,2023-01-01T21:00:00.000Z,,2000,,2500,500
+"Bob",b,2023-01-01T20:30:00.000Z,2023-01-01T22:00:00.500Z,1000,1500,0,500
+"""
+
+
+def test_read_sessions(tmp_path):
+    path = tmp_path / "ledger01_01.csv"
+    path.write_text(LEDGER)
+
+    # Alice's open session has no known length, so it adds no time
+    assert read_sessions(str(path)) == {
+        "Alice": [3600, 3000, 2, 2000, 1],
+        "Bob": [5400, 1000, 1, 1000, 0]}
+
+
+def test_read_sessions_empty_ledger(tmp_path):
+    path = tmp_path / "ledger01_01.csv"
+    path.write_text(LEDGER.splitlines()[0] + "\n")
+
+    assert read_sessions(str(path)) == {}
+
+
+def test_read_sessions_without_session_columns(tmp_path):
+    path = tmp_path / "ledger01_01.csv"
+    path.write_text("player_nickname,net\nAlice,550\n")
+
+    assert read_sessions(str(path)) == {}
+
+
+def test_add_game_matches_rebuild():
+    rng = np.random.default_rng(0)
+    manifest = new_manifest(complete=True)
+    index = SessionIndex(manifest)
+    for game in range(30):
+        players = rng.choice(6, 3, replace=False).astype(str).tolist()
+        record = {
+            "results": {player: int(rng.integers(-5000, 5000))
+                        for player in players},
+            "sessions": {player: [int(rng.integers(600, 20000)),
+                                  2000, 2, int(rng.integers(500, 2000)),
+                                  int(rng.integers(0, 2))]
+                         for player in players}}
+        manifest["ledgers"][f"ledger{game}.csv"] = record
+        index.add_game(record)
+    # games recorded before sessions were kept are left out
+    manifest["ledgers"]["old.csv"] = {"results": {"0": 100}}
+
+    rebuilt = SessionIndex(manifest)
+    for player in map(str, range(6)):
+        assert index.totals(player) == rebuilt.totals(player)
+    assert index.totals("9") is None
+
+
+def test_open_sessions_are_left_out_of_timed_games():
+    manifest = new_manifest(complete=True)
+    manifest["ledgers"] = {
+        "ledger01.csv": {"results": {"1": 1000},
+                         "sessions": {"1": [3600, 1000, 1, 1000, 0]}},
+        "ledger02.csv": {"results": {"1": -3000},
+                         "sessions": {"1": [1800, 1000, 2, 1000, 1]}}}
+
+    totals = SessionIndex(manifest).totals("1")
+
+    assert totals["seconds"] == 5400 and totals["net"] == -2000
+    assert (totals["timed_seconds"], totals["timed_net"],
+            totals["timed_games"], totals["games"]) == (3600, 1000, 1, 2)
+
+
+def test_session_row():
+    row = session_row({"seconds": 9000, "buy_in": 5000, "sessions": 3,
+                       "biggest_buy_in": 2000, "open_sessions": 1,
+                       "net": 3000, "timed_seconds": 7200, "timed_net": 1000,
+                       "timed_games": 1, "games": 2})
+
+    assert row == {"games": 2, "timed_games": 1, "hours": 2.0,
+                   "hourly_rate": 5.0, "buy_in": 50.0, "rebuys": 1,
+                   "biggest_buy_in": 20.0, "open_sessions": 1}
+    assert session_row(dict(row, seconds=0, net=0, sessions=2, buy_in=0,
+                            biggest_buy_in=0, timed_seconds=0,
+                            timed_net=0))["hourly_rate"] is None
@@ -0,0 +1,84 @@
+from site_render import render_leaderboard, write_site
+
+
+def make_players():
+    return [
+        {"id": 1, "flag": "flags/us.png", "name": "Alice", "putr": 11.4,
+         "net": 550, "player_nicknames": ["alice"], "games_played": ["01_01"],
+         "biggest_win": 550, "biggest_loss": 0, "highest_net": 550,
+         "lowest_net": 0, "net_history": [550], "games_up_most": 1,
+         "games_down_most": 0, "games_up": 1, "games_down": 0,
+         "average_net": 550.0},
+        {"id": 2, "flag": "flags/us.png", "name": "<b>Bob</b>", "putr": 12.3,
+         "net": -550, "player_nicknames": ["bob"], "games_played": ["01_01"],
+         "biggest_win": 0, "biggest_loss": -550, "highest_net": 0,
+         "lowest_net": -550, "net_history": [-550], "games_up_most": 0,
+         "games_down_most": 1, "games_up": 0, "games_down": 1,
+         "average_net": -550.0},
+    ]
+
+
+def test_render_leaderboard_escapes_names():
+    page = render_leaderboard([
+        {"id": 2, "flag": "flags/us.png", "name": "<b>Bob</b>", "putr": 12.3,
+         "net": -5.5}])
+
+    assert "&lt;b&gt;Bob&lt;/b&gt;" in page
+    assert '<a href="players/2.html">' in page
+    assert '<td class="player-net">-5.50</td>' in page
+
+
+def test_write_site(tmp_path):
+    players = make_players()
+    write_site(players, str(tmp_path))
+
+    site = tmp_path / "site"
+    net_page = (site / "index.html").read_text()
+    putr_page = (site / "putr.html").read_text()
+    assert net_page.index("Alice") < net_page.index("Bob")
+    assert putr_page.index("Bob") < putr_page.index("Alice")
+    profile = (site / "players" / "1.html").read_text()
+    assert "<p>Net: 5.50</p>" in profile
+    assert '"01_01"' in profile and "[5.5]" in profile
+
+
+def test_write_site_renders_changed_profiles(tmp_path):
+    players = make_players()
+    write_site(players, str(tmp_path))
+
+    players[0]["name"] = "Alicia"
+    players[1]["name"] = "Robert"
+    write_site(players, str(tmp_path), changed_ids={"1"})
+
+    site = tmp_path / "site"
+    assert "Alicia" in (site / "players" / "1.html").read_text()
+    assert "Robert" not in (site / "players" / "2.html").read_text()
+    # the leaderboard is always rendered again
+    assert "Robert" in (site / "index.html").read_text()
+
+    # missing profiles are rendered even when unchanged
+    (site / "players" / "2.html").unlink()
+    write_site(players, str(tmp_path), changed_ids=set())
+    assert "Robert" in (site / "players" / "2.html").read_text()
+
+
+def test_write_site_links_static_files(tmp_path):
+    output_dir = tmp_path / "public"
+    write_site(make_players(), str(output_dir))
+
+    site = output_dir / "site"
+    assert 'href="../../style.css"' in (site / "index.html").read_text()
+    assert 'src="../../flags/us.png"' in (site / "index.html").read_text()
+    assert 'href="../../../style.css"' in (
+        site / "players" / "1.html").read_text()
+
+
+def test_write_site_removes_profiles_of_removed_players(tmp_path):
+    players = make_players()
+    write_site(players, str(tmp_path))
+
+    write_site(players[:1], str(tmp_path), changed_ids=set())
+
+    profiles = tmp_path / "site" / "players"
+    assert sorted(path.name for path in profiles.iterdir()) == ["1.html"]
+    assert "Bob" not in (tmp_path / "site" / "index.html").read_text()
@@ -0,0 +1,47 @@
+import pandas as pd
+
+from stats_engine import compute_player_stats, results_log
+
+
+def make_manifest():
+    return {"complete": True, "ledgers": {
+        "ledger01_01.csv": {"day": "01_01",
+                            "results": {"1": 550, "2": -425, "3": -125},
+                            "up_most": ["1"], "down_most": ["2"]},
+        "ledger01_02.csv": {"day": "01_02",
+                            "results": {"1": -1000, "2": 1000},
+                            "up_most": ["2"], "down_most": ["1"]},
+    }}
+
+
+def test_results_log():
+    log = results_log(make_manifest())
+
+    assert list(log["player"]) == ["1", "2", "3", "1", "2"]
+    assert list(log["game"]) == [0, 0, 0, 1, 1]
+    assert list(log["net_cents"]) == [550, -425, -125, -1000, 1000]
+    assert list(log["up_most"]) == [True, False, False, False, True]
+
+
+def test_results_log_empty():
+    log = results_log({"complete": True, "ledgers": {}})
+
+    assert isinstance(log, pd.DataFrame)
+    assert compute_player_stats(log) == {}
+
+
+def test_compute_player_stats():
+    stats = compute_player_stats(results_log(make_manifest()))
+
+    assert stats["1"].pop("putr") > stats["3"]["putr"]
+    assert stats["1"] == {
+        "net": -450, "games_played": ["01_01", "01_02"],
+        "biggest_win": 550, "biggest_loss": -1000, "highest_net": 550,
+        "lowest_net": -450,
+        "net_history": [550, -450],
+        "games_up_most": 1, "games_down_most": 1, "games_up": 1,
+        "games_down": 1, "average_net": -225.0,
+    }
+    assert stats["3"]["net_history"] == [-125]
+    assert stats["3"]["highest_net"] == 0
+    assert isinstance(stats["1"]["net"], int)
@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+
+from storage import atomic_write_json, file_lock, rotate_snapshots
+
+
+def test_atomic_write_json(tmp_path):
+    json_path = str(tmp_path / "data.json")
+
+    atomic_write_json(json_path, [{"id": 1}])
+
+    with open(json_path) as json_file:
+        assert json.load(json_file) == [{"id": 1}]
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_atomic_write_json_failure_keeps_original(tmp_path):
+    json_path = str(tmp_path / "data.json")
+    atomic_write_json(json_path, [{"id": 1}])
+
+    with pytest.raises(TypeError):
+        atomic_write_json(json_path, [{"id": object()}])
+
+    with open(json_path) as json_file:
+        assert json.load(json_file) == [{"id": 1}]
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_rotate_snapshots(tmp_path):
+    json_path = str(tmp_path / "data.json")
+
+    for version in range(4):
+        rotate_snapshots(json_path, 2)
+        atomic_write_json(json_path, version)
+
+    with open(json_path + ".1") as json_file:
+        assert json.load(json_file) == 2
+    with open(json_path + ".2") as json_file:
+        assert json.load(json_file) == 1
+    assert not os.path.exists(json_path + ".3")
+
+
+def test_file_lock_is_exclusive(tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+    json_path = str(tmp_path / "data.json")
+
+    with file_lock(json_path):
+        with open(json_path + ".lock") as lock_file:
+            with pytest.raises(BlockingIOError):
+                fcntl.flock(lock_file.fileno(),
+                            fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    with open(json_path + ".lock") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
@@ -2,12 +2,9 @@ const urlParams = new URLSearchParams(window.location.search);
         const playerID = urlParams.get('playerID');
         // console.log("player id is",playerID)
 
-        fetch("data.json")
+        fetch(`public/players/${parseInt(playerID)}.json`)
             .then(response => response.json())
-            .then(data => {
-
-            // Find the player by ID
-            const player = data.find(player => player.id === parseInt(playerID));
+            .then(player => {
             // console.log(player)
 
             if (player) {
@@ -31,11 +28,6 @@ const urlParams = new URLSearchParams(window.location.search);
                         <p>Average Net ${player.average_net.toFixed(2)}</p>`;
                         
 
-                const netDictionary = player.net_dictionary;
-                const dates = Object.keys(netDictionary);
-                const netValues = Object.values(netDictionary);
-                
-
             }
             
             })
@@ -1,8 +1,12 @@
-function populateTable() {
-    fetch("data.json")
+function populateTable(key = "net") {
+    // public/rankings/<key>.json is pre-sorted and ranked by the backend
+    fetch(`public/rankings/${key}.json`)
       .then((response) => response.json())
       .then((data) => {
         const tableBody = document.getElementById("table-body");
+        while (tableBody.firstChild) {
+          tableBody.removeChild(tableBody.firstChild);
+        }
         data.forEach((item) => {
           const row = document.createElement("tr");
           row.innerHTML = `
@@ -17,9 +21,6 @@ function populateTable() {
           `;
           tableBody.appendChild(row);
         });
-
-        sortTableByNet()
-
       })
       .catch((error) => {
         console.error("Error fetching data:", error);
@@ -27,51 +28,14 @@ function populateTable() {
   }
 
 function sortTableByPutr() {
-    const table = document.getElementById("leaderboard-table");
-    const tbody = table.getElementsByTagName('tbody')[0];
-    const rows = Array.from(tbody.getElementsByTagName('tr'));
-  
-    rows.sort((a, b) => {
-      const aValue = parseFloat(a.querySelector('.player-putr').textContent);
-      const bValue = parseFloat(b.querySelector('.player-putr').textContent);
-      return bValue - aValue; // Sort in descending order
-    });
-  
-    // Clear the table
-    while (tbody.firstChild) {
-      tbody.removeChild(tbody.firstChild);
-    }
-  
-    // Re-add the sorted rows
-    rows.forEach((row) => {
-      tbody.appendChild(row);
-    });
+    populateTable("putr");
   }
 
   function sortTableByNet() {
-    const table = document.getElementById("leaderboard-table");
-    const tbody = table.getElementsByTagName('tbody')[0];
-    const rows = Array.from(tbody.getElementsByTagName('tr'));
-  
-    rows.sort((a, b) => {
-      const aValue = parseFloat(a.querySelector('.player-net').textContent);
-      const bValue = parseFloat(b.querySelector('.player-net').textContent);
-      return bValue - aValue; // Sort in descending order
-    });
-  
-    // Clear the table
-    while (tbody.firstChild) {
-      tbody.removeChild(tbody.firstChild);
-    }
-  
-    // Re-add the sorted rows
-    rows.forEach((row) => {
-      tbody.appendChild(row);
-    });
+    populateTable("net");
   }
   
-  // Call the sorting function when the page loads to initially sort the table by PUTR
+  // Call the populating function when the page loads to initially sort the table by net
   window.addEventListener("load", () => {
     populateTable()
   });
-